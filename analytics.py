@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Analitik gabungan semua playthrough: distribusi pilihan, ending dan hubungan
+
+Setiap playthrough yang selesai dilipat ke dalam counter ringkas (Aggregate):
+
+    choices        kunci pilihan -> Counter nilai yang dipilih
+    endings        nama ending -> jumlah playthrough
+    relationships  karakter -> histogram level hubungan akhir
+
+Ada dua cara mengisi Aggregate:
+
+    streaming  Analytics dipasang sebagai event log Engine (bisa meneruskan
+               event ke EventLog biasa), state sesi yang masih berjalan
+               dibangun dari event dan dilipat saat event "end" datang
+    batch      file event log arsip dibaca dan diagregasi per kolom, satu
+               proses per file jika --jobs > 1, lalu hasilnya digabung
+
+Memori hanya sebanding dengan jumlah sesi yang belum selesai, bukan dengan
+jumlah playthrough. Sesi yang belum selesai di akhir sebuah file tidak
+dihitung.
+
+Pemakaian: python analytics.py [--jobs N] [--json hasil.json] log.jsonl...
+"""
+
+import json
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import events
+from game_state import _CHARACTER_IDS, CHARACTERS, EndingType, GameState
+from story import EventSink
+
+# Jumlah playthrough selesai yang dikumpulkan sebelum dilipat sekaligus
+BATCH = 1024
+# Ukuran potongan file log yang di-parse dengan satu panggilan json.loads
+CHUNK_BYTES = 1 << 22
+
+class Aggregate:
+    """Counter gabungan dari banyak playthrough yang selesai"""
+    __slots__ = ("playthroughs", "choices", "endings", "relationships")
+
+    def __init__(self):
+        self.playthroughs = 0
+        self.choices: Dict[str, Counter] = {}
+        self.endings: Counter = Counter()
+        self.relationships: Dict[str, Counter] = {name: Counter() for name in CHARACTERS}
+
+    def add(self, state: GameState) -> None:
+        """Tambahkan satu playthrough yang selesai"""
+        self.add_batch((state,))
+
+    def add_batch(self, states: Sequence[GameState]) -> None:
+        """Tambahkan banyak playthrough sekaligus"""
+        self.add_columns([state.ending_type.name if state.ending_type else None for state in states],
+                         [(key, int(value)) for state in states for key, value in state.choices_made.items()],
+                         [tuple(state.relationships.values()) for state in states])
+
+    def add_columns(self, endings: Sequence[Optional[str]], choices: Iterable[Tuple[str, int]],
+                    levels: Sequence[Tuple[int, ...]]) -> None:
+        """Tambahkan banyak playthrough dalam bentuk kolom.
+
+        `endings` dan `levels` berisi satu entri per playthrough (levels urut
+        sesuai CHARACTERS), `choices` berisi semua pasangan (kunci, nilai).
+        Setiap kolom dihitung dengan satu Counter sekaligus.
+        """
+        if not endings:
+            return
+        self.playthroughs += len(endings)
+        self.endings.update(endings)
+        for (key, value), count in Counter(choices).items():
+            self.choices.setdefault(key, Counter())[value] += count
+        for name, column in zip(CHARACTERS, zip(*levels)):
+            self.relationships[name].update(column)
+
+    def merge(self, other: "Aggregate") -> None:
+        """Gabungkan Aggregate lain ke sini"""
+        self.playthroughs += other.playthroughs
+        self.endings.update(other.endings)
+        for key, counts in other.choices.items():
+            self.choices.setdefault(key, Counter()).update(counts)
+        for name, levels in other.relationships.items():
+            self.relationships.setdefault(name, Counter()).update(levels)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Counter dalam bentuk yang bisa di-dump ke JSON"""
+        def ordered(counts: Counter) -> Dict[str, int]:
+            return {str(value): counts[value] for value in sorted(counts)}
+        return {
+            "playthroughs": self.playthroughs,
+            "choices": {key: ordered(counts) for key, counts in self.choices.items()},
+            "endings": {str(name): count for name, count in self.endings.most_common()},
+            "relationships": {name: ordered(levels) for name, levels in self.relationships.items()},
+        }
+
+class Analytics:
+    """Tahap analitik streaming dengan antarmuka yang sama seperti EventLog.
+
+    Pasang sebagai `event_log` Engine; jika `forward` diberikan, setiap event
+    juga diteruskan ke event log itu (mis. EventLog ke file).
+    """
+    def __init__(self, forward: Optional[events.EventLog] = None, batch: int = BATCH):
+        self.forward = forward
+        self.batch = batch
+        self.live: Dict[str, GameState] = {}
+        self.done: List[GameState] = []
+        self._replay = events.Replay(self.live)
+        self._aggregate = Aggregate()
+
+    def record(self, session: str, kind: str, scene: str, payload: Any = None) -> None:
+        """Terapkan satu event ke state sesinya; lipat state itu saat cerita selesai"""
+        if self.forward is not None:
+            self.forward.record(session, kind, scene, payload)
+        self.apply(events.Event(session, 0.0, kind, scene, payload))
+
+    def apply(self, event: events.Event) -> None:
+        """Terapkan satu event yang sudah dibaca dari log"""
+        self._replay.apply(event)
+        if event.kind == "end":
+            self.done.append(self.live.pop(event.session))
+            if len(self.done) >= self.batch:
+                self.flush()
+
+    def sink(self, session: str) -> EventSink:
+        """Penerima event untuk walk() dari satu sesi"""
+        def log(kind: str, scene: str, payload: Any) -> None:
+            self.record(session, kind, scene, payload)
+        return log
+
+    def flush(self) -> None:
+        """Lipat playthrough selesai yang masih tertahan ke Aggregate"""
+        self._aggregate.add_batch(self.done)
+        self.done.clear()
+
+    @property
+    def aggregate(self) -> Aggregate:
+        """Aggregate terkini (termasuk batch yang belum dilipat)"""
+        self.flush()
+        return self._aggregate
+
+    def close(self) -> None:
+        """Lipat sisa batch dan tutup event log tujuan"""
+        self.flush()
+        if self.forward is not None:
+            self.forward.close()
+
+def aggregate_events(stream: Iterable[events.Event]) -> Aggregate:
+    """Aggregate dari rangkaian event"""
+    analytics = Analytics()
+    for event in stream:
+        analytics.apply(event)
+    return analytics.aggregate
+
+def aggregate_file(path: str) -> Aggregate:
+    """Aggregate satu file event log.
+
+    Jalur cepat untuk arsip besar: baris-baris log di-parse per potongan
+    dengan satu json.loads, event enter tidak dilihat, dan state sesi cukup
+    berupa [pilihan, level hubungan, ending, checkpoint] tanpa GameState.
+    Hasilnya sama dengan aggregate_events(events.read(path)).
+    """
+    aggregate = Aggregate()
+    live: Dict[str, List[Any]] = {}
+    endings: List[Optional[str]] = []
+    choices: List[Tuple[str, int]] = []
+    levels: List[Tuple[int, ...]] = []
+    with open(path, encoding="utf-8") as f:
+        while True:
+            lines = f.readlines(CHUNK_BYTES)
+            if not lines:
+                break
+            if not lines[-1].endswith("\n"):
+                lines.pop()  # baris terakhir yang terpotong saat crash
+            if not lines:
+                break
+            for session, _, kind, _, payload in json.loads("[" + ",".join(lines) + "]"):
+                if kind == "enter":
+                    continue
+                record = live.get(session)
+                if record is None:
+                    record = live[session] = [{}, [0] * len(CHARACTERS), None, None]
+                if kind == "prompt":
+                    record[3] = (dict(record[0]), list(record[1]), record[2])
+                elif kind == "resume":
+                    if payload is not None:
+                        state = events.decode_checkpoint(payload)
+                        ending = state.ending_type.name if state.ending_type is not None else None
+                        record[3] = ({key: int(value) for key, value in state.choices_made.items()},
+                                     [state.relationships[name] for name in CHARACTERS], ending)
+                    if record[3] is not None:
+                        record[0], record[1], record[2] = dict(record[3][0]), list(record[3][1]), record[3][2]
+                elif kind == "choice":
+                    if payload[0] is not None:
+                        record[0][payload[0]] = payload[1]
+                elif kind == "delta":
+                    for op, target, amount in payload:
+                        if op == "relate":
+                            record[1][_CHARACTER_IDS[target]] += amount
+                        elif op == "set":
+                            record[1][_CHARACTER_IDS[target]] = amount
+                        elif op == "ending":
+                            record[2] = EndingType(amount).name
+                elif kind == "end":
+                    del live[session]
+                    endings.append(record[2])
+                    choices.extend(record[0].items())
+                    levels.append(tuple(record[1]))
+            aggregate.add_columns(endings, choices, levels)
+            endings.clear()
+            choices.clear()
+            levels.clear()
+    return aggregate
+
+def aggregate_files(paths: Sequence[str], jobs: int = 1) -> Aggregate:
+    """Aggregate banyak file event log, paralel per file jika `jobs` > 1"""
+    total = Aggregate()
+    if jobs > 1 and len(paths) > 1:
+        import multiprocessing
+
+        with multiprocessing.Pool(min(jobs, len(paths))) as pool:
+            parts = pool.map(aggregate_file, paths)
+    else:
+        parts = map(aggregate_file, paths)
+    for part in parts:
+        total.merge(part)
+    return total
+
+def _percent(count: int, total: int) -> str:
+    """Persentase untuk laporan"""
+    return f"{100 * count / total:5.1f}%" if total else "  -  "
+
+def format_report(aggregate: Aggregate) -> str:
+    """Laporan analitik dalam bentuk teks"""
+    total = aggregate.playthroughs
+    lines = [f"Playthrough selesai: {total}", "", "Ending:"]
+    for name, count in aggregate.endings.most_common():
+        lines.append(f"  {name or '(tanpa ending)':<16} {count:>9} {_percent(count, total)}")
+    lines += ["", "Pilihan per keputusan:"]
+    for key, counts in aggregate.choices.items():
+        answered = sum(counts.values())
+        spread = ", ".join(f"{value}: {counts[value]} ({_percent(counts[value], answered).strip()})"
+                           for value in sorted(counts))
+        lines.append(f"  {key:<18} {spread}")
+    lines += ["", "Hubungan akhir (level: jumlah):"]
+    for name, levels in aggregate.relationships.items():
+        histogram = ", ".join(f"{level:+d}: {levels[level]}" for level in sorted(levels))
+        lines.append(f"  {name:<14} {histogram or '-'}")
+    return "\n".join(lines)
+
+def main(argv: List[str]) -> int:
+    """Agregasi file event log dari command line"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Analitik gabungan playthrough CLANK")
+    parser.add_argument("logs", nargs="+", help="file event log JSONL (lihat events.py)")
+    parser.add_argument("--jobs", type=int, default=1, help="jumlah proses paralel (satu file per proses)")
+    parser.add_argument("--json", metavar="FILE", help="tulis counter ke file JSON")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    aggregate = aggregate_files(args.logs, args.jobs)
+    elapsed = time.perf_counter() - started
+    print(format_report(aggregate))
+    print(f"\nWaktu agregasi: {elapsed * 1000:.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(aggregate.as_dict(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Enumerator playthrough dan analisis keterjangkauan ending
+
+Menjelajahi setiap kombinasi pilihan di story graph tanpa menampilkan apa pun.
+Hasil dari setiap (node, state yang relevan) di-memo, jadi jalur-jalur yang
+bertemu lagi di node yang sama hanya dihitung sekali dan biaya analisis
+tumbuh dengan ukuran graph, bukan dengan jumlah jalur.
+"""
+
+import sys
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+
+from game_state import EndingType, GameState
+from render import get_renderer
+from story import EndingRules, Node, Step, StoryGraph, apply_effects, load_story
+
+class EndingStats:
+    """Statistik semua jalur yang berakhir di satu ending"""
+    __slots__ = ("paths", "min_bytes", "max_bytes", "example")
+
+    def __init__(self, paths: int, min_bytes: int, max_bytes: int, example: Tuple[int, ...]):
+        self.paths = paths
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.example = example
+
+    def shifted(self, size: int, value: Optional[int] = None) -> "EndingStats":
+        """Statistik yang sama setelah ditambah output `size` byte di depannya"""
+        example = self.example if value is None else (value,) + self.example
+        return EndingStats(self.paths, self.min_bytes + size, self.max_bytes + size, example)
+
+    def merge(self, other: "EndingStats") -> None:
+        """Gabungkan statistik jalur lain ke ending yang sama"""
+        self.paths += other.paths
+        self.min_bytes = min(self.min_bytes, other.min_bytes)
+        self.max_bytes = max(self.max_bytes, other.max_bytes)
+
+Outcomes = Dict[Optional[EndingType], EndingStats]
+
+class Report(NamedTuple):
+    """Hasil analisis story graph"""
+    total_paths: int
+    endings: Outcomes
+    unreachable_endings: Tuple[EndingType, ...]
+    unreachable_nodes: Tuple[str, ...]
+    dead_options: Tuple[Tuple[str, int], ...]
+    memo_entries: int
+
+def step_size(step: Step) -> int:
+    """Jumlah byte output ANSI untuk satu step"""
+    return len(get_renderer().block(step))
+
+def outcome_key(state: GameState, endings: Optional[EndingRules] = None) -> Hashable:
+    """Bagian state yang mempengaruhi sisa jalur dari sebuah node.
+
+    Selain ending yang sedang dituju, hanya field yang dibaca rule ending
+    yang bisa mengubah jalur; field lain tidak perlu membedakan entri memo.
+    """
+    if endings is None:
+        return state.ending_type
+    return state.ending_type, endings.state_key(state)
+
+class Analyzer:
+    """Penjelajah story graph dengan memoization"""
+    def __init__(self, graph: StoryGraph):
+        self.graph = graph
+        self.memo: Dict[Tuple[str, Hashable], Outcomes] = {}
+        self.visiting: Set[Tuple[str, Hashable]] = set()
+        self.dead_options: Set[Tuple[str, int]] = set()
+        self.sizes: Dict[str, int] = {}
+
+    def node_size(self, node: Node) -> int:
+        """Byte output statis sebuah node (tanpa cabang pilihan)"""
+        size = self.sizes.get(node.id)
+        if size is None:
+            size = sum(step_size(step) for step in node.steps + node.after)
+            if node.choice is not None:
+                renderer = get_renderer()
+                size += len(renderer.menu(node.choice.menu)) + len(renderer.prompt)
+            self.sizes[node.id] = size
+        return size
+
+    def explore(self, node_id: Optional[str], state: GameState) -> Outcomes:
+        """Semua ending yang bisa dicapai dari node ini dengan state ini"""
+        if node_id is None:
+            return {state.ending_type: EndingStats(1, 0, 0, ())}
+        key = (node_id, outcome_key(state, self.graph.endings))
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+        if key in self.visiting:
+            raise ValueError(f"story graph berputar tanpa akhir di node '{node_id}'")
+        self.visiting.add(key)
+
+        node = self.graph.nodes[node_id]
+        state = state.copy()
+        apply_effects(node.effects, state)
+        base = self.node_size(node)
+        outcomes: Outcomes = {}
+        if node.choice is None:
+            next_id = node.next
+            rule = self.graph.endings.resolve(state) if node.resolve else None
+            if rule is not None:
+                apply_effects(rule.effects, state)
+                base += sum(step_size(step) for step in rule.steps)
+                next_id = rule.next
+            self._merge(outcomes, self.explore(next_id, state), base)
+        else:
+            for option in node.choice.options:
+                branch = state.copy()
+                if node.choice.key is not None:
+                    branch.choices_made[node.choice.key] = str(option.value)
+                apply_effects(option.effects, branch)
+                result = self.explore(option.next, branch)
+                if set(result) == {None}:
+                    self.dead_options.add((node.id, option.value))
+                size = base + sum(step_size(step) for step in option.steps)
+                self._merge(outcomes, result, size, option.value)
+
+        self.visiting.discard(key)
+        self.memo[key] = outcomes
+        return outcomes
+
+    @staticmethod
+    def _merge(target: Outcomes, source: Outcomes, size: int, value: Optional[int] = None) -> None:
+        """Gabungkan hasil cabang ke hasil node"""
+        for ending, stats in source.items():
+            shifted = stats.shifted(size, value)
+            if ending in target:
+                target[ending].merge(shifted)
+            else:
+                target[ending] = shifted
+
+    def reachable_nodes(self) -> Set[str]:
+        """Node yang bisa dicapai dari node awal, tanpa melihat state"""
+        seen = {self.graph.start}
+        pending = [self.graph.start]
+        while pending:
+            node = self.graph.nodes[pending.pop()]
+            targets = [node.next] if node.choice is None else [o.next for o in node.choice.options]
+            if node.resolve:
+                targets += [rule.next for rule in self.graph.endings.rules]
+            for target in targets:
+                if target is not None and target not in seen:
+                    seen.add(target)
+                    pending.append(target)
+        return seen
+
+def analyze(graph: StoryGraph) -> Report:
+    """Jelajahi semua playthrough dan rangkum hasilnya"""
+    analyzer = Analyzer(graph)
+    endings = analyzer.explore(graph.start, GameState())
+    reachable = analyzer.reachable_nodes()
+    return Report(
+        total_paths=sum(stats.paths for stats in endings.values()),
+        endings=endings,
+        unreachable_endings=tuple(e for e in EndingType if e not in endings),
+        unreachable_nodes=tuple(n for n in graph.nodes if n not in reachable),
+        dead_options=tuple(sorted(analyzer.dead_options)),
+        memo_entries=len(analyzer.memo),
+    )
+
+def find_path(graph: StoryGraph, ending: EndingType) -> Optional[Tuple[int, ...]]:
+    """Urutan pilihan yang mencapai `ending`, atau None jika tidak terjangkau"""
+    stats = Analyzer(graph).explore(graph.start, GameState()).get(ending)
+    return stats.example if stats is not None else None
+
+def format_report(graph: StoryGraph, report: Report) -> str:
+    """Laporan analisis dalam bentuk teks"""
+    lines = [
+        f"Story: {graph.title}",
+        f"Node: {len(graph.nodes)} (memo: {report.memo_entries} entri)",
+        f"Total jalur: {report.total_paths}",
+        "",
+        "Ending yang terjangkau:",
+    ]
+    for ending, stats in sorted(report.endings.items(), key=lambda item: item[0].value if item[0] else 0):
+        name = ending.name if ending is not None else "(tanpa ending)"
+        example = " ".join(str(value) for value in stats.example)
+        lines.append(f"  {name:<16} {stats.paths:>6} jalur, output {stats.min_bytes}-{stats.max_bytes} byte,"
+                     f" contoh: {example}")
+    if report.unreachable_endings:
+        lines.append("Ending tidak terjangkau: " + ", ".join(e.name for e in report.unreachable_endings))
+    if report.unreachable_nodes:
+        lines.append("Node tidak terjangkau: " + ", ".join(report.unreachable_nodes))
+    if report.dead_options:
+        lines.append("Cabang mati (tidak mencapai ending): "
+                     + ", ".join(f"{node}#{value}" for node, value in report.dead_options))
+    return "\n".join(lines)
+
+def main(argv: List[str]) -> int:
+    """Analisis file cerita dari command line"""
+    graph = load_story(*argv[:1])
+    report = analyze(graph)
+    print(format_report(graph, report))
+    return 1 if None in report.endings or report.dead_options else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
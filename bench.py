@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark story engine CLANK
+
+Semua benchmark berjalan headless memakai playthrough yang sudah di-script
+untuk setiap ending yang terjangkau (jalurnya dicari oleh analyze.find_path).
+Hasilnya dibandingkan dengan baseline di bench_baseline.json; metrik yang
+lebih buruk dari toleransi ditandai sebagai regresi.
+
+Jalankan: python bench.py            (bandingkan dengan baseline)
+          python bench.py --save     (simpan hasil sebagai baseline baru)
+"""
+
+import asyncio
+import json
+import os
+import selectors
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from analyze import find_path
+from engine import Engine
+from events import EventLog
+from game_state import EndingType, GameState
+from inputs import InputPolicy
+from render import INSTANT, REALISTIC, SCENE_CACHE, Pacing, Renderer, opening_steps
+from story import Choice, EventSink, Step, StoryGraph, load_story, play_through, walk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+# Target waktu dari start proses sampai byte pertama cerita (setelah banner),
+# di atas waktu start interpreter Python kosong
+COLD_START_TARGET_MS = 40.0
+
+# Nama metrik -> True jika nilai lebih besar lebih baik
+METRICS: Dict[str, bool] = {
+    "render_chars_per_sec": True,
+    "session_bytes_per_sec": True,
+    "writes_per_scene_realistic": False,
+    "writes_per_scene_instant": False,
+    "bytes_per_session": False,
+    "peak_bytes_per_session": False,
+    "ttfb_p50_us": False,
+    "ttfb_p99_us": False,
+    "scene_cache_hit_rate": True,
+    "endings_covered": True,
+    "cold_start_ms": False,
+}
+
+class _LegacyGameState:
+    """Layout GameState lama (dict dan list biasa) sebagai pembanding memori"""
+    def __init__(self, state: GameState):
+        # Salinan string per sesi, seperti saat state dibangun dari input/JSON
+        self.choices_made: Dict[str, str] = {"".join(k): "".join(v) for k, v in state.choices_made.items()}
+        self.knowledge: List[str] = ["".join(text) for text in state.knowledge]
+        self.relationships: Dict[str, int] = {"".join(k): v for k, v in state.relationships.items()}
+        self.inventory: List[str] = []
+        self.ending_type: Optional[EndingType] = state.ending_type
+        self.plot_twist_revealed: bool = state.plot_twist_revealed
+
+def ending_scripts(graph: StoryGraph) -> Dict[EndingType, Tuple[int, ...]]:
+    """Urutan pilihan untuk setiap ending yang terjangkau"""
+    scripts = {}
+    for ending in EndingType:
+        path = find_path(graph, ending)
+        if path is not None:
+            scripts[ending] = path
+    return scripts
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Persentil (nearest-rank) dari daftar nilai"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def _bytes_per_object(factory: Callable[[], Any], count: int) -> Tuple[float, float]:
+    """Rata-rata byte yang dialokasikan dan puncak alokasi per objek buatan `factory`"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return (after - before) / count, (peak - before) / count
+
+def _scripted(graph: StoryGraph, script: Tuple[int, ...],
+              log: Optional[EventSink] = None) -> Iterator[Union[Step, Choice]]:
+    """Step dan Choice dari satu playthrough yang sudah di-script"""
+    choices = iter(script)
+    run = walk(graph, GameState(), log=log)
+    reply = None
+    while True:
+        try:
+            item = run.send(reply)
+        except StopIteration:
+            return
+        reply = next(choices) if isinstance(item, Choice) else None
+        yield item
+
+def bench_render(graph: StoryGraph, scripts: Dict[EndingType, Tuple[int, ...]],
+                 rounds: int = 20) -> Dict[str, float]:
+    """Karakter per detik saat me-render semua step dengan renderer baru (cache kosong)"""
+    best = 0.0
+    for _ in range(rounds):
+        chars = 0
+        elapsed = 0.0
+        for script in scripts.values():
+            renderer = Renderer()
+            started = time.perf_counter()
+            for item in _scripted(graph, script):
+                if isinstance(item, Choice):
+                    data = renderer.menu(item.menu) + renderer.prompt
+                else:
+                    data = b"".join(chunk for chunk, _ in renderer.frames(item, REALISTIC.delay(item.delay))) \
+                        if item.kind == "say" else renderer.block(item)
+                chars += len(data.decode("utf-8"))
+            elapsed += time.perf_counter() - started
+        best = max(best, chars / elapsed)
+    return {"render_chars_per_sec": best}
+
+class _VirtualClock(selectors.DefaultSelector):
+    """Selector yang tidak pernah menunggu: waktu loop langsung maju ke timer berikutnya"""
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout:
+            self.now += timeout
+        return super().select(0)
+
+class _VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop dengan waktu virtual, supaya sesi dengan pacing realistic selesai seketika
+    tanpa mengubah urutan write-nya"""
+    def __init__(self):
+        self.clock = _VirtualClock()
+        super().__init__(self.clock)
+
+    def time(self) -> float:
+        return self.clock.now
+
+async def _count_writes(graph: StoryGraph, scripts: List[Tuple[int, ...]], pacing: Pacing) -> Tuple[int, int]:
+    """(jumlah write, jumlah scene) dari Engine sungguhan yang memainkan semua script"""
+    log = EventLog()
+    engine = Engine(graph, renderer=Renderer(), pacing=pacing, event_log=log, policy=InputPolicy())
+    loop = asyncio.get_running_loop()
+    writes = 0
+
+    def start(session_id: str, script: Tuple[int, ...]) -> None:
+        choices = iter(script)
+
+        def write(data: bytes) -> None:
+            nonlocal writes
+            writes += 1
+            if data is engine.renderer.prompt:
+                loop.call_soon(engine.send, session_id, str(next(choices)))
+
+        engine.start(session_id, write)
+
+    for index, script in enumerate(scripts):
+        start(str(index), script)
+    await engine.join()
+    return writes, sum(1 for event in log if event.kind == "enter")
+
+def bench_writes(graph: StoryGraph, scripts: Dict[EndingType, Tuple[int, ...]]) -> Dict[str, float]:
+    """Jumlah write() per scene yang benar-benar dilakukan Session, termasuk banner dan ringkasan.
+
+    Pacing realistic dijalankan di event loop dengan waktu virtual, jadi
+    jumlah frame typewriter sama seperti saat dimainkan tanpa harus menunggu.
+    """
+    results = {}
+    for name, pacing in (("realistic", REALISTIC), ("instant", INSTANT)):
+        loop = _VirtualTimeLoop()
+        try:
+            writes, scenes = loop.run_until_complete(_count_writes(graph, list(scripts.values()), pacing))
+        finally:
+            loop.close()
+        results[f"writes_per_scene_{name}"] = writes / scenes
+    return results
+
+def bench_sessions(graph: StoryGraph, scripts: Dict[EndingType, Tuple[int, ...]],
+                   sessions: int = 100, repeat: int = 5) -> Dict[str, float]:
+    """Throughput dan time-to-first-byte setelah pilihan untuk banyak sesi sekaligus.
+
+    Diulang `repeat` kali dan diambil hasil terbaik per metrik supaya
+    gangguan dari proses lain tidak terbaca sebagai regresi.
+    """
+    runs = [asyncio.run(_bench_sessions(graph, list(scripts.values()), sessions)) for _ in range(repeat)]
+    return {name: (max if METRICS[name] else min)(run[name] for run in runs) for name in runs[0]}
+
+async def _bench_sessions(graph: StoryGraph, scripts: List[Tuple[int, ...]], sessions: int) -> Dict[str, float]:
+    loop = asyncio.get_running_loop()
+    SCENE_CACHE.clear()
+    engine = Engine(graph, pacing=Pacing(0.0))
+    prompt = engine.renderer.prompt
+    latencies: List[float] = []
+    total = 0
+
+    def start(session_id: str, script: Tuple[int, ...]) -> None:
+        choices = iter(script)
+        sent_at: List[float] = []
+
+        def write(data: bytes) -> None:
+            nonlocal total
+            total += len(data)
+            if sent_at:
+                latencies.append(time.perf_counter() - sent_at.pop())
+            if data is prompt:
+                # Jawab di putaran event loop berikutnya, seperti input dari jaringan
+                loop.call_soon(answer)
+
+        def answer() -> None:
+            sent_at.append(time.perf_counter())
+            engine.send(session_id, str(next(choices)))
+
+        engine.start(session_id, write)
+
+    started = time.perf_counter()
+    for index in range(sessions):
+        start(str(index), scripts[index % len(scripts)])
+    await engine.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "session_bytes_per_sec": total / elapsed,
+        "ttfb_p50_us": _percentile(latencies, 0.50) * 1e6,
+        "ttfb_p99_us": _percentile(latencies, 0.99) * 1e6,
+        "scene_cache_hit_rate": SCENE_CACHE.hit_rate,
+    }
+
+def bench_session_memory(graph: StoryGraph, sessions: int = 10000) -> Dict[str, float]:
+    """Byte per sesi untuk GameState setelah satu playthrough penuh"""
+    finished = play_through(graph, [1, 2, 3, 2, 1, 4, 5])
+    legacy, _ = _bytes_per_object(lambda: _LegacyGameState(finished), sessions)
+    average, peak = _bytes_per_object(finished.copy, sessions)
+    return {
+        "legacy_bytes_per_session": legacy,
+        "bytes_per_session": average,
+        "peak_bytes_per_session": peak,
+    }
+
+def _first_byte_ms(argv: List[str], env: Dict[str, str], skip: int = 0) -> float:
+    """Waktu dari start proses sampai byte output pertama setelah `skip` byte"""
+    started = time.perf_counter()
+    process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, env=env, cwd=HERE)
+    received = 0
+    while received <= skip:
+        data = process.stdout.read1(65536)
+        if not data:
+            break
+        received += len(data)
+    elapsed = time.perf_counter() - started
+    process.kill()
+    process.communicate()
+    return elapsed * 1000
+
+def bench_cold_start(runs: int = 7) -> Dict[str, float]:
+    """Median waktu startup main.py sampai byte cerita pertama, dikurangi start interpreter kosong.
+
+    Banner pembuka ditulis sebelum load_story(), jadi byte yang diukur adalah
+    byte pertama setelah banner: waktunya mencakup membaca dan meng-compile
+    cerita.
+    """
+    env = dict(os.environ, CLANK_PACING="instant", CLANK_PROFILE="plain")
+    banner = sum(len(chunk) for chunk, _ in Renderer("plain").scene(None, None, opening_steps))
+    bare = [_first_byte_ms([sys.executable, "-c", "print()"], env) for _ in range(runs)]
+    game = [_first_byte_ms([sys.executable, "main.py"], env, banner) for _ in range(runs)]
+    return {"cold_start_ms": max(0.0, _percentile(game, 0.5) - _percentile(bare, 0.5))}
+
+def run_all(graph: StoryGraph) -> Dict[str, float]:
+    """Jalankan semua benchmark"""
+    scripts = ending_scripts(graph)
+    results: Dict[str, float] = {}
+    results.update(bench_render(graph, scripts))
+    results.update(bench_writes(graph, scripts))
+    results.update(bench_sessions(graph, scripts))
+    results.update(bench_session_memory(graph))
+    results.update(bench_cold_start())
+    results["endings_covered"] = len(scripts)
+    return results
+
+def regressions(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Metrik yang lebih buruk dari baseline melebihi toleransi"""
+    worse = []
+    for name, higher_is_better in METRICS.items():
+        if name not in baseline or name not in results or not baseline[name]:
+            continue
+        change = (results[name] - baseline[name]) / baseline[name]
+        if (-change if higher_is_better else change) > tolerance:
+            worse.append(f"{name}: {baseline[name]:.1f} -> {results[name]:.1f} ({change:+.0%})")
+    return worse
+
+def main(argv: List[str]) -> int:
+    """Jalankan semua benchmark dan bandingkan dengan baseline"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark story engine CLANK")
+    parser.add_argument("--save", action="store_true", help="simpan hasil sebagai baseline baru")
+    parser.add_argument("--baseline", default=BASELINE, help="file baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.35,
+                        help="perubahan relatif yang dianggap regresi (default 0.35)")
+    args = parser.parse_args(argv)
+
+    graph = load_story()
+    results = run_all(graph)
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    for name, value in results.items():
+        reference = f"  (baseline {baseline[name]:.1f})" if name in baseline else ""
+        print(f"{name:<28} {value:>14.1f}{reference}")
+    target = "tercapai" if results["cold_start_ms"] <= COLD_START_TARGET_MS else "TIDAK tercapai"
+    print(f"Target cold start {COLD_START_TARGET_MS:.0f} ms: {target}")
+    missing = [ending.name for ending in EndingType if ending not in ending_scripts(graph)]
+    if missing:
+        print("Ending tidak terjangkau (tidak di-benchmark): " + ", ".join(missing))
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({name: round(value, 1) for name, value in results.items()}, f, indent=2)
+            f.write("\n")
+        return 0
+    worse = regressions(results, baseline, args.tolerance)
+    for line in worse:
+        print(f"REGRESI {line}")
+    return 1 if worse else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
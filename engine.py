@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Session engine asyncio: banyak pemain CLANK dalam satu event loop
+
+Setiap Session menjalankan story graph sebagai coroutine. Efek typewriter dan
+jeda antar scene dijadwalkan sebagai timer asyncio, dan di titik pilihan
+session menunggu input dari queue-nya sendiri, jadi tidak ada thread yang
+tertidur atau terblokir oleh input().
+
+Input pemain bisa diketik lebih dulu (type-ahead) dan memuat perintah skip,
+lihat inputs.py. Jika InputPolicy punya timeout, sesi yang menunggu terlalu
+lama memilih opsi pertama atau diparkir: Session-nya dibuang dan hanya
+checkpoint state-nya yang disimpan sampai pemain mengirim input lagi. Dengan
+Hibernator (hibernate.py) checkpoint itu ditulis ke disk, dan sesi yang paling
+lama idle ikut diparkir jika jumlah sesi di memori melebihi batas.
+
+Dengan Storage (storage.py) setiap checkpoint juga disimpan secara persisten
+lewat group commit dan dihapus saat sesi selesai, ditutup atau dihentikan;
+restore_stored() melanjutkan sesi yang tersisa setelah proses di-restart.
+"""
+
+import asyncio
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional
+
+import events
+import snapshot
+from game_state import GameState
+from hibernate import Hibernator, hibernator_from_env
+from inputs import Command, InputPolicy, TypeAhead, policy_from_env
+from metrics import METRICS, SceneTracker, metrics_from_env
+from render import (Pacing, Renderer, closing_steps, detect_profile, get_renderer, locale_from_env,
+                    opening_steps, pacing_from_env, summary_steps)
+from storage import Storage, storage_from_env
+from story import Choice, EventSink, Step, StoryGraph, load_story, scene_key, walk
+
+Writer = Callable[[bytes], None]
+# Menunggu sampai output yang tertahan untuk klien lambat sudah terkirim
+Drain = Callable[[], Awaitable[None]]
+
+class SessionParked(Exception):
+    """Sesi berhenti menunggu input dan diparkir oleh Engine"""
+
+class ParkedSession(NamedTuple):
+    """Sesi yang diparkir: cukup untuk melanjutkannya nanti"""
+    state: Optional[GameState]  # None jika state-nya dihibernasi ke disk
+    write: Writer
+    renderer: Renderer
+    drain: Optional[Drain]
+    resumed: "asyncio.Future[None]"
+    quiet: bool  # diparkir tanpa sepengetahuan pemain (eviction LRU)
+
+class Session:
+    """Satu sesi pemain yang berjalan sebagai coroutine"""
+    def __init__(self, session_id: str, story: StoryGraph, write: Writer,
+                 state: Optional[GameState] = None, renderer: Optional[Renderer] = None,
+                 pacing: Optional[Pacing] = None, log: Optional[EventSink] = None,
+                 drain: Optional[Drain] = None, policy: Optional[InputPolicy] = None,
+                 idle: Optional[Callable[["Session", bool], None]] = None,
+                 storage: Optional[Storage] = None):
+        self.session_id = session_id
+        self.story = story
+        self.write = write
+        self.drain = drain
+        self.renderer = renderer or get_renderer(locale=locale_from_env())
+        self.pacing = pacing or pacing_from_env()
+        self.policy = policy or policy_from_env()
+        self.state = state or GameState()
+        self.log = log
+        # Dipanggil saat sesi mulai (True) dan selesai (False) menunggu input
+        self.idle = idle
+        self.storage = storage
+        self.tracker = SceneTracker()
+        self.typeahead = TypeAhead()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.finished = False
+        # True selama sesi menunggu input di menu dan bisa diparkir
+        self.waiting = False
+        self.parking = False
+        # Sesi yang dilanjutkan setelah eviction tidak menampilkan ulang menunya
+        self.quiet_resume = False
+        # Salinan state terakhir di titik pilihan, aman untuk disimpan
+        self.checkpoint: GameState = self.state.copy()
+        # Kunci isi scene yang sedang dimainkan walk() (lihat story.scene_key)
+        self.scene_key: Optional[Hashable] = None
+
+    def emit(self, data: bytes) -> None:
+        """Kirim output ke pemain"""
+        self.write(data)
+        if METRICS.enabled:
+            self.tracker.wrote(len(data))
+
+    def feed(self, line: str) -> None:
+        """Masukkan satu baris input dari pemain (boleh berisi beberapa perintah)"""
+        dropped = self.typeahead.push(line)
+        if dropped and METRICS.enabled:
+            METRICS.count("typeahead_dropped", dropped)
+        self.ready.set()
+
+    def close(self) -> None:
+        """Tandai input pemain sudah habis (EOF / koneksi putus)"""
+        self.closed = True
+        self.ready.set()
+
+    def park(self) -> bool:
+        """Parkir sesi jika sedang menunggu input tanpa type-ahead; False jika tidak bisa"""
+        if not self.waiting or self.typeahead or self.parking:
+            return False
+        self.parking = True
+        self.ready.set()
+        return True
+
+    async def run(self) -> GameState:
+        """Mainkan cerita sampai ringkasan ending, atau lanjutkan dari state.scene"""
+        if self.state.scene is None:
+            await self.play_scene(None, "opening", opening_steps)
+
+        run = walk(self.story, self.state, log=self.on_event)
+        reply = None
+        # Step satu scene dikumpulkan sampai menu berikutnya atau scene lain,
+        # lalu diputar sebagai frame dari cache scene
+        batch: List[Step] = []
+        batch_scene: Optional[str] = None
+        batch_key: Optional[Hashable] = None
+        while True:
+            try:
+                item = run.send(reply)
+            except StopIteration:
+                break
+            reply = None
+            if isinstance(item, Choice):
+                if batch:
+                    await self.play_batch(batch_scene, batch_key, batch)
+                self.checkpoint = self.state.copy()
+                if self.storage is not None:
+                    self.storage.put(self.session_id, self.checkpoint)
+                reply = await self.choose(item)
+                continue
+            if batch and self.state.scene != batch_scene:
+                await self.play_batch(batch_scene, batch_key, batch)
+            if not batch:
+                batch_scene, batch_key = self.state.scene, self.scene_key
+            batch.append(item)
+        if batch:
+            await self.play_batch(batch_scene, batch_key, batch)
+
+        state = self.state
+        await self.play_scene(None, None, lambda: summary_steps(state, self.renderer.tr))
+        await self.play_scene(None, "closing", closing_steps)
+        self.tracker.close()
+        self.finished = True
+        return self.state
+
+    async def choose(self, choice: Choice) -> int:
+        """Tampilkan menu dan tunggu pilihan yang valid"""
+        if METRICS.enabled:
+            self.tracker.at(self.state.scene)
+        self.typeahead.at_menu()
+        quiet, self.quiet_resume = self.quiet_resume, False
+        if not quiet:
+            self.emit(self.renderer.menu(choice.menu))
+        while True:
+            if not quiet:
+                self.emit(self.renderer.prompt)
+            quiet = False
+            waiting = METRICS.clock() if METRICS.enabled else None
+            command = await self.next_command(choice)
+            if waiting is not None:
+                self.tracker.waited(METRICS.clock() - waiting)
+            if not isinstance(command, int):
+                self.emit(self.renderer.invalid_number)
+                if METRICS.enabled:
+                    self.tracker.retried("invalid_number")
+                continue
+            if command in choice.index:
+                return command
+            self.emit(self.renderer.invalid_choice)
+            if METRICS.enabled:
+                self.tracker.retried("invalid_choice")
+
+    async def next_command(self, choice: Choice) -> Command:
+        """Perintah berikutnya dari pemain, dengan waktu tunggu sesuai policy"""
+        if not self.typeahead:
+            self.waiting = True
+            if self.idle is not None:
+                self.idle(self, True)
+        try:
+            while not self.typeahead:
+                if self.closed:
+                    raise EOFError(f"input sesi '{self.session_id}' sudah ditutup")
+                if self.parking:
+                    self.tracker.close()
+                    raise SessionParked(self.session_id)
+                self.ready.clear()
+                if self.policy.timeout is None:
+                    await self.ready.wait()
+                    continue
+                try:
+                    await asyncio.wait_for(self.ready.wait(), self.policy.timeout)
+                except asyncio.TimeoutError:
+                    if METRICS.enabled:
+                        METRICS.count("input_timeout")
+                    if self.policy.on_timeout == "park":
+                        self.emit(self.renderer.parked)
+                        self.tracker.close()
+                        raise SessionParked(self.session_id) from None
+                    value = choice.options[0].value
+                    self.emit(self.renderer.timed_out(value))
+                    return value
+            return self.typeahead.pop()
+        finally:
+            if self.waiting:
+                self.waiting = False
+                if self.idle is not None:
+                    self.idle(self, False)
+
+    def on_event(self, kind: str, scene: str, payload: Any) -> None:
+        """Penerima event walk(): catat kunci scene yang dimulai lalu teruskan ke event log"""
+        if kind == "enter":
+            self.scene_key = scene_key(self.story, scene, None, self.state)
+        elif kind == "choice":
+            self.scene_key = scene_key(self.story, scene, payload[1], self.state)
+        if self.log is not None:
+            self.log(kind, scene, payload)
+
+    async def play_scene(self, scene: Optional[str], key: Optional[Hashable],
+                         steps: Callable[[], Iterable[Step]]) -> None:
+        """Putar frame step-step yang isinya ditentukan `key` (None = tanpa cache scene)"""
+        if METRICS.enabled:
+            self.tracker.at(scene)
+        frames = self.renderer.scene(scene, key, steps, self.pacing)
+        for index, (chunk, pause) in enumerate(frames):
+            if self.typeahead.skipping:
+                # Perintah skip: sisa scene dikirim sekaligus tanpa jeda
+                self.emit(b"".join(chunk for chunk, _ in frames[index:]))
+                break
+            self.emit(chunk)
+            if pause:
+                if self.drain is not None:
+                    await self.drain()
+                await asyncio.sleep(pause)
+        if self.drain is not None:
+            # Backpressure: sesi berhenti di sini selama klien belum membaca
+            await self.drain()
+
+    async def play_batch(self, scene: Optional[str], key: Optional[Hashable], batch: List[Step]) -> None:
+        """Putar step scene cerita yang terkumpul lalu kosongkan batch-nya"""
+        steps = tuple(batch)
+        batch.clear()
+        await self.play_scene(scene, key, lambda: steps)
+
+class Engine:
+    """Menjalankan banyak Session di satu event loop"""
+    def __init__(self, story: Optional[StoryGraph] = None, renderer: Optional[Renderer] = None,
+                 pacing: Optional[Pacing] = None, event_log: Optional[events.EventLog] = None,
+                 policy: Optional[InputPolicy] = None, hibernator: Optional[Hibernator] = None,
+                 storage: Optional[Storage] = None):
+        self.story = story or load_story()
+        self.renderer = renderer or get_renderer(locale=locale_from_env())
+        self.pacing = pacing or pacing_from_env()
+        self.policy = policy or policy_from_env()
+        self.hibernator = hibernator if hibernator is not None else hibernator_from_env()
+        self.storage = storage if storage is not None else storage_from_env()
+        self.event_log = event_log
+        self.sessions: Dict[str, Session] = {}
+        self.tasks: Dict[str, "asyncio.Task[GameState]"] = {}
+        self.parked: Dict[str, ParkedSession] = {}
+        # Sesi yang sedang menunggu input, urut dari yang paling lama idle (LRU)
+        self.idle: "OrderedDict[str, Session]" = OrderedDict()
+        self.evicting = 0
+
+    def __contains__(self, session_id: object) -> bool:
+        """True jika sesi sedang berjalan atau diparkir"""
+        return session_id in self.sessions or session_id in self.parked
+
+    def start(self, session_id: str, write: Writer, state: Optional[GameState] = None,
+              profile: Optional[str] = None, drain: Optional[Drain] = None,
+              locale: Optional[str] = None) -> Session:
+        """Mulai sesi baru; harus dipanggil dari dalam event loop.
+
+        `profile` memilih backend output untuk klien ini (mis. "plain" untuk
+        log atau "markdown" untuk chat) dan `locale` bahasanya (lihat i18n.py);
+        default memakai renderer engine. `drain` dipanggil setelah setiap step
+        untuk backpressure ke klien.
+        """
+        if session_id in self:
+            raise ValueError(f"sesi '{session_id}' sudah berjalan")
+        renderer = self.renderer
+        if profile is not None or locale is not None:
+            renderer = get_renderer(profile or renderer.profile, locale or renderer.locale,
+                                    renderer.typewriter.frame_rate)
+        log = self.event_log.sink(session_id) if self.event_log is not None else None
+        idle = self._idle if self.hibernator is not None and self.hibernator.max_resident is not None else None
+        session = Session(session_id, self.story, write, state, renderer, self.pacing, log, drain, self.policy,
+                          idle, self.storage)
+        task = asyncio.get_running_loop().create_task(session.run(), name=f"session-{session_id}")
+        task.add_done_callback(lambda done: self._forget(session_id, done))
+        self.sessions[session_id] = session
+        self.tasks[session_id] = task
+        if idle is not None:
+            self._evict(self.hibernator.max_resident)
+        if METRICS.enabled:
+            self._gauges()
+        return session
+
+    def restore(self, states: Dict[str, GameState], writer_for: Callable[[str], Writer]) -> None:
+        """Lanjutkan banyak sesi dari state tersimpan.
+
+        Event resume (berisi state checkpoint) dicatat lebih dulu supaya
+        replay event log memulai sesi dari checkpoint itu, juga di log baru,
+        dan mengabaikan event yang ditulis setelahnya oleh proses sebelumnya.
+        """
+        for session_id, state in states.items():
+            if self.event_log is not None:
+                self.event_log.record(session_id, "resume", state.scene or "", events.encode_checkpoint(state))
+            self.start(session_id, writer_for(session_id), state)
+
+    def resume(self, session_id: str) -> Session:
+        """Lanjutkan sesi yang diparkir; menu pilihannya ditampilkan lagi"""
+        parked = self.parked.pop(session_id)
+        state = parked.state
+        if state is None:
+            state = self.hibernator.load(session_id)
+            if METRICS.enabled:
+                METRICS.count("sessions_rehydrated")
+        session = self.start(session_id, parked.write, state, parked.renderer.profile, parked.drain,
+                             parked.renderer.locale)
+        session.quiet_resume = parked.quiet
+        parked.resumed.set_result(None)
+        if METRICS.enabled:
+            METRICS.count("sessions_resumed")
+        return session
+
+    def snapshot(self) -> Dict[str, GameState]:
+        """Checkpoint semua sesi yang belum selesai, termasuk yang diparkir"""
+        states = {session_id: parked.state or self.hibernator.load(session_id, keep=True)
+                  for session_id, parked in self.parked.items()}
+        states.update((session_id, session.checkpoint) for session_id, session in self.sessions.items()
+                      if not session.finished)
+        return states
+
+    def save(self, path: str) -> None:
+        """Simpan checkpoint semua sesi ke file snapshot"""
+        snapshot.save(path, self.snapshot())
+
+    def load(self, path: str, writer_for: Callable[[str], Writer]) -> None:
+        """Lanjutkan semua sesi dari file snapshot"""
+        self.restore(snapshot.load(path), writer_for)
+
+    def recover(self, path: str, writer_for: Callable[[str], Writer]) -> None:
+        """Lanjutkan sesi yang belum selesai dari file event log (setelah crash)"""
+        self.restore(events.recover(events.read(path)), writer_for)
+
+    def restore_stored(self, writer_for: Callable[[str], Writer]) -> None:
+        """Lanjutkan semua sesi yang checkpoint-nya ada di storage (setelah restart)"""
+        self.restore(self.storage.load(), writer_for)
+
+    def send(self, session_id: str, line: str) -> None:
+        """Kirim input pemain ke sesinya; sesi yang diparkir dilanjutkan dulu"""
+        if session_id in self.parked:
+            self.resume(session_id)
+        self.sessions[session_id].feed(line)
+
+    def close(self, session_id: str) -> None:
+        """Input pemain sudah habis: akhiri sesi yang menunggu input atau buang sesi yang diparkir"""
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.close()
+        parked = self.parked.pop(session_id, None)
+        if parked is not None:
+            if parked.state is None:
+                self.hibernator.discard(session_id)
+            if self.storage is not None:
+                self.storage.delete(session_id)
+            parked.resumed.set_result(None)
+            if METRICS.enabled:
+                self._gauges()
+
+    def stop(self, session_id: str) -> None:
+        """Hentikan sesi yang sedang berjalan atau diparkir"""
+        task = self.tasks.get(session_id)
+        if task is not None:
+            task.cancel()
+            if self.storage is not None:
+                self.storage.delete(session_id)
+        self.close(session_id)
+
+    async def wait(self, session_id: str) -> None:
+        """Tunggu sampai sesi selesai; selama diparkir, tunggu sampai dilanjutkan"""
+        while True:
+            task = self.tasks.get(session_id)
+            parked = self.parked.get(session_id)
+            if task is not None:
+                await asyncio.gather(task, return_exceptions=True)
+            elif parked is not None:
+                await parked.resumed
+            else:
+                return
+
+    async def join(self) -> None:
+        """Tunggu sampai semua sesi selesai (sesi yang diparkir juga ditunggu)"""
+        while self.tasks or self.parked:
+            waiting = list(self.tasks.values()) + [parked.resumed for parked in self.parked.values()]
+            await asyncio.gather(*waiting, return_exceptions=True)
+
+    def _forget(self, session_id: str, task: "asyncio.Task[GameState]") -> None:
+        """Buang sesi yang sudah selesai; simpan checkpoint sesi yang diparkir"""
+        session = self.sessions.pop(session_id, None)
+        self.tasks.pop(session_id, None)
+        if session is not None and session.parking:
+            self.evicting -= 1
+        parked = session is not None and not task.cancelled() and isinstance(task.exception(), SessionParked)
+        if self.storage is not None and session is not None and not parked and not task.cancelled():
+            # Cerita selesai atau input pemain habis: checkpoint-nya tidak dipakai lagi.
+            # Sesi yang dibatalkan saat shutdown tetap disimpan untuk restore_stored().
+            self.storage.delete(session_id)
+        if parked:
+            state: Optional[GameState] = session.checkpoint
+            if self.hibernator is not None:
+                self.hibernator.store(session_id, state)
+                state = None
+            resumed = asyncio.get_running_loop().create_future()
+            self.parked[session_id] = ParkedSession(state, session.write, session.renderer, session.drain,
+                                                    resumed, session.parking)
+            if METRICS.enabled:
+                METRICS.count("sessions_parked")
+        if METRICS.enabled:
+            self._gauges()
+
+    def _idle(self, session: Session, waiting: bool) -> None:
+        """Catat sesi yang mulai/selesai menunggu input untuk eviction LRU"""
+        if waiting:
+            self.idle[session.session_id] = session
+            self._evict(self.hibernator.max_resident)
+        else:
+            self.idle.pop(session.session_id, None)
+
+    def _evict(self, limit: int) -> None:
+        """Parkir sesi yang paling lama idle sampai jumlah sesi di memori tidak melebihi `limit`"""
+        while self.idle and len(self.sessions) - self.evicting > limit:
+            _, session = self.idle.popitem(last=False)
+            if session.park():
+                self.evicting += 1
+                if METRICS.enabled:
+                    METRICS.count("sessions_evicted")
+
+    def _gauges(self) -> None:
+        """Perbarui gauge jumlah sesi di memori, diparkir dan dihibernasi"""
+        METRICS.gauge("sessions_resident", len(self.sessions))
+        METRICS.gauge("sessions_parked", sum(1 for parked in self.parked.values() if parked.state is not None))
+        METRICS.gauge("sessions_hibernated", len(self.hibernator) if self.hibernator is not None else 0)
+
+async def play_console(engine: Engine) -> None:
+    """Mainkan satu sesi lewat stdin/stdout memakai engine"""
+    loop = asyncio.get_running_loop()
+
+    def write(data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+    engine.start("console", write, profile=detect_profile(sys.stdout))
+
+    def send(line: str) -> None:
+        if "console" in engine:
+            engine.send("console", line)
+
+    # stdin dibaca di thread daemon supaya event loop tidak pernah terblokir
+    def pump() -> None:
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(send, line.strip())
+        loop.call_soon_threadsafe(engine.close, "console")
+
+    threading.Thread(target=pump, daemon=True).start()
+    await engine.join()
+
+if __name__ == "__main__":
+    metrics_path = metrics_from_env()
+    try:
+        asyncio.run(play_console(Engine()))
+    except KeyboardInterrupt:
+        sys.exit(0)
+    finally:
+        if metrics_path is not None:
+            METRICS.dump(metrics_path)
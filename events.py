@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Event log append-only untuk sesi CLANK dan replay deterministiknya
+
+Setiap sesi melaporkan perubahan state-nya lewat walk() sebagai event::
+
+    enter   pemain masuk ke node (state.scene)
+    delta   effect yang diterapkan ke state (learn, relate, set, reveal, ending)
+    prompt  pemain menunggu di menu pilihan node itu (state.at_choice)
+    choice  pemain memilih (kunci pilihan, nilai)
+    end     cerita selesai
+    resume  sesi dilanjutkan dari checkpoint (setelah crash, handoff, atau
+            load); payload-nya state checkpoint itu (lihat encode_checkpoint)
+            dan event sejak prompt terakhirnya tidak berlaku lagi
+
+Di file, satu event adalah satu baris JSON berbentuk array ringkas::
+
+    [sesi, waktu, jenis, node, payload]
+
+Replay hanya menerapkan event ke GameState (tanpa render teks, tanpa story
+graph), jadi state sesi mana pun bisa dibangun ulang dengan cepat untuk
+crash recovery, audit, maupun analitik.
+"""
+
+import base64
+import json
+import sys
+import time
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import snapshot
+from game_state import GameState
+from story import Effect, EventSink, apply_effects
+
+class Event(NamedTuple):
+    """Satu event dari satu sesi"""
+    session: str
+    time: float
+    kind: str
+    scene: str
+    payload: Any = None
+
+class EventLog:
+    """Event log append-only: di memori, atau ke file JSONL jika `path` diberikan"""
+    def __init__(self, path: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.clock = clock
+        self.events: List[Event] = []
+        self.count = 0
+        if path is not None:
+            _truncate_torn(path)
+        self._file: Optional[IO[str]] = open(path, "a", encoding="utf-8") if path is not None else None
+
+    def record(self, session: str, kind: str, scene: str, payload: Any = None) -> None:
+        """Tambahkan satu event ke log"""
+        event = Event(session, round(self.clock(), 3), kind, scene, payload)
+        self.count += 1
+        if self._file is None:
+            self.events.append(event)
+            return
+        if kind == "delta":
+            payload = [list(effect) for effect in payload]
+        self._file.write(json.dumps([session, event.time, kind, scene, payload],
+                                    ensure_ascii=False, separators=(",", ":")) + "\n")
+        # Di prompt dan end state sesi konsisten, jadi di situ log di-flush
+        if kind == "prompt" or kind == "end":
+            self._file.flush()
+
+    def sink(self, session: str) -> EventSink:
+        """Penerima event untuk walk() dari satu sesi"""
+        def log(kind: str, scene: str, payload: Any) -> None:
+            self.record(session, kind, scene, payload)
+        return log
+
+    def __iter__(self) -> Iterator[Event]:
+        if self._file is None:
+            return iter(self.events)
+        self._file.flush()
+        return read(self.path)
+
+    def close(self) -> None:
+        """Tutup file log"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def _truncate_torn(path: str) -> None:
+    """Buang baris terakhir yang terpotong saat crash sebelum log ditambah lagi"""
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, 2)
+        position = end
+        while position > 0:
+            size = min(4096, position)
+            f.seek(position - size)
+            newline = f.read(size).rfind(b"\n")
+            if newline >= 0:
+                position -= size - newline - 1
+                break
+            position -= size
+        if position < end:
+            f.truncate(position)
+
+def read(path: str) -> Iterator[Event]:
+    """Baca event dari file JSONL"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # baris terakhir yang terpotong saat crash
+            session, at, kind, scene, payload = json.loads(line)
+            if kind == "delta":
+                payload = tuple(Effect(*effect) for effect in payload)
+            elif kind == "choice":
+                payload = tuple(payload)
+            yield Event(session, at, kind, scene, payload)
+
+def apply_event(event: Event, state: GameState) -> None:
+    """Terapkan satu event ke state, persis seperti yang dilakukan walk().
+
+    Event resume butuh checkpoint sesi, jadi ditangani Replay, bukan di sini.
+    """
+    kind = event.kind
+    if kind == "delta":
+        apply_effects(event.payload, state)
+    elif kind == "enter":
+        state.scene = event.scene
+        state.at_choice = False
+    elif kind == "prompt":
+        state.at_choice = True
+    elif kind == "choice":
+        key, value = event.payload
+        state.at_choice = False
+        if key is not None:
+            state.choices_made[key] = str(value)
+    elif kind == "end":
+        state.scene = None
+    else:
+        raise ValueError(f"jenis event tidak dikenal: {kind!r}")
+
+def encode_checkpoint(state: GameState) -> str:
+    """State checkpoint sebagai payload event resume (snapshot biner dalam base64)"""
+    return base64.b64encode(snapshot.dumps({"": state})).decode("ascii")
+
+def decode_checkpoint(payload: str) -> GameState:
+    """Kebalikan dari encode_checkpoint"""
+    return snapshot.loads(base64.b64decode(payload))[""]
+
+class Replay:
+    """Replay streaming yang mengikuti checkpoint setiap sesi.
+
+    Seperti Session di engine, checkpoint diambil di setiap prompt. Event
+    resume memuat state checkpoint dari payload-nya (atau, untuk log tanpa
+    payload, memutar sesi kembali ke prompt terakhirnya), jadi event yang
+    ditulis setelah checkpoint oleh proses yang crash atau di-handoff tidak
+    diterapkan dua kali, dan sesi yang dipulihkan ke log baru tidak mulai
+    dari state kosong.
+    """
+    def __init__(self, states: Optional[Dict[str, GameState]] = None):
+        self.states: Dict[str, GameState] = {} if states is None else states
+        self.checkpoints: Dict[str, GameState] = {}
+
+    def apply(self, event: Event) -> GameState:
+        """Terapkan satu event; kembalikan state sesinya"""
+        session = event.session
+        if event.kind == "resume":
+            if event.payload is not None:
+                self.checkpoints[session] = decode_checkpoint(event.payload)
+            checkpoint = self.checkpoints.get(session)
+            if checkpoint is not None:
+                self.states[session] = checkpoint.copy()
+            return self.states.setdefault(session, GameState())
+        state = self.states.get(session)
+        if state is None:
+            state = self.states[session] = GameState()
+        apply_event(event, state)
+        if event.kind == "prompt":
+            self.checkpoints[session] = state.copy()
+        elif event.kind == "end":
+            self.checkpoints.pop(session, None)
+        return state
+
+    def unfinished(self) -> Dict[str, GameState]:
+        """Checkpoint terakhir setiap sesi yang belum selesai.
+
+        Event setelah prompt terakhir (pilihan yang sedang diproses saat crash)
+        dibuang, jadi sesi bisa dilanjutkan dari menu pilihan itu tanpa
+        menerapkan effect dua kali.
+        """
+        return {session: checkpoint.copy() for session, checkpoint in self.checkpoints.items()}
+
+def replay(events: Iterable[Event],
+           states: Optional[Dict[str, GameState]] = None) -> Dict[str, GameState]:
+    """Bangun ulang GameState semua sesi dari event log.
+
+    Sesi yang belum selesai berhenti di checkpoint terakhirnya, sama seperti
+    recover(); event setelah prompt terakhir tidak ikut diterapkan. Sesi yang
+    belum pernah sampai ke prompt dibiarkan apa adanya.
+    """
+    replayer = Replay(states)
+    for event in events:
+        replayer.apply(event)
+    replayer.states.update(replayer.checkpoints)
+    return replayer.states
+
+def recover(events: Iterable[Event]) -> Dict[str, GameState]:
+    """State setiap sesi yang belum selesai di prompt terakhirnya (lihat Replay)"""
+    replayer = Replay()
+    for event in events:
+        replayer.apply(event)
+    return replayer.unfinished()
+
+def main(argv: List[str]) -> int:
+    """Replay file event log dan cetak ringkasannya"""
+    if not argv:
+        print("pemakaian: python events.py <log.jsonl>", file=sys.stderr)
+        return 2
+    events = list(read(argv[0]))
+    started = time.perf_counter()
+    states = replay(events)
+    elapsed = time.perf_counter() - started
+    finished = sum(1 for state in states.values() if state.scene is None)
+    print(f"Event: {len(events)}, sesi: {len(states)} ({finished} selesai)")
+    print(f"Replay: {elapsed * 1000:.1f} ms ({len(events) / elapsed if elapsed else 0:,.0f} event/detik)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tipe ending dan state permainan CLANK
+
+GameState dibuat seringkas mungkin karena satu proses bisa memegang ribuan
+sesi sekaligus: knowledge disimpan sebagai bitset ke katalog bersama plus
+tuple ID dalam urutan dipelajari, relationships sebagai array kecil per
+karakter, dan choices_made sebagai bytes dengan satu byte per kunci pilihan.
+Atribut lama (choices_made, knowledge, relationships) tetap tersedia sebagai
+view di atas data ringkas itu.
+"""
+
+from array import array
+from enum import Enum
+from typing import Dict, Iterator, List, MutableMapping, Optional, Sequence, Tuple
+
+class EndingType(Enum):
+    """Tipe-tipe ending yang tersedia"""
+    RETURN_HOME = 1  # Ending 1: Kembali ke dimensi asli
+    TRAPPED_HAPPY = 2  # Ending 2: Terjebak tapi bahagia
+    MERGE_WORLDS = 3  # Ending 3: Menggabungkan dimensi
+    PARADOX_TRUTH = 4  # Ending 4: Plot twist - Clank adalah AI simulasi
+    SACRIFICE_RESET = 5  # Ending 5: Mengorbankan diri untuk reset timeline
+
+CHARACTERS: Tuple[str, ...] = (
+    "Echo",  # AI di dimensi lain
+    "Dr. Maven",  # Ilmuwan misterius
+    "The Observer",  # Entity yang merekam semua dimensi
+)
+_CHARACTER_IDS: Dict[str, int] = {name: index for index, name in enumerate(CHARACTERS)}
+# Rentang level hubungan yang bisa disimpan (array "i", int 32-bit bertanda)
+RELATION_MIN = -2 ** 31
+RELATION_MAX = 2 ** 31 - 1
+
+# Katalog bersama untuk semua sesi di proses ini. Story compiler mendaftarkan
+# semua teks knowledge dan kunci pilihan sesuai urutan cerita.
+KNOWLEDGE: List[str] = []
+_KNOWLEDGE_IDS: Dict[str, int] = {}
+CHOICE_KEYS: List[str] = []
+_CHOICE_KEY_IDS: Dict[str, int] = {}
+
+def intern_knowledge(text: str) -> int:
+    """ID knowledge di katalog bersama (didaftarkan jika belum ada)"""
+    index = _KNOWLEDGE_IDS.get(text)
+    if index is None:
+        index = _KNOWLEDGE_IDS[text] = len(KNOWLEDGE)
+        KNOWLEDGE.append(text)
+    return index
+
+def intern_choice_key(key: str) -> int:
+    """ID kunci pilihan di katalog bersama (didaftarkan jika belum ada)"""
+    index = _CHOICE_KEY_IDS.get(key)
+    if index is None:
+        index = _CHOICE_KEY_IDS[key] = len(CHOICE_KEYS)
+        CHOICE_KEYS.append(key)
+    return index
+
+class _ChoicesView(MutableMapping[str, str]):
+    """choices_made sebagai dict kunci -> nilai pilihan (urut sesuai katalog kunci)"""
+    __slots__ = ("_state",)
+
+    def __init__(self, state: "GameState"):
+        self._state = state
+
+    def __getitem__(self, key: str) -> str:
+        index = _CHOICE_KEY_IDS.get(key)
+        packed = self._state._choices
+        if index is None or index >= len(packed) or not packed[index]:
+            raise KeyError(key)
+        return str(packed[index])
+
+    def __setitem__(self, key: str, value: str) -> None:
+        number = int(value)
+        if not 0 < number < 256:
+            raise ValueError(f"nilai pilihan di luar jangkauan: {value!r}")
+        index = intern_choice_key(key)
+        packed = self._state._choices
+        if index < len(packed):
+            self._state._choices = packed[:index] + bytes((number,)) + packed[index + 1:]
+        else:
+            self._state._choices = packed + bytes(index - len(packed)) + bytes((number,))
+
+    def __delitem__(self, key: str) -> None:
+        self[key]  # KeyError jika belum dipilih
+        index = _CHOICE_KEY_IDS[key]
+        packed = self._state._choices
+        self._state._choices = packed[:index] + b"\0" + packed[index + 1:]
+
+    def __iter__(self) -> Iterator[str]:
+        for index, value in enumerate(self._state._choices):
+            if value:
+                yield CHOICE_KEYS[index]
+
+    def __len__(self) -> int:
+        return len(self._state._choices) - self._state._choices.count(0)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class _KnowledgeView(Sequence[str]):
+    """knowledge sebagai daftar teks, urut sesuai saat dipelajari"""
+    __slots__ = ("_state",)
+
+    def __init__(self, state: "GameState"):
+        self._state = state
+
+    def append(self, text: str) -> None:
+        """Tambah knowledge (sekali saja per teks)"""
+        index = intern_knowledge(text)
+        state = self._state
+        if not state._knowledge >> index & 1:
+            state._knowledge |= 1 << index
+            state._learned += (index,)
+
+    def __contains__(self, text: object) -> bool:
+        index = _KNOWLEDGE_IDS.get(text) if isinstance(text, str) else None
+        return index is not None and bool(self._state._knowledge >> index & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in self._state._learned:
+            yield KNOWLEDGE[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [KNOWLEDGE[item] for item in self._state._learned[index]]
+        return KNOWLEDGE[self._state._learned[index]]
+
+    def __len__(self) -> int:
+        return len(self._state._learned)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+class _RelationshipsView(MutableMapping[str, int]):
+    """relationships sebagai dict karakter -> level (int 32-bit bertanda)"""
+    __slots__ = ("_state",)
+
+    def __init__(self, state: "GameState"):
+        self._state = state
+
+    def __getitem__(self, character: str) -> int:
+        return self._state._relationships[_CHARACTER_IDS[character]]
+
+    def __setitem__(self, character: str, level: int) -> None:
+        self._state._relationships[_CHARACTER_IDS[character]] = level
+
+    def __delitem__(self, character: str) -> None:
+        raise TypeError("karakter di relationships tidak bisa dihapus")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(CHARACTERS)
+
+    def __len__(self) -> int:
+        return len(CHARACTERS)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class GameState:
+    """State permainan untuk tracking pilihan dan plot"""
+    __slots__ = ("_choices", "_knowledge", "_learned", "_relationships", "inventory", "ending_type",
+                 "plot_twist_revealed", "scene", "at_choice")
+
+    def __init__(self):
+        self._choices: bytes = b""
+        self._knowledge: int = 0
+        self._learned: Tuple[int, ...] = ()
+        # Level hubungan RELATION_MIN..RELATION_MAX; di luar itu array menolak dengan OverflowError
+        self._relationships = array("i", bytes(4 * len(CHARACTERS)))
+        self.inventory: Tuple[str, ...] = ()
+        self.ending_type: Optional[EndingType] = None
+        self.plot_twist_revealed: bool = False
+        # Posisi di story graph: node yang sedang dimainkan dan apakah
+        # pemain sedang menunggu di menu pilihan node itu
+        self.scene: Optional[str] = None
+        self.at_choice: bool = False
+
+    @property
+    def choices_made(self) -> MutableMapping[str, str]:
+        """Pilihan pemain per kunci keputusan"""
+        return _ChoicesView(self)
+
+    @property
+    def knowledge(self) -> _KnowledgeView:
+        """Pengetahuan yang sudah dikumpulkan"""
+        return _KnowledgeView(self)
+
+    @property
+    def relationships(self) -> MutableMapping[str, int]:
+        """Level hubungan dengan setiap karakter"""
+        return _RelationshipsView(self)
+
+    def copy(self) -> "GameState":
+        """Salinan independen dari state ini"""
+        clone = GameState.__new__(GameState)
+        clone._choices = self._choices
+        clone._knowledge = self._knowledge
+        clone._learned = self._learned
+        clone._relationships = array("i", self._relationships)
+        clone.inventory = self.inventory
+        clone.ending_type = self.ending_type
+        clone.plot_twist_revealed = self.plot_twist_revealed
+        clone.scene = self.scene
+        clone.at_choice = self.at_choice
+        return clone
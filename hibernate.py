@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hibernasi sesi idle ke disk untuk membatasi memori Engine
+
+Sebagian besar sesi menghabiskan waktunya menunggu pemain di menu pilihan.
+Sesi seperti itu bisa dikeluarkan dari memori: Engine memarkirnya (lihat
+engine.py) dan Hibernator menulis GameState beserta posisi ceritanya
+(state.scene, state.at_choice) ke satu file snapshot kecil per sesi. Input
+berikutnya membaca file itu lagi dan sesi lanjut dari menu yang sama.
+
+Sesi dihibernasi saat:
+
+    idle    pemain tidak mengirim input selama CLANK_INPUT_TIMEOUT detik
+            (dengan CLANK_ON_TIMEOUT=park)
+    LRU     jumlah sesi di memori melebihi CLANK_MAX_RESIDENT; sesi yang
+            paling lama tidak mengirim input dan sedang menunggu di menu
+            dihibernasi tanpa pemberitahuan ke pemain
+
+CLANK_HIBERNATE_DIR menentukan direktori file hibernasi; tanpa variabel itu
+sesi yang diparkir tetap disimpan di memori (hanya state-nya yang ringkas).
+"""
+
+import os
+from typing import Dict, Iterator, Optional, Set
+
+import snapshot
+from game_state import GameState
+
+class Hibernator:
+    """Penyimpanan GameState sesi yang dihibernasi, satu file per sesi"""
+    def __init__(self, directory: str, max_resident: Optional[int] = None):
+        if max_resident is not None and max_resident < 1:
+            raise ValueError("max_resident harus minimal 1")
+        self.directory = directory
+        self.max_resident = max_resident
+        os.makedirs(directory, exist_ok=True)
+        self.sessions: Set[str] = set()
+
+    def path(self, session_id: str) -> str:
+        """File hibernasi untuk sesi `session_id` (id di-encode hex supaya aman sebagai nama file)"""
+        return os.path.join(self.directory, session_id.encode("utf-8").hex() + ".clnk")
+
+    def store(self, session_id: str, state: GameState) -> None:
+        """Tulis state sesi ke disk.
+
+        Tidak di-fsync: hibernasi hanya untuk menghemat memori, pemulihan
+        setelah crash tetap lewat event log.
+        """
+        path = self.path(session_id)
+        temp = f"{path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(snapshot.dumps({session_id: state}))
+        os.replace(temp, path)
+        self.sessions.add(session_id)
+
+    def load(self, session_id: str, keep: bool = False) -> GameState:
+        """Baca state sesi dari disk; filenya dihapus kecuali `keep`"""
+        path = self.path(session_id)
+        with open(path, "rb") as f:
+            state = snapshot.loads(f.read())[session_id]
+        if not keep:
+            self.discard(session_id)
+        return state
+
+    def discard(self, session_id: str) -> None:
+        """Buang file hibernasi sesi (jika ada)"""
+        self.sessions.discard(session_id)
+        try:
+            os.remove(self.path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def states(self) -> Dict[str, GameState]:
+        """State semua sesi yang sedang dihibernasi (file tetap disimpan)"""
+        return {session_id: self.load(session_id, keep=True) for session_id in self.sessions}
+
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self.sessions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.sessions)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+def hibernator_from_env() -> Optional[Hibernator]:
+    """Hibernator dari CLANK_HIBERNATE_DIR dan CLANK_MAX_RESIDENT, atau None"""
+    directory = os.environ.get("CLANK_HIBERNATE_DIR")
+    if not directory:
+        return None
+    max_resident = os.environ.get("CLANK_MAX_RESIDENT")
+    return Hibernator(directory, int(max_resident) if max_resident else None)
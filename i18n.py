@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lokalisasi: tabel string per locale dalam format ringkas yang di-mmap
+
+Kuncinya adalah teks sumber berbahasa Indonesia, persis seperti tertulis di
+file cerita dan render.py (termasuk tag markup), jadi cerita tidak perlu
+diubah untuk diterjemahkan. Terjemahan ditulis sebagai JSON
+content/locale/<locale>.json ({"teks sumber": "terjemahan"}) dan di-compile
+ke format biner .clks::
+
+    b"CLKS" | versi (1 byte) | jumlah string N (4 byte) | digest sumber (4 byte)
+    hash[N]            8 byte per string, urut naik
+    (offset, panjang)  4 + 4 byte per string, urutan sama dengan hash
+    teks               terjemahan UTF-8 berurutan
+
+Semua angka little-endian; hash = crc32 << 32 | adler32 dari teks sumber
+UTF-8 (tabrakan ditolak saat build). Lookup adalah binary search di indeks
+hash langsung dari file yang di-mmap: tidak ada dict per proses, dan halaman
+file dibagi lewat page cache oleh semua worker, jadi memori per worker tidak
+bertambah dengan jumlah locale. Tabel sebuah locale baru dibuka saat locale
+itu pertama kali dipakai.
+
+Hasil compile disimpan di content/locale/__pycache__ dan ditulis ulang jika
+JSON-nya berubah; locale tanpa JSON bisa dikirim sebagai <locale>.clks saja.
+Teks yang belum diterjemahkan tampil dalam bahasa sumber.
+
+Pemakaian: python i18n.py extract [cerita] > template.json
+           python i18n.py build <locale.json> <locale.clks>
+           python i18n.py check <locale> [cerita]
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from render import SOURCE_LOCALE
+
+MAGIC = b"CLKS"
+VERSION = 1
+_HEADER = struct.Struct("<4sBII")
+_HASH = struct.Struct("<Q")
+_ENTRY = struct.Struct("<II")
+_TAG = re.compile(r"\{\w+\}")
+_WORD = re.compile(r"[^\W\d_]")
+_PLACEHOLDER = re.compile(r"\{\w*\}|%s")
+
+LOCALE_DIR = (os.environ.get("CLANK_LOCALE_DIR")
+              or os.path.join(os.path.dirname(os.path.abspath(__file__)), "content", "locale"))
+
+def text_hash(text: str) -> int:
+    """Hash 64-bit teks sumber untuk indeks tabel"""
+    data = text.encode("utf-8")
+    return zlib.crc32(data) << 32 | zlib.adler32(data)
+
+def build(table: Dict[str, str], digest: int = 0) -> bytes:
+    """Encode tabel terjemahan menjadi format .clks; terjemahan kosong dilewati"""
+    entries: Dict[int, Tuple[str, str]] = {}
+    for source, translated in table.items():
+        if not translated:
+            continue
+        key = text_hash(source)
+        if key in entries and entries[key][0] != source:
+            raise ValueError(f"tabrakan hash antara {entries[key][0]!r} dan {source!r}")
+        entries[key] = (source, translated)
+    hashes = bytearray()
+    index = bytearray()
+    text = bytearray()
+    for key in sorted(entries):
+        data = entries[key][1].encode("utf-8")
+        hashes += _HASH.pack(key)
+        index += _ENTRY.pack(len(text), len(data))
+        text += data
+    return _HEADER.pack(MAGIC, VERSION, len(entries), digest) + bytes(hashes) + bytes(index) + bytes(text)
+
+class StringTable:
+    """Tabel string satu locale, dibaca langsung dari buffer (biasanya mmap)"""
+    def __init__(self, buffer: Any):
+        magic, version, count, digest = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("bukan tabel string CLANK")
+        if version != VERSION:
+            raise ValueError(f"versi tabel string tidak didukung: {version}")
+        self.buffer = buffer
+        self.count = count
+        self.digest = digest
+        self._index = _HEADER.size + _HASH.size * count
+        self._text = self._index + _ENTRY.size * count
+
+    @classmethod
+    def open(cls, path: str) -> "StringTable":
+        """Buka file .clks lewat mmap"""
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _find(self, key: int) -> int:
+        """Posisi hash `key` di indeks, atau -1"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found = _HASH.unpack_from(self.buffer, _HEADER.size + _HASH.size * middle)[0]
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def get(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """Terjemahan `text`, atau `default` jika belum diterjemahkan"""
+        position = self._find(text_hash(text))
+        if position < 0:
+            return default
+        offset, size = _ENTRY.unpack_from(self.buffer, self._index + _ENTRY.size * position)
+        start = self._text + offset
+        return self.buffer[start:start + size].decode("utf-8")
+
+    def __contains__(self, text: object) -> bool:
+        return isinstance(text, str) and self._find(text_hash(text)) >= 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        """Tutup mmap-nya"""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+def _compile(locale: str, source: str) -> StringTable:
+    """Tabel dari JSON terjemahan lewat hasil compile di __pycache__"""
+    with open(source, "rb") as f:
+        raw = f.read()
+    digest = zlib.crc32(raw)
+    compiled = os.path.join(os.path.dirname(source), "__pycache__", f"{locale}.clks")
+    try:
+        table = StringTable.open(compiled)
+        if table.digest == digest:
+            return table
+        table.close()
+    except (OSError, ValueError, struct.error):
+        pass
+    data = build(json.loads(raw.decode("utf-8")), digest)
+    temp = f"{compiled}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(compiled), exist_ok=True)
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, compiled)
+    except OSError:
+        # Direktori read-only: pakai hasil compile dari memori
+        return StringTable(data)
+    return StringTable.open(compiled)
+
+@lru_cache(maxsize=None)
+def load_table(locale: str, directory: str = LOCALE_DIR) -> Optional[StringTable]:
+    """Tabel string `locale` (sekali per proses), atau None untuk locale sumber"""
+    if locale == SOURCE_LOCALE:
+        return None
+    source = os.path.join(directory, f"{locale}.json")
+    if os.path.exists(source):
+        return _compile(locale, source)
+    packed = os.path.join(directory, f"{locale}.clks")
+    if os.path.exists(packed):
+        return StringTable.open(packed)
+    raise ValueError(f"locale tidak dikenal: {locale!r}")
+
+def available_locales(directory: str = LOCALE_DIR) -> List[str]:
+    """Locale sumber dan semua locale yang punya tabel di `directory`"""
+    found = {SOURCE_LOCALE}
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            locale, extension = os.path.splitext(name)
+            if extension in (".json", ".clks"):
+                found.add(locale)
+    return sorted(found)
+
+def source_strings(graph: Any) -> Iterator[str]:
+    """Semua teks sumber yang bisa diterjemahkan: teks cerita dan teks render.py"""
+    import render
+
+    for step in render.opening_steps() + render.closing_steps():
+        if step.kind != "pause" and step.text:
+            yield step.text
+    for text in (render.MENU_HEADER_MARKUP, render.CHOICE_PROMPT_MARKUP, render.INVALID_CHOICE_MARKUP,
+                 render.INVALID_NUMBER_MARKUP, render.TIMEOUT_MARKUP, render.PARKED_MARKUP, render.INTERRUPTED_MARKUP,
+                 render.SUMMARY_CHOICE_LINE, render.SUMMARY_KNOWLEDGE_LINE, render.SUMMARY_RELATION_LINE,
+                 render.NEUTRAL):
+        yield text
+    for step in render.summary_steps(_EmptySummary()):
+        if step.kind != "pause" and step.text:
+            yield step.text
+    yield from render.ENDING_LINES.values()
+    for node in graph.nodes.values():
+        steps = list(node.steps) + list(node.after)
+        effects = list(node.effects)
+        if node.choice is not None:
+            for option in node.choice.options:
+                yield option.label
+                steps += option.steps
+                effects += option.effects
+        for step in steps:
+            if step.kind != "pause" and step.text:
+                yield step.text
+        for effect in effects:
+            if effect.op == "learn":
+                yield effect.target
+    for rule in graph.endings.rules if graph.endings is not None else ():
+        for step in rule.steps:
+            if step.kind != "pause" and step.text:
+                yield step.text
+
+class _EmptySummary:
+    """State kosong untuk mengambil baris tetap dari summary_steps"""
+    choices_made: Dict[str, str] = {}
+    knowledge: List[str] = []
+    relationships: Dict[str, int] = {}
+    ending_type = None
+
+def extract(graph: Any) -> Dict[str, str]:
+    """Template terjemahan: setiap teks sumber unik dengan terjemahan kosong.
+
+    Teks tanpa huruf (garis kotak, tag markup saja) tidak perlu diterjemahkan.
+    """
+    return {text: "" for text in source_strings(graph) if _WORD.search(_TAG.sub("", text))}
+
+def check(locale: str, graph: Any) -> Tuple[List[str], List[str], List[str]]:
+    """Teks sumber yang belum diterjemahkan, kunci tabel yang tidak dipakai lagi, dan
+    terjemahan yang tag markup atau placeholder-nya berbeda dari teks sumber"""
+    with open(os.path.join(LOCALE_DIR, f"{locale}.json"), encoding="utf-8") as f:
+        table = json.load(f)
+    wanted = extract(graph)
+    missing = [text for text in wanted if not table.get(text)]
+    stale = [text for text in table if text not in wanted]
+    mismatched = [text for text, translated in table.items()
+                  if translated and sorted(_PLACEHOLDER.findall(text)) != sorted(_PLACEHOLDER.findall(translated))]
+    return missing, stale, mismatched
+
+def main(argv: List[str]) -> int:
+    """Alat command line untuk tabel string"""
+    from story import load_story
+
+    if argv[:1] == ["extract"] and len(argv) <= 2:
+        json.dump(extract(load_story(*argv[1:])), sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return 0
+    if argv[:1] == ["build"] and len(argv) == 3:
+        with open(argv[1], encoding="utf-8") as f:
+            table = json.load(f)
+        data = build(table)
+        with open(argv[2], "wb") as f:
+            f.write(data)
+        print(f"{argv[2]}: {StringTable(data).count} string, {len(data)} byte")
+        return 0
+    if argv[:1] == ["check"] and 2 <= len(argv) <= 3:
+        missing, stale, mismatched = check(argv[1], load_story(*argv[2:]))
+        for text in missing:
+            print(f"belum diterjemahkan: {text!r}")
+        for text in stale:
+            print(f"tidak dipakai: {text!r}")
+        for text in mismatched:
+            print(f"tag/placeholder berbeda: {text!r}")
+        print(f"{argv[1]}: {len(missing)} belum diterjemahkan, {len(stale)} tidak dipakai,"
+              f" {len(mismatched)} tag berbeda")
+        return 1 if missing or mismatched else 0
+    print("pemakaian: python i18n.py extract [cerita] | build <locale.json> <locale.clks>"
+          " | check <locale> [cerita]", file=sys.stderr)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Input pemain: parsing perintah, type-ahead dan kebijakan waktu tunggu
+
+Satu baris input boleh berisi beberapa perintah sekaligus, dipisah spasi,
+koma atau titik koma, misalnya "2 1 s 3". Pemain yang cepat bisa mengantre
+pilihan untuk menu-menu berikutnya tanpa menunggu efek typewriter selesai.
+Perintah skip ("s", "skip", "lewati" atau ">>") menampilkan teks sekaligus
+tanpa jeda sampai ada menu yang benar-benar menunggu input, jadi "s 1 2 3"
+melewati semua teks di antara ketiga pilihan itu.
+
+Waktu tunggu input per sesi diatur lewat InputPolicy (dipakai engine.py):
+CLANK_INPUT_TIMEOUT=<detik> dan CLANK_ON_TIMEOUT=pick|park. "pick" memilih
+opsi pertama secara otomatis, "park" mengeluarkan sesi dari memori sampai
+pemain mengirim input lagi.
+"""
+
+import os
+import re
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional, Union
+
+SKIP = "skip"
+SKIP_WORDS = frozenset(("s", "skip", "lewati", ">>"))
+# Batas antrean type-ahead per sesi; perintah berlebih dibuang
+MAX_TYPEAHEAD = 16
+ON_TIMEOUT = ("pick", "park")
+
+_SEPARATORS = re.compile(r"[\s,;]+")
+
+# Pilihan (int), SKIP, atau teks lain yang tidak valid
+Command = Union[int, str]
+
+def parse_line(line: str) -> List[Command]:
+    """Perintah-perintah dalam satu baris input"""
+    commands: List[Command] = []
+    for word in _SEPARATORS.split(line.strip()):
+        if word.lower() in SKIP_WORDS:
+            commands.append(SKIP)
+            continue
+        try:
+            commands.append(int(word))
+        except ValueError:
+            commands.append(word)
+    return commands
+
+class TypeAhead:
+    """Antrean perintah yang sudah diketik pemain sebelum diminta"""
+    __slots__ = ("pending", "skipping", "limit")
+
+    def __init__(self, limit: int = MAX_TYPEAHEAD):
+        self.pending: Deque[Command] = deque()
+        # True sejak perintah skip diterima sampai ada menu yang menunggu input
+        self.skipping = False
+        self.limit = limit
+
+    def push(self, line: str) -> int:
+        """Parse satu baris dan masukkan ke antrean; kembalikan jumlah perintah yang dibuang"""
+        dropped = 0
+        for command in parse_line(line):
+            if command == SKIP:
+                self.skipping = True
+            elif len(self.pending) < self.limit:
+                self.pending.append(command)
+            else:
+                dropped += 1
+        return dropped
+
+    def at_menu(self) -> None:
+        """Menu pilihan tampil: skip berhenti, kecuali pilihan berikutnya sudah diantre"""
+        if not self.pending:
+            self.skipping = False
+
+    def pop(self) -> Optional[Command]:
+        """Perintah berikutnya, atau None jika antrean kosong"""
+        return self.pending.popleft() if self.pending else None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+class InputPolicy(NamedTuple):
+    """Kebijakan waktu tunggu input untuk setiap menu pilihan"""
+    timeout: Optional[float] = None
+    on_timeout: str = "pick"
+
+    @classmethod
+    def parse(cls, timeout: Optional[str], on_timeout: str = "pick") -> "InputPolicy":
+        """Buat InputPolicy dari teks (mis. nilai variabel lingkungan)"""
+        if on_timeout not in ON_TIMEOUT:
+            raise ValueError(f"aksi timeout tidak dikenal: {on_timeout!r}")
+        seconds = float(timeout) if timeout else None
+        if seconds is not None and seconds <= 0:
+            raise ValueError("timeout input harus lebih dari 0 detik")
+        return cls(seconds, on_timeout)
+
+def policy_from_env() -> InputPolicy:
+    """InputPolicy dari CLANK_INPUT_TIMEOUT dan CLANK_ON_TIMEOUT (default tanpa timeout)"""
+    return InputPolicy.parse(os.environ.get("CLANK_INPUT_TIMEOUT"),
+                             os.environ.get("CLANK_ON_TIMEOUT", "pick").strip().lower())
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Validator statis untuk file cerita CLANK, tanpa memainkan cerita
+
+Memeriksa file cerita JSON (content/clank.json) atau story pack .clkp:
+
+    sintaks      JSON tidak valid, step/effect/syarat yang tidak bisa di-compile
+    markup       teks step say/print/divider yang bukan string, tag yang tidak
+                 dikenal atau kurung kurawal lepas (render akan gagal), tag
+                 warna yang tidak ditutup {end}, markup di label pilihan
+                 (label di-escape, jadi tag-nya tampil apa adanya)
+    referensi    "next" ke node yang tidak ada, pilihan tanpa opsi
+    keterjangkauan  node yang tidak bisa dicapai dari node awal
+    state        syarat rule yang membaca knowledge, kunci pilihan atau nilai
+                 pilihan yang tidak pernah di-set; knowledge dan kunci
+                 pilihan yang di-set tetapi tidak pernah dibaca rule ending
+    ending       EndingType yang tidak pernah di-assign, node resolve tanpa
+                 fallback saat tidak ada rule yang cocok
+
+Semua pemeriksaan linear terhadap ukuran cerita (tidak ada enumerasi jalur
+seperti analyze.py), jadi cukup cepat untuk dijalankan di setiap build.
+
+Pemakaian: python lint.py [--strict] [cerita.json|cerita.clkp ...]
+Exit code 1 jika ada error (atau warning dengan --strict).
+"""
+
+import json
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from game_state import EndingType
+from render import MARKUP
+from story import DEFAULT_STORY, EndingRules, Node, Rule, compile_node, compile_rules
+
+LEVELS = ("error", "warning", "info")
+
+# Token markup: escape {{ }}, tag {nama}, atau kurung kurawal lepas
+_TOKEN = re.compile(r"\{\{|\}\}|\{(\w*)\}|[{}]")
+
+class Problem(NamedTuple):
+    """Satu temuan validator"""
+    level: str
+    where: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.level}: {self.where}: {self.message}"
+
+def check_markup(text: str, opened: Optional[str] = None) -> Tuple[List[Tuple[str, str]], Optional[str]]:
+    """(level, pesan) untuk masalah markup di satu teks step, dan tag warna yang masih terbuka.
+
+    Warna boleh berlanjut ke step berikutnya (satu dialog dipecah ke
+    beberapa step), jadi `opened` adalah tag yang terbuka dari step sebelumnya.
+    """
+    found: List[Tuple[str, str]] = []
+    for match in _TOKEN.finditer(text):
+        token, tag = match.group(0), match.group(1)
+        if token in ("{{", "}}"):
+            continue
+        if tag is None:
+            found.append(("error", f"kurung kurawal lepas {token!r} di kolom {match.start() + 1}"))
+        elif tag not in MARKUP:
+            found.append(("error", f"placeholder tidak dikenal {token!r}"))
+        elif tag == "end":
+            opened = None
+        else:
+            opened = tag
+    return found, opened
+
+def _list(value: Any) -> List[Any]:
+    """`value` jika berupa daftar, selain itu daftar kosong (bentuk yang salah dilaporkan check_shape)"""
+    return value if isinstance(value, list) else []
+
+def _options(raw: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Opsi pilihan mentah yang berbentuk objek"""
+    choice = raw.get("choice")
+    return [option for option in _list(choice.get("options") if isinstance(choice, dict) else None)
+            if isinstance(option, dict)]
+
+def _step_lists(raw: Dict[str, Any]) -> Iterator[Tuple[str, List[Any]]]:
+    """(lokasi, daftar step mentah) untuk semua daftar step di satu node mentah"""
+    for field in ("steps", "after"):
+        yield field, _list(raw.get(field))
+    for option in _options(raw):
+        yield f"opsi {option.get('value')}", _list(option.get("steps"))
+
+def _raw_targets(raw: Any) -> Optional[List[str]]:
+    """Target "next" dari node mentah yang gagal di-compile, atau None jika tidak bisa dibaca"""
+    if not isinstance(raw, dict):
+        return None
+    next_id = raw.get("next")
+    if "choice" not in raw:
+        targets = [next_id]
+    else:
+        choice = raw["choice"]
+        if not isinstance(choice, dict) or not isinstance(choice.get("options"), list):
+            return None
+        if not all(isinstance(option, dict) for option in choice["options"]):
+            return None
+        targets = [option.get("next", next_id) for option in choice["options"]]
+    if not all(target is None or isinstance(target, str) for target in targets):
+        return None
+    return [target for target in targets if target is not None]
+
+# Step yang teksnya di-render sebagai markup
+_TEXT_STEPS = ("say", "print", "divider")
+
+def _step_text(step: Any) -> Optional[str]:
+    """Teks markup sebuah step mentah (None untuk pause atau step tak dikenal)"""
+    if isinstance(step, dict):
+        for kind in _TEXT_STEPS:
+            if isinstance(step.get(kind), str):
+                return step[kind]
+    return None
+
+class Linter:
+    """Pemeriksaan satu cerita mentah; temuan dikumpulkan di `problems`"""
+    def __init__(self):
+        self.problems: List[Problem] = []
+        # Node yang gagal di-compile (id -> data mentah); tetap dianggap ada
+        # oleh pemeriksaan referensi dan keterjangkauan
+        self.broken: Dict[str, Any] = {}
+
+    def report(self, level: str, where: str, message: str) -> None:
+        """Catat satu temuan"""
+        self.problems.append(Problem(level, where, message))
+
+    def lint(self, data: Any) -> List[Problem]:
+        """Periksa data cerita mentah (hasil json.load)"""
+        if not isinstance(data, dict) or not isinstance(data.get("nodes"), dict) or "start" not in data:
+            self.report("error", "cerita", "harus berupa objek dengan 'start' dan 'nodes'")
+            return self.problems
+        if not isinstance(data["start"], str):
+            self.report("error", "cerita", "'start' harus berupa id node (string)")
+            return self.problems
+        nodes = self.compile_nodes(data["nodes"])
+        endings = self.compile_endings(data.get("endings"))
+        self.check_text(data)
+        self.check_references(data["start"], nodes, endings)
+        self.check_reachability(data["start"], nodes, endings)
+        self.check_state(nodes, endings)
+        self.check_endings(data["start"], nodes, endings)
+        return self.problems
+
+    def compile_nodes(self, raw_nodes: Dict[str, Any]) -> Dict[str, Node]:
+        """Compile setiap node sendiri-sendiri supaya satu node rusak tidak menutupi yang lain"""
+        nodes = {}
+        for node_id, raw in raw_nodes.items():
+            where = f"node '{node_id}'"
+            if not self.check_shape(where, raw):
+                self.broken[node_id] = raw
+                continue
+            try:
+                nodes[node_id] = compile_node(node_id, raw)
+            except ValueError as e:
+                self.report("error", where, str(e).replace(f"{where}: ", ""))
+                self.broken[node_id] = raw
+            except (KeyError, TypeError, AttributeError) as e:
+                self.report("error", where, f"struktur tidak valid ({type(e).__name__}: {e})")
+                self.broken[node_id] = raw
+        return nodes
+
+    def check_shape(self, where: str, raw: Any) -> bool:
+        """Tipe field node mentah; False (dengan error) jika node tidak bisa di-compile"""
+        if not isinstance(raw, dict):
+            self.report("error", where, "node harus berupa objek")
+            return False
+        ok = True
+        for field in ("steps", "after", "effects"):
+            if field in raw and not isinstance(raw[field], list):
+                self.report("error", where, f"'{field}' harus berupa daftar")
+                ok = False
+        if raw.get("next") is not None and not isinstance(raw["next"], str):
+            self.report("error", where, "'next' harus berupa id node (string)")
+            ok = False
+        if "choice" not in raw:
+            return ok
+        choice = raw["choice"]
+        if not isinstance(choice, dict):
+            self.report("error", where, "'choice' harus berupa objek")
+            return False
+        if not isinstance(choice.get("options"), list):
+            self.report("error", where, "'choice.options' harus berupa daftar")
+            return False
+        for number, option in enumerate(choice["options"], 1):
+            if not isinstance(option, dict):
+                self.report("error", where, f"opsi #{number} harus berupa objek")
+                ok = False
+                continue
+            for field in ("steps", "effects"):
+                if field in option and not isinstance(option[field], list):
+                    self.report("error", f"{where} (opsi #{number})", f"'{field}' harus berupa daftar")
+                    ok = False
+            if option.get("next") is not None and not isinstance(option["next"], str):
+                self.report("error", f"{where} (opsi #{number})", "'next' harus berupa id node (string)")
+                ok = False
+        return ok
+
+    def compile_endings(self, raw: Any) -> Optional[EndingRules]:
+        """Compile rule ending; None jika tidak ada atau rusak"""
+        if raw is None:
+            return None
+        if not isinstance(raw, list) or not all(isinstance(rule, dict) for rule in raw):
+            self.report("error", "endings", "harus berupa daftar rule (objek)")
+            return None
+        try:
+            return compile_rules(raw)
+        except ValueError as e:
+            self.report("error", "endings", str(e))
+        except (KeyError, TypeError, AttributeError) as e:
+            self.report("error", "endings", f"struktur tidak valid ({type(e).__name__}: {e})")
+        return None
+
+    def check_text(self, data: Dict[str, Any]) -> None:
+        """Tipe dan markup semua teks step, serta markup di label pilihan"""
+        sources: List[Tuple[str, List[Any]]] = []
+        for node_id, raw in data["nodes"].items():
+            if not isinstance(raw, dict):
+                continue
+            for field, steps in _step_lists(raw):
+                sources.append((f"node '{node_id}' ({field})", steps))
+            for option in _options(raw):
+                label = option.get("label")
+                if isinstance(label, str) and _TOKEN.search(label):
+                    self.report("warning", f"node '{node_id}' (opsi {option.get('value')})",
+                                f"label berisi markup yang akan tampil apa adanya: {label!r}")
+        for number, rule in enumerate(_list(data.get("endings")), 1):
+            if isinstance(rule, dict):
+                sources.append((f"rule ending #{number}", _list(rule.get("steps"))))
+        for where, steps in sources:
+            opened = None
+            for step in steps:
+                for kind in _TEXT_STEPS:
+                    # Lolos compile, tapi render gagal saat step dimainkan
+                    if isinstance(step, dict) and kind in step and not isinstance(step[kind], str):
+                        self.report("error", where, f"teks step '{kind}' harus berupa string, "
+                                                    f"bukan {type(step[kind]).__name__}: {step[kind]!r}")
+                text = _step_text(step)
+                if text is not None:
+                    found, opened = check_markup(text, opened)
+                    for level, message in found:
+                        self.report(level, where, message)
+            if opened is not None:
+                self.report("warning", where, f"tag {{{opened}}} tidak ditutup dengan {{end}}")
+
+    def check_references(self, start: str, nodes: Dict[str, Node], endings: Optional[EndingRules]) -> None:
+        """Node awal, target "next" dan pilihan yang kosong"""
+        known = set(nodes) | set(self.broken)
+        if start not in known:
+            self.report("error", "cerita", f"node awal tidak dikenal '{start}'")
+        for node in nodes.values():
+            where = f"node '{node.id}'"
+            if node.choice is not None:
+                if not node.choice.options:
+                    self.report("error", where, "pilihan tanpa opsi (sesi akan menunggu selamanya)")
+                for option in node.choice.options:
+                    if option.next is not None and option.next not in known:
+                        self.report("error", f"{where} (opsi {option.value})",
+                                    f"merujuk ke node tidak dikenal '{option.next}'")
+                if node.resolve:
+                    self.report("error", where, "node resolve tidak boleh punya pilihan")
+            elif node.next is not None and node.next not in known:
+                self.report("error", where, f"merujuk ke node tidak dikenal '{node.next}'")
+            if node.resolve and endings is None:
+                self.report("error", where, "memakai resolve tetapi cerita tidak punya rule ending")
+        for number, rule in enumerate(endings.rules if endings is not None else (), 1):
+            if rule.next is not None and rule.next not in known:
+                self.report("error", f"rule ending #{number}", f"merujuk ke node tidak dikenal '{rule.next}'")
+
+    def check_reachability(self, start: str, nodes: Dict[str, Node], endings: Optional[EndingRules]) -> None:
+        """Node yang tidak bisa dicapai dari node awal (tanpa melihat state)"""
+        known = set(nodes) | set(self.broken)
+        if start not in known:
+            return
+        rule_targets = [rule.next for rule in endings.rules] if endings is not None else []
+        seen = {start}
+        pending = [start]
+        # Target node rusak yang tidak bisa dibaca membuat hasilnya tidak lengkap
+        complete = True
+        while pending:
+            node_id = pending.pop()
+            node = nodes.get(node_id)
+            if node is None:
+                raw = self.broken[node_id]
+                readable = _raw_targets(raw)
+                if readable is None:
+                    complete = False
+                    continue
+                targets: List[Optional[str]] = list(readable)
+                if raw.get("resolve"):
+                    targets += rule_targets
+            else:
+                targets = [node.next] if node.choice is None else [option.next for option in node.choice.options]
+                if node.resolve:
+                    targets += rule_targets
+            for target in targets:
+                if target is not None and target not in seen and target in known:
+                    seen.add(target)
+                    pending.append(target)
+        if not complete:
+            self.report("info", "cerita", "keterjangkauan tidak diperiksa: ada node rusak yang target-nya"
+                                          " tidak bisa dibaca")
+            return
+        for node_id in known:
+            if node_id not in seen:
+                self.report("warning", f"node '{node_id}'", "tidak terjangkau dari node awal")
+
+    def check_state(self, nodes: Dict[str, Node], endings: Optional[EndingRules]) -> None:
+        """State yang dibaca tetapi tidak pernah di-set, atau di-set tetapi tidak pernah dibaca"""
+        learned: Dict[str, str] = {}
+        values: Dict[str, Set[int]] = {}
+        related: Set[str] = set()
+        revealed = False
+        for node in nodes.values():
+            effects = list(node.effects)
+            if node.choice is not None:
+                effects += [effect for option in node.choice.options for effect in option.effects]
+                if node.choice.key is not None:
+                    if node.choice.key in values:
+                        self.report("warning", f"node '{node.id}'",
+                                    f"kunci pilihan {node.choice.key!r} juga dipakai node lain")
+                    values.setdefault(node.choice.key, set()).update(o.value for o in node.choice.options)
+            for effect in effects:
+                if effect.op == "learn":
+                    learned.setdefault(effect.target, node.id)
+                elif effect.op in ("relate", "set"):
+                    related.add(effect.target)
+                elif effect.op == "reveal":
+                    revealed = True
+        if endings is None:
+            return
+        for number, rule in enumerate(endings.rules, 1):
+            where = f"rule ending #{number}"
+            for condition in rule.conditions:
+                if condition.field == "knows" and condition.key not in learned:
+                    self.report("error", where, f"knowledge tidak pernah dipelajari {condition.key!r}")
+                elif condition.field == "chose":
+                    if condition.key not in values:
+                        self.report("error", where, f"kunci pilihan tidak dikenal {condition.key!r}")
+                    elif condition.low not in values[condition.key]:
+                        self.report("error", where,
+                                    f"pilihan {condition.key!r} tidak punya nilai {condition.low}")
+                elif condition.field == "relation" and condition.low > condition.high:
+                    self.report("error", where, f"rentang hubungan {condition.key!r} kosong "
+                                f"(min {condition.low} > max {condition.high}), syarat ini tidak pernah terpenuhi")
+                elif condition.field == "relation" and condition.key not in related:
+                    self.report("warning", where,
+                                f"hubungan {condition.key!r} tidak pernah diubah, syarat ini selalu bernilai sama")
+                elif condition.field == "revealed" and not revealed:
+                    self.report("warning", where, "plot twist tidak pernah di-reveal")
+        read = endings.reads
+        for text, node_id in learned.items():
+            if ("knows", text) not in read:
+                self.report("info", f"node '{node_id}'", f"knowledge tidak dibaca rule ending: {text!r}")
+        for key in values:
+            if ("chose", key) not in read:
+                self.report("info", "endings", f"kunci pilihan tidak dibaca rule ending: {key!r}")
+
+    def check_endings(self, start: str, nodes: Dict[str, Node], endings: Optional[EndingRules]) -> None:
+        """EndingType yang tidak pernah di-assign dan node resolve yang bisa tidak menemukan rule"""
+        assigned: Set[str] = set()
+        for node in nodes.values():
+            effects = list(node.effects)
+            if node.choice is not None:
+                effects += [effect for option in node.choice.options for effect in option.effects]
+            assigned.update(effect.target for effect in effects if effect.op == "ending")
+        rules = endings.rules if endings is not None else ()
+        assigned.update(rule.ending for rule in rules)
+        for ending in EndingType:
+            if ending.name not in assigned:
+                self.report("warning", "endings", f"EndingType.{ending.name} tidak pernah di-assign")
+        for number, rule in enumerate(rules, 1):
+            for condition in rule.conditions:
+                if condition.field == "ending" and condition.key not in assigned:
+                    self.report("error", f"rule ending #{number}",
+                                f"syarat ending {condition.key} tidak pernah di-assign")
+        if any(not rule.conditions for rule in rules) or start not in nodes:
+            return
+        # Rule yang hanya bersyarat ending yang dituju selalu cocok untuk ending itu
+        covered = {rule.conditions[0].key for rule in rules
+                   if len(rule.conditions) == 1 and rule.conditions[0].field == "ending"}
+        for node_id, intents in self.intents(start, nodes, rules).items():
+            node = nodes[node_id]
+            missing = sorted(intent or "(belum ada)" for intent in intents if intent not in covered)
+            if node.resolve and node.next is None and missing:
+                self.report("warning", f"node '{node_id}'",
+                            "resolve tanpa 'next' bisa tidak menemukan rule yang cocok (cerita berhenti tanpa"
+                            " ending) untuk ending yang dituju: " + ", ".join(missing))
+
+    @staticmethod
+    def intents(start: str, nodes: Dict[str, Node], rules: Iterable[Rule] = ()) -> Dict[str, Set[Optional[str]]]:
+        """Ending yang mungkin sedang dituju pemain saat memasuki setiap node.
+
+        Dataflow sederhana di atas graph: setiap node menyimpan himpunan nama
+        ending (None = belum ada), jadi biayanya linear terhadap ukuran graph
+        kali jumlah EndingType.
+        """
+        entering: Dict[str, Set[Optional[str]]] = {start: {None}}
+        pending = [start]
+        while pending:
+            node = nodes[pending.pop()]
+            intents = set(entering[node.id])
+            for effect in node.effects:
+                if effect.op == "ending":
+                    intents = {effect.target}
+            if node.choice is None:
+                branches = [(intents, node.next)]
+            else:
+                branches = []
+                for option in node.choice.options:
+                    chosen = intents
+                    for effect in option.effects:
+                        if effect.op == "ending":
+                            chosen = {effect.target}
+                    branches.append((chosen, option.next))
+            if node.resolve:
+                branches += [({rule.ending}, rule.next) for rule in rules]
+            for flowing, target in branches:
+                if target is None or target not in nodes:
+                    continue
+                known = entering.setdefault(target, set())
+                if not flowing <= known:
+                    known |= flowing
+                    pending.append(target)
+        return entering
+
+def lint_data(data: Any) -> List[Problem]:
+    """Temuan validator untuk data cerita mentah"""
+    return Linter().lint(data)
+
+def lint_file(path: str) -> List[Problem]:
+    """Temuan validator untuk file cerita JSON atau story pack .clkp"""
+    try:
+        if path.endswith(".clkp"):
+            import pack
+            data = pack.read_raw(path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+    except json.JSONDecodeError as e:
+        return [Problem("error", f"baris {e.lineno} kolom {e.colno}", f"JSON tidak valid: {e.msg}")]
+    except (OSError, ValueError) as e:
+        return [Problem("error", "file", str(e))]
+    return lint_data(data)
+
+def main(argv: List[str]) -> int:
+    """Validasi file cerita dari command line"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Validator statis file cerita CLANK")
+    parser.add_argument("stories", nargs="*", default=[DEFAULT_STORY], help="file cerita .json atau .clkp")
+    parser.add_argument("--strict", action="store_true", help="warning juga dianggap gagal")
+    parser.add_argument("--quiet", action="store_true", help="jangan tampilkan temuan level info")
+    args = parser.parse_args(argv)
+    failed = False
+    for path in args.stories:
+        started = time.perf_counter()
+        problems = lint_file(path)
+        elapsed = time.perf_counter() - started
+        counts = {level: 0 for level in LEVELS}
+        for problem in problems:
+            counts[problem.level] += 1
+            if not (args.quiet and problem.level == "info"):
+                print(f"{path}: {problem}")
+        print(f"{path}: {counts['error']} error, {counts['warning']} warning, {counts['info']} info"
+              f" ({elapsed * 1000:.1f} ms)")
+        failed = failed or counts["error"] > 0 or (args.strict and counts["warning"] > 0)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
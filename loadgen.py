@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Generator beban: banyak pemain sintetis memainkan cerita sampai ringkasan ending
+
+Setiap pemain sintetis membuka satu sesi dan membaca output seperti pemain
+manusia: menu pilihan adalah baris "N. label" terakhir sebelum prompt. Setelah
+menunggu sesuai think time, pemain mengirim pilihan dari policy-nya:
+
+    random          semua opsi di menu dengan peluang sama
+    weighted:W,...  opsi ke-i di menu dipilih dengan bobot W ke-i (sisanya 1)
+    scripted[:E]    jalur pilihan menuju ending E (lihat analyze.find_path);
+                    tanpa E pemain dibagi rata ke semua ending yang terjangkau
+
+Think time (detik): N | const:S | uniform:A:B | exp:RATA2 | lognormal:MU:SIGMA
+
+Target:
+
+    inproc      Engine di proses yang sama (tanpa jaringan)
+    tcp         Server (server.py) di proses yang sama lewat socket loopback
+    HOST:PORT   server TCP yang sudah berjalan
+
+Laporan berisi throughput (sesi dan pilihan per detik), persentil latensi
+(byte pertama setelah pilihan, sampai menu berikutnya siap, durasi sesi) dan
+jumlah error per jenis:
+
+    connect     koneksi ke target gagal
+    timeout     tidak ada prompt atau akhir sesi dalam --timeout detik
+    disconnect  sesi berakhir sebelum ringkasan ending
+    menu        prompt datang tanpa menu pilihan yang bisa dibaca
+    script      menu tidak cocok dengan jalur policy scripted
+    rejected    pilihan dari menu ditolak sebagai tidak valid
+
+Pemakaian: python loadgen.py [--players N] [--concurrency C] [--policy P]
+                             [--think T] [--target inproc|tcp|HOST:PORT]
+"""
+
+import asyncio
+import itertools
+import random
+import re
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from game_state import EndingType
+from render import (ANSI_ESCAPE, BACKENDS, ENDING_LINES, Pacing, escape_markup, get_renderer,
+                    pacing_from_env)
+from story import StoryGraph, load_story
+
+_OPTION = re.compile(r"^\s*(\d+)\. ")
+# Jumlah parameter per jenis distribusi ThinkTime
+_THINK_KINDS: Dict[str, int] = {"const": 1, "uniform": 2, "exp": 1, "lognormal": 2}
+
+Receive = Callable[[bytes], None]
+
+class ScriptDiverged(Exception):
+    """Menu yang ditampilkan tidak memuat pilihan berikutnya dari script"""
+
+class ThinkTime(NamedTuple):
+    """Distribusi waktu berpikir pemain sebelum mengirim pilihan"""
+    kind: str
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Satu sampel waktu berpikir dalam detik"""
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "exp":
+            return rng.expovariate(1 / self.a) if self.a > 0 else 0.0
+        if self.kind == "lognormal":
+            return rng.lognormvariate(self.a, self.b)
+        return self.a
+
+    @classmethod
+    def parse(cls, value: str) -> "ThinkTime":
+        """Buat ThinkTime dari '0.5', 'const:S', 'uniform:A:B', 'exp:RATA2' atau 'lognormal:MU:SIGMA'"""
+        kind, *params = value.strip().lower().split(":")
+        try:
+            if not params:
+                return cls("const", float(kind))
+            if _THINK_KINDS.get(kind) != len(params):
+                raise ValueError
+            numbers = [float(param) for param in params]
+        except ValueError:
+            raise ValueError(f"think time tidak dikenal: {value!r}") from None
+        if kind != "lognormal" and min(numbers) < 0:
+            raise ValueError(f"think time tidak boleh negatif: {value!r}")
+        return cls(kind, *numbers)
+
+class Policy:
+    """Cara pemain sintetis memilih opsi dari menu"""
+    def choose(self, options: Sequence[int], turn: int, rng: random.Random) -> int:
+        """Nilai opsi untuk pilihan ke-`turn` (mulai 0) dari menu `options`"""
+        raise NotImplementedError
+
+class RandomPolicy(Policy):
+    """Opsi acak dengan peluang sama"""
+    def choose(self, options: Sequence[int], turn: int, rng: random.Random) -> int:
+        return rng.choice(options)
+
+class WeightedPolicy(Policy):
+    """Opsi acak dengan bobot per posisi di menu"""
+    def __init__(self, weights: Sequence[float]):
+        if not weights or min(weights) < 0 or not any(weights):
+            raise ValueError("bobot harus tidak negatif dan tidak semuanya 0")
+        self.weights = list(weights)
+
+    def choose(self, options: Sequence[int], turn: int, rng: random.Random) -> int:
+        weights = [self.weights[i] if i < len(self.weights) else 1.0 for i in range(len(options))]
+        if not any(weights):
+            return rng.choice(options)
+        return rng.choices(options, weights)[0]
+
+class ScriptedPolicy(Policy):
+    """Urutan pilihan tetap menuju satu ending"""
+    def __init__(self, script: Sequence[int], ending: Optional[EndingType] = None):
+        self.script = tuple(script)
+        self.ending = ending
+
+    def choose(self, options: Sequence[int], turn: int, rng: random.Random) -> int:
+        if turn >= len(self.script) or self.script[turn] not in options:
+            raise ScriptDiverged(f"pilihan ke-{turn + 1} tidak ada di menu {list(options)}")
+        return self.script[turn]
+
+def policy_factory(spec: str, graph: Optional[StoryGraph] = None) -> Callable[[int], Policy]:
+    """Fungsi nomor pemain -> Policy dari spesifikasi command line"""
+    kind, _, arguments = spec.strip().partition(":")
+    if kind == "random" and not arguments:
+        policy: Policy = RandomPolicy()
+        return lambda index: policy
+    if kind == "weighted":
+        try:
+            weighted = WeightedPolicy([float(weight) for weight in arguments.split(",")])
+        except ValueError:
+            raise ValueError(f"bobot tidak valid: {arguments!r}") from None
+        return lambda index: weighted
+    if kind == "scripted":
+        from analyze import find_path
+
+        graph = graph or load_story()
+        if arguments:
+            try:
+                endings = [EndingType[arguments.upper()]]
+            except KeyError:
+                raise ValueError(f"ending tidak dikenal: {arguments!r}") from None
+        else:
+            endings = list(EndingType)
+        scripted = []
+        for ending in endings:
+            path = find_path(graph, ending)
+            if path is not None:
+                scripted.append(ScriptedPolicy(path, ending))
+        if not scripted:
+            raise ValueError(f"ending tidak terjangkau: {', '.join(ending.name for ending in endings)}")
+        return lambda index: scripted[index % len(scripted)]
+    raise ValueError(f"policy tidak dikenal: {spec!r}")
+
+def menu_options(text: str) -> List[int]:
+    """Nilai opsi dari menu terakhir di output (tanpa kode ANSI), atau [] jika tidak ada"""
+    lines = text.rstrip().splitlines()
+    while lines and not _OPTION.match(lines[-1]):
+        lines.pop()  # prompt dan baris kosong setelah menu
+    options: List[int] = []
+    while lines:
+        match = _OPTION.match(lines.pop())
+        if match is None:
+            break
+        options.append(int(match.group(1)))
+    return options[::-1]
+
+class Markers(NamedTuple):
+    """Potongan output yang dikenali pemain sintetis, untuk semua profil dan locale"""
+    prompts: Tuple[bytes, ...]
+    rejected: Tuple[bytes, ...]
+    endings: Tuple[Tuple[bytes, EndingType], ...]
+
+    @classmethod
+    def build(cls) -> "Markers":
+        """Marker untuk setiap kombinasi profil terminal dan locale"""
+        from i18n import available_locales
+
+        renderers = [get_renderer(profile, locale) for profile in BACKENDS for locale in available_locales()]
+        endings = {renderer.encode("{green}" + escape_markup(renderer.tr(line)) + "{end}"): ending
+                   for renderer in renderers for ending, line in ENDING_LINES.items()}
+        return cls(tuple({renderer.prompt for renderer in renderers}),
+                   tuple({renderer.invalid_choice for renderer in renderers}),
+                   tuple(endings.items()))
+
+    def ending(self, data: bytes) -> Optional[EndingType]:
+        """Ending yang baris ringkasannya ada di `data`"""
+        for marker, ending in self.endings:
+            if marker in data:
+                return ending
+        return None
+
+class Connection:
+    """Satu sesi pemain sintetis di target"""
+    def send(self, line: str) -> None:
+        """Kirim satu baris input"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Akhiri sesi (jika masih berjalan)"""
+        raise NotImplementedError
+
+class _EngineConnection(Connection):
+    def __init__(self, engine: Any, session_id: str):
+        self.engine = engine
+        self.session_id = session_id
+
+    def send(self, line: str) -> None:
+        if self.session_id in self.engine:
+            self.engine.send(self.session_id, line)
+
+    def close(self) -> None:
+        self.engine.stop(self.session_id)
+
+class _TcpConnection(Connection):
+    def __init__(self, writer: asyncio.StreamWriter, reading: "asyncio.Task[None]"):
+        self.writer = writer
+        self.reading = reading
+
+    def send(self, line: str) -> None:
+        if not self.writer.is_closing():
+            self.writer.write(line.encode("utf-8") + b"\n")
+
+    def close(self) -> None:
+        self.reading.cancel()
+        self.writer.close()
+
+class InProcessTarget:
+    """Target: Engine di proses yang sama, output langsung dari callback write"""
+    def __init__(self, engine: Any):
+        self.engine = engine
+        self.ids = itertools.count(1)
+
+    async def open(self, receive: Receive, closed: Callable[[], None]) -> Connection:
+        """Mulai satu sesi; `closed` dipanggil saat sesinya selesai"""
+        session_id = f"load-{next(self.ids)}"
+        self.engine.start(session_id, receive)
+
+        async def finish() -> None:
+            await self.engine.wait(session_id)
+            closed()
+
+        asyncio.get_running_loop().create_task(finish())
+        return _EngineConnection(self.engine, session_id)
+
+    async def close(self) -> None:
+        """Tidak ada yang perlu ditutup"""
+
+class TcpTarget:
+    """Target: server TCP berbasis baris (server.py)"""
+    def __init__(self, host: str, port: int, server: Any = None):
+        self.host = host
+        self.port = port
+        self.server = server
+
+    async def open(self, receive: Receive, closed: Callable[[], None]) -> Connection:
+        """Buka satu koneksi; `closed` dipanggil saat server menutupnya"""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+
+        async def pump() -> None:
+            try:
+                while True:
+                    data = await reader.read(65536)
+                    if not data:
+                        break
+                    receive(data)
+            except ConnectionError:
+                pass
+            finally:
+                closed()
+
+        return _TcpConnection(writer, asyncio.get_running_loop().create_task(pump()))
+
+    async def close(self) -> None:
+        """Hentikan server lokal (jika target ini yang menjalankannya)"""
+        if self.server is not None:
+            await self.server.close()
+
+async def open_target(spec: str, graph: StoryGraph, pacing: Pacing) -> Any:
+    """Target dari 'inproc', 'tcp' atau 'HOST:PORT'"""
+    if spec in ("inproc", "tcp"):
+        from engine import Engine
+
+        engine = Engine(graph, pacing=pacing)
+        if spec == "inproc":
+            return InProcessTarget(engine)
+        from server import Server
+
+        server = Server(engine)
+        await server.serve("127.0.0.1", 0)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        return TcpTarget("127.0.0.1", port, server)
+    host, _, port = spec.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"target tidak dikenal: {spec!r}")
+    return TcpTarget(host, int(port))
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Persentil (nearest-rank) dari daftar nilai"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+class Stats:
+    """Hasil pengukuran semua pemain sintetis"""
+    def __init__(self):
+        self.players = 0
+        self.completed = 0
+        self.choices = 0
+        self.retries = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self.first_byte: List[float] = []
+        self.turn: List[float] = []
+        self.session: List[float] = []
+        self.errors: Counter = Counter()
+        self.endings: Counter = Counter()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Ringkasan dalam bentuk yang bisa di-dump ke JSON"""
+        elapsed = self.elapsed or float("inf")
+
+        def latency(values: List[float]) -> Dict[str, float]:
+            return {name: round(_percentile(values, fraction) * 1000, 3)
+                    for name, fraction in (("p50_ms", 0.50), ("p90_ms", 0.90), ("p99_ms", 0.99), ("max_ms", 1.0))}
+
+        failed = sum(self.errors.values())
+        return {
+            "players": self.players,
+            "completed": self.completed,
+            "failed": failed,
+            "error_rate": round(failed / self.players, 4) if self.players else 0.0,
+            "elapsed_s": round(self.elapsed, 3),
+            "sessions_per_sec": round(self.completed / elapsed, 2),
+            "choices_per_sec": round(self.choices / elapsed, 2),
+            "bytes_per_sec": round(self.bytes / elapsed, 1),
+            "retries": self.retries,
+            "first_byte": latency(self.first_byte),
+            "turn": latency(self.turn),
+            "session": latency(self.session),
+            "errors": dict(self.errors.most_common()),
+            "endings": {ending.name: count for ending, count in self.endings.most_common()},
+        }
+
+class Player:
+    """Satu pemain sintetis: baca menu, tunggu think time, kirim pilihan"""
+    def __init__(self, policy: Policy, think: ThinkTime, rng: random.Random, markers: Markers,
+                 stats: Stats, timeout: float, typo: float = 0.0):
+        self.policy = policy
+        self.think = think
+        self.rng = rng
+        self.markers = markers
+        self.stats = stats
+        self.timeout = timeout
+        self.typo = typo
+        # Output sejak input terakhir
+        self.buffer = bytearray()
+        self.ready = asyncio.Event()
+        self.eof = False
+        self.sent_at: Optional[float] = None
+        self.first_byte: Optional[float] = None
+
+    def receive(self, data: bytes) -> None:
+        """Output dari target"""
+        if self.sent_at is not None and self.first_byte is None:
+            self.first_byte = time.perf_counter()
+        self.buffer += data
+        self.stats.bytes += len(data)
+        self.ready.set()
+
+    def closed(self) -> None:
+        """Target mengakhiri sesi"""
+        self.eof = True
+        self.ready.set()
+
+    def _answered(self) -> None:
+        """Catat latensi jawaban atas input terakhir"""
+        if self.sent_at is not None:
+            now = time.perf_counter()
+            self.stats.first_byte.append((self.first_byte or now) - self.sent_at)
+            self.stats.turn.append(now - self.sent_at)
+            self.sent_at = None
+
+    async def play(self, target: Any) -> Optional[str]:
+        """Mainkan satu sesi penuh; kembalikan jenis error atau None jika sampai ending"""
+        started = time.perf_counter()
+        try:
+            connection = await target.open(self.receive, self.closed)
+        except OSError:
+            return "connect"
+        turn = 0
+        options: List[int] = []
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self.ready.wait(), self.timeout)
+                except asyncio.TimeoutError:
+                    return "timeout"
+                self.ready.clear()
+                if self.buffer.endswith(self.markers.prompts):
+                    self._answered()
+                    data = bytes(self.buffer)
+                    self.buffer.clear()
+                    if turn and any(marker in data for marker in self.markers.rejected):
+                        return "rejected"
+                    options = menu_options(ANSI_ESCAPE.sub("", data.decode("utf-8", "replace"))) or options
+                    if not options:
+                        return "menu"
+                    await asyncio.sleep(self.think.sample(self.rng))
+                    if self.typo and self.rng.random() < self.typo:
+                        line = "?"
+                        self.stats.retries += 1
+                    else:
+                        try:
+                            line = str(self.policy.choose(options, turn, self.rng))
+                        except ScriptDiverged:
+                            return "script"
+                        turn += 1
+                        self.stats.choices += 1
+                    self.sent_at = time.perf_counter()
+                    self.first_byte = None
+                    connection.send(line)
+                elif self.eof:
+                    self._answered()
+                    ending = self.markers.ending(bytes(self.buffer))
+                    if ending is None:
+                        return "disconnect"
+                    self.stats.endings[ending] += 1
+                    self.stats.session.append(time.perf_counter() - started)
+                    return None
+        finally:
+            connection.close()
+
+async def run_load(target: Any, players: int, policy_for: Callable[[int], Policy],
+                   think: ThinkTime = ThinkTime("const"), concurrency: Optional[int] = None,
+                   ramp: float = 0.0, timeout: float = 30.0, typo: float = 0.0, seed: int = 0) -> Stats:
+    """Jalankan `players` pemain sintetis, paling banyak `concurrency` sekaligus.
+
+    Pemain ke-i mulai paling cepat i * ramp / players detik setelah awal.
+    """
+    markers = Markers.build()
+    stats = Stats()
+    limit = asyncio.Semaphore(concurrency or players)
+
+    async def one(index: int) -> None:
+        if ramp:
+            await asyncio.sleep(index * ramp / players)
+        async with limit:
+            player = Player(policy_for(index), think, random.Random(f"{seed}-{index}"), markers, stats,
+                            timeout, typo)
+            error = await player.play(target)
+        stats.players += 1
+        if error is None:
+            stats.completed += 1
+        else:
+            stats.errors[error] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(players)))
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+def format_report(stats: Stats) -> str:
+    """Laporan beban dalam bentuk teks"""
+    result = stats.as_dict()
+    lines = [
+        f"Pemain: {result['players']} (selesai {result['completed']}, gagal {result['failed']},"
+        f" error rate {result['error_rate']:.2%})",
+        f"Waktu: {result['elapsed_s']:.2f} s",
+        f"Throughput: {result['sessions_per_sec']:.1f} sesi/s, {result['choices_per_sec']:.1f} pilihan/s,"
+        f" {result['bytes_per_sec'] / 1024:.1f} KiB/s",
+        f"Input tidak valid disengaja: {result['retries']}",
+        "",
+        f"{'Latensi (ms)':<24} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}",
+    ]
+    for name, label in (("first_byte", "byte pertama"), ("turn", "sampai menu berikutnya"),
+                        ("session", "durasi sesi")):
+        values = result[name]
+        lines.append(f"  {label:<22} " + " ".join(f"{values[key]:>9.2f}"
+                                                   for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms")))
+    if result["endings"]:
+        lines += ["", "Ending:"] + [f"  {name:<16} {count:>7}" for name, count in result["endings"].items()]
+    if result["errors"]:
+        lines += ["", "Error:"] + [f"  {name:<16} {count:>7}" for name, count in result["errors"].items()]
+    return "\n".join(lines)
+
+async def _run(args) -> Stats:
+    graph = load_story(args.story) if args.story else load_story()
+    policy_for = policy_factory(args.policy, graph)
+    pacing = Pacing.parse(args.pacing) if args.pacing else pacing_from_env()
+    target = await open_target(args.target, graph, pacing)
+    try:
+        return await run_load(target, args.players, policy_for, ThinkTime.parse(args.think), args.concurrency,
+                              args.ramp, args.timeout, args.typo, args.seed)
+    finally:
+        await target.close()
+
+def main(argv: List[str]) -> int:
+    """Jalankan generator beban dari command line"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Generator beban pemain sintetis CLANK")
+    parser.add_argument("--target", default="inproc", help="inproc, tcp (server lokal) atau HOST:PORT")
+    parser.add_argument("--players", type=int, default=100, help="jumlah pemain sintetis")
+    parser.add_argument("--concurrency", type=int, help="sesi bersamaan paling banyak (default semua pemain)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="sebar mulainya pemain selama N detik")
+    parser.add_argument("--policy", default="random", help="random, weighted:W,... atau scripted[:ENDING]")
+    parser.add_argument("--think", default="0", help="think time, mis. 0.5, uniform:1:3 atau exp:2")
+    parser.add_argument("--typo", type=float, default=0.0, help="peluang mengirim input tidak valid")
+    parser.add_argument("--timeout", type=float, default=30.0, help="batas tunggu output per giliran (detik)")
+    parser.add_argument("--pacing", default="instant",
+                        help="pacing Engine lokal untuk target inproc/tcp (default instant)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--story", help="file cerita (default content/clank.json)")
+    parser.add_argument("--json", metavar="FILE", help="tulis hasil ke file JSON")
+    args = parser.parse_args(argv)
+    if args.players < 1 or (args.concurrency is not None and args.concurrency < 1):
+        parser.error("--players dan --concurrency harus minimal 1")
+    try:
+        stats = asyncio.run(_run(args))
+    except ValueError as error:
+        parser.error(str(error))
+    print(format_report(stats))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats.as_dict(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    return 1 if stats.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
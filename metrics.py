@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentasi hot path: waktu, byte, tunggu input dan retry per scene
+
+Semua titik instrumentasi dijaga dengan `if METRICS.enabled:`, jadi saat
+dimatikan biayanya hanya satu pengecekan atribut. Bisa dinyalakan dan
+dimatikan kapan saja selama proses berjalan::
+
+    from metrics import METRICS
+    METRICS.enable()
+    ...
+    METRICS.snapshot()          # dict untuk dilihat di proses
+    METRICS.dump("metrics.json")  # untuk analisis offline
+
+Set CLANK_METRICS=<file> untuk menyalakan dari luar; main.py dan engine.py
+menulis hasilnya ke file itu saat selesai.
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Bucket untuk output di luar story graph (banner pembuka, ringkasan ending)
+OUTSIDE = "(luar cerita)"
+
+class SceneStats:
+    """Akumulasi metrik untuk satu scene"""
+    __slots__ = ("visits", "wall_time", "bytes", "writes", "input_wait", "inputs", "retries")
+
+    def __init__(self):
+        self.visits = 0
+        self.wall_time = 0.0
+        self.bytes = 0
+        self.writes = 0
+        self.input_wait = 0.0
+        self.inputs = 0
+        self.retries = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Statistik dalam bentuk yang bisa di-dump ke JSON"""
+        return {
+            "visits": self.visits,
+            "wall_ms": round(self.wall_time * 1000, 3),
+            "mean_wall_ms": round(self.wall_time * 1000 / self.visits, 3) if self.visits else 0.0,
+            "bytes": self.bytes,
+            "writes": self.writes,
+            "input_wait_ms": round(self.input_wait * 1000, 3),
+            "inputs": self.inputs,
+            "retries": self.retries,
+        }
+
+class Metrics:
+    """Registry metrik dalam proses"""
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.enabled = False
+        self.clock = clock
+        self.scenes: Dict[str, SceneStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, int] = {}
+
+    def enable(self) -> None:
+        """Mulai merekam metrik"""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Berhenti merekam metrik (data yang sudah ada tetap disimpan)"""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Buang semua data metrik"""
+        self.scenes.clear()
+        self.counters.clear()
+        self.gauges.clear()
+
+    def scene(self, name: str) -> SceneStats:
+        """Statistik scene `name` (dibuat jika belum ada)"""
+        stats = self.scenes.get(name)
+        if stats is None:
+            stats = self.scenes[name] = SceneStats()
+        return stats
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Tambah counter global"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, value: int) -> None:
+        """Catat nilai terkini sebuah besaran (mis. jumlah sesi di memori)"""
+        self.gauges[name] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Salinan semua metrik saat ini"""
+        return {
+            "enabled": self.enabled,
+            "scenes": {name: stats.as_dict() for name, stats in self.scenes.items()},
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def dump(self, path: str) -> None:
+        """Tulis snapshot metrik ke file JSON secara atomik"""
+        import json
+
+        temp = f"{path}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(temp, path)
+
+# Registry bersama untuk seluruh proses
+METRICS = Metrics()
+
+class SceneTracker:
+    """Atribusi waktu dan output satu sesi ke scene yang sedang dimainkan"""
+    __slots__ = ("metrics", "current", "started")
+
+    def __init__(self, metrics: Metrics = METRICS):
+        self.metrics = metrics
+        self.current: Optional[SceneStats] = None
+        self.started = 0.0
+
+    def at(self, scene: Optional[str]) -> None:
+        """Catat bahwa sesi sedang berada di `scene` (None = di luar cerita)"""
+        stats = self.metrics.scene(scene or OUTSIDE)
+        if stats is not self.current:
+            now = self.metrics.clock()
+            if self.current is not None:
+                self.current.wall_time += now - self.started
+            stats.visits += 1
+            self.current = stats
+            self.started = now
+
+    def close(self) -> None:
+        """Tutup scene yang sedang diukur"""
+        if self.current is not None:
+            self.current.wall_time += self.metrics.clock() - self.started
+            self.current = None
+
+    def wrote(self, size: int) -> None:
+        """Catat satu write sebesar `size` byte"""
+        stats = self.current or self.metrics.scene(OUTSIDE)
+        stats.bytes += size
+        stats.writes += 1
+
+    def waited(self, seconds: float) -> None:
+        """Catat lama pemain menunggu di menu pilihan"""
+        stats = self.current or self.metrics.scene(OUTSIDE)
+        stats.input_wait += seconds
+        stats.inputs += 1
+
+    def retried(self, reason: str) -> None:
+        """Catat input tidak valid yang membuat menu diulang"""
+        stats = self.current or self.metrics.scene(OUTSIDE)
+        stats.retries += 1
+        self.metrics.count(reason)
+
+def metrics_from_env() -> Optional[str]:
+    """Nyalakan METRICS jika CLANK_METRICS di-set; kembalikan path dump-nya"""
+    path = os.environ.get("CLANK_METRICS") or None
+    if path is not None:
+        METRICS.enable()
+    return path
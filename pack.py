@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Story pack: file cerita yang dipecah per node dan dibaca lazy lewat mmap
+
+Format (versi 2)::
+
+    b"CLKP" | versi (1 byte) | panjang header (4 byte, big-endian) | header | chunk...
+
+    header: JSON {"title": ..., "start": ..., "nodes": [[id, offset, panjang], ...],
+                  "endings": [...]}  (rule ending mentah, opsional)
+    chunk:  JSON satu node mentah (format content/clank.json), dikompres zlib
+
+Versi 1 belum menyimpan rule ending di header; pack lama ditolak dan harus
+dibuat ulang dari file JSON-nya.
+
+Saat dibuka hanya header (indeks node) yang dibaca, jadi waktu startup tidak
+bergantung pada besar cerita. Chunk sebuah node baru di-decode dan di-compile
+saat node itu pertama kali diakses, dan node yang sudah di-compile disimpan di
+LRU. Cabang yang tidak pernah dimainkan tidak pernah di-decode sama sekali.
+
+Buat pack: python pack.py content/clank.json content/clank.clkp
+"""
+
+import json
+import mmap
+import struct
+import sys
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Mapping, Tuple
+
+from story import Node, StoryGraph, compile_node, compile_rules, compile_story
+
+MAGIC = b"CLKP"
+# Versi 2: header ikut menyimpan rule "endings"
+VERSION = 2
+_HEADER = struct.Struct(">4sBI")
+
+def build(data: Dict[str, Any]) -> bytes:
+    """Encode data cerita mentah menjadi story pack"""
+    compile_story(data)  # validasi referensi sekali saat build, bukan saat load
+    chunks = bytearray()
+    index = []
+    for node_id, raw in data["nodes"].items():
+        chunk = zlib.compress(json.dumps(raw, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+        index.append([node_id, len(chunks), len(chunk)])
+        chunks += chunk
+    fields = {"title": data.get("title", ""), "start": data["start"], "nodes": index}
+    if "endings" in data:
+        fields["endings"] = data["endings"]
+    header = json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(MAGIC, VERSION, len(header)) + header + bytes(chunks)
+
+def _read_header(buffer: Any) -> Tuple[Dict[str, Any], int]:
+    """Header story pack dan offset chunk pertama; pack yang bukan versi ini ditolak"""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("bukan story pack CLANK")
+    magic, version, header_size = _HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("bukan story pack CLANK")
+    if version < VERSION:
+        raise ValueError(f"story pack versi {version} sudah usang (sekarang versi {VERSION}); "
+                         f"buat ulang dengan: python pack.py <cerita.json> <cerita.clkp>")
+    if version != VERSION:
+        raise ValueError(f"versi story pack tidak didukung: {version}")
+    base = _HEADER.size + header_size
+    return json.loads(buffer[_HEADER.size:base]), base
+
+def write(path: str, data: Dict[str, Any]) -> None:
+    """Tulis story pack ke file"""
+    with open(path, "wb") as f:
+        f.write(build(data))
+
+class PackedNodes(Mapping[str, Node]):
+    """Node story pack yang di-decode saat pertama kali diakses"""
+    def __init__(self, buffer: Any, base: int, index: Dict[str, Tuple[int, int]], cache_size: int = 64):
+        self.buffer = buffer
+        self.base = base
+        self.index = index
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, Node]" = OrderedDict()
+        self.decoded = 0
+
+    def __getitem__(self, node_id: str) -> Node:
+        node = self.cache.get(node_id)
+        if node is not None:
+            self.cache.move_to_end(node_id)
+            return node
+        offset, size = self.index[node_id]
+        start = self.base + offset
+        raw = json.loads(zlib.decompress(self.buffer[start:start + size]))
+        node = compile_node(node_id, raw)
+        self.decoded += 1
+        self.cache[node_id] = node
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return node
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+def open_pack(path: str, cache_size: int = 64) -> StoryGraph:
+    """Buka story pack; node di-decode lazy dari file yang di-mmap"""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header, base = _read_header(buffer)
+    index = {node_id: (offset, size) for node_id, offset, size in header["nodes"]}
+    if header["start"] not in index:
+        raise ValueError(f"node awal tidak dikenal '{header['start']}'")
+    nodes = PackedNodes(buffer, base, index, cache_size)
+    endings = compile_rules(header["endings"]) if "endings" in header else None
+    return StoryGraph(header["title"], header["start"], nodes, endings)
+
+def read_raw(path: str) -> Dict[str, Any]:
+    """Data cerita mentah dari story pack (semua chunk di-decode), mis. untuk validasi"""
+    with open(path, "rb") as f:
+        buffer = f.read()
+    header, base = _read_header(buffer)
+    data = {"title": header["title"], "start": header["start"],
+            "nodes": {node_id: json.loads(zlib.decompress(buffer[base + offset:base + offset + size]))
+                      for node_id, offset, size in header["nodes"]}}
+    if "endings" in header:
+        data["endings"] = header["endings"]
+    return data
+
+def main(argv: List[str]) -> int:
+    """Buat story pack dari file cerita JSON"""
+    if len(argv) != 2:
+        print("pemakaian: python pack.py <cerita.json> <cerita.clkp>", file=sys.stderr)
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        data = json.load(f)
+    write(argv[1], data)
+    print(f"{argv[1]}: {len(data['nodes'])} node")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Teks tampilan CLANK yang dipakai bersama oleh terminal dan session engine
+
+Teks sumber (cerita dan konstanta di modul ini) berbahasa Indonesia. Renderer
+dengan `locale` lain menerjemahkan setiap teks lewat tabel string locale itu
+(lihat i18n.py) sebelum markup di-render; CLANK_LOCALE memilih locale default.
+"""
+
+import os
+import re
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from game_state import EndingType, GameState
+from metrics import METRICS
+from story import Step
+
+class ColorCode:
+    """ANSI Color Codes untuk terminal"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RED = '\033[91m'
+    END = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+MARKUP = {name.lower(): value for name, value in vars(ColorCode).items() if name.isupper()}
+
+_MARKUP_TOKEN = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+class Backend:
+    """Mengubah markup cerita menjadi teks untuk satu jenis klien.
+
+    Tabel tag -> escape dibuat sekali per backend saat import, jadi render
+    hanya berupa substitusi.
+    """
+    def __init__(self, name: str, tags: Dict[str, str]):
+        self.name = name
+        self.tags = tags
+
+    def text(self, markup: str) -> str:
+        """Render markup menjadi teks"""
+        return markup.format_map(self.tags)
+
+class MarkdownBackend(Backend):
+    """Markup untuk transport chat: **bold**, __underline__, tanpa warna"""
+    MARKERS = {"bold": "**", "underline": "__"}
+    SPECIAL = re.compile(r"([\\*_~`|])")
+
+    def __init__(self):
+        super().__init__("markdown", {tag: "" for tag in MARKUP})
+
+    def text(self, markup: str) -> str:
+        out: List[str] = []
+        opened: List[Tuple[str, int]] = []
+        pos = 0
+        for match in _MARKUP_TOKEN.finditer(markup):
+            out.append(self.SPECIAL.sub(r"\\\1", markup[pos:match.start()]))
+            pos = match.end()
+            token, tag = match.group(0), match.group(1)
+            if tag is None:
+                out.append(token[0])
+            elif tag not in MARKUP:
+                raise KeyError(tag)
+            elif tag == "end":
+                self._close(out, opened)
+            elif tag in self.MARKERS and all(marker != self.MARKERS[tag] for marker, _ in opened):
+                opened.append((self.MARKERS[tag], len(out)))
+                out.append("")
+        out.append(self.SPECIAL.sub(r"\\\1", markup[pos:]))
+        # Chat tidak membawa style antar pesan, jadi semua style ditutup di sini
+        self._close(out, opened)
+        return "".join(out)
+
+    @staticmethod
+    def _close(out: List[str], opened: List[Tuple[str, int]]) -> None:
+        """Tutup style yang terbuka; spasi di tepi dipindah ke luar penanda"""
+        while opened:
+            marker, index = opened.pop()
+            content = "".join(out[index + 1:])
+            body = content.strip()
+            del out[index:]
+            if body:
+                start = content.index(body)
+                out += [content[:start], marker, body, marker, content[start + len(body):]]
+            else:
+                out.append(content)
+
+BACKENDS: Dict[str, Backend] = {
+    "ansi": Backend("ansi", MARKUP),
+    # Tanpa warna, hanya bold dan underline (konvensi NO_COLOR)
+    "nocolor": Backend("nocolor", {tag: (code if tag in ("bold", "underline", "end") else "")
+                                   for tag, code in MARKUP.items()}),
+    "plain": Backend("plain", {tag: "" for tag in MARKUP}),
+    "markdown": MarkdownBackend(),
+}
+
+def detect_profile(stream=None, environ=None) -> str:
+    """Pilih backend output sesuai kemampuan terminal/stream"""
+    stream = stream if stream is not None else sys.stdout
+    environ = environ if environ is not None else os.environ
+    forced = environ.get("CLANK_PROFILE")
+    if forced:
+        if forced not in BACKENDS:
+            raise ValueError(f"profil terminal tidak dikenal: {forced!r}")
+        return forced
+    isatty = getattr(stream, "isatty", None)
+    if isatty is None or not isatty() or environ.get("TERM") == "dumb":
+        return "plain"
+    if environ.get("NO_COLOR"):
+        return "nocolor"
+    return "ansi"
+
+# Locale teks sumber; tidak butuh tabel string
+SOURCE_LOCALE = "id"
+
+MENU_HEADER_MARKUP = "\n{yellow}Pilihan Anda:{end}"
+CHOICE_PROMPT_MARKUP = "\n{bold}Masukkan pilihan (angka): {end}"
+INVALID_CHOICE_MARKUP = "{red}Pilihan tidak valid! Coba lagi.{end}"
+INVALID_NUMBER_MARKUP = "{red}Masukkan angka yang valid!{end}"
+TIMEOUT_MARKUP = "\n{yellow}Waktu habis, memilih %s.{end}"
+PARKED_MARKUP = "\n{yellow}Sesi dijeda karena tidak ada input. Kirim pilihan untuk melanjutkan.{end}"
+INTERRUPTED_MARKUP = "\n{red}Permainan dihentikan oleh pemain.{end}\n\n"
+
+ENDING_LINES = {
+    EndingType.RETURN_HOME: "ENDING 1: PULANG - Kamu kembali ke dimensimu",
+    EndingType.TRAPPED_HAPPY: "ENDING 2: AWAL BARU - Kamu tinggal di dimensi baru",
+    EndingType.MERGE_WORLDS: "ENDING 3: KESATUAN - Dua dimensi bergabung",
+    EndingType.PARADOX_TRUTH: "ENDING 4: PARADOKS - Kebenaran tentang dirimu terbongkar",
+    EndingType.SACRIFICE_RESET: "ENDING 5: PENGORBANAN - Kamu mengorbankan diri untuk semua",
+}
+
+# Baris ringkasan; {key}, {value}, {text}, {name}, {level} dan {hearts} diisi saat ringkasan dibuat
+SUMMARY_CHOICE_LINE = "  • {key}: Pilihan {value}"
+SUMMARY_KNOWLEDGE_LINE = "  • {text}"
+SUMMARY_RELATION_LINE = "  • {name}: {level} ({hearts})"
+NEUTRAL = "neutral"
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Frame per detik default efek typewriter; CLANK_FPS atau --fps untuk mengubahnya
+DEFAULT_FPS = 10.0
+
+class Typewriter:
+    """Efek typewriter yang digabung per frame.
+
+    Daripada menulis dan flush satu karakter setiap `delay` detik, setiap frame
+    menulis sekaligus semua karakter yang jatuh tempo dalam budget waktunya
+    (1/frame_rate detik). Frame juga berakhir di akhir baris, jadi satu baris
+    tidak pernah terpecah ke frame berikutnya tanpa perlu. Total durasi tetap
+    sama, tapi jumlah write/flush/sleep turun dari satu per karakter menjadi
+    satu per frame: dengan delay 0.02 detik dan 10 fps, lima karakter per write.
+    """
+    def __init__(self, frame_rate: float = DEFAULT_FPS):
+        if frame_rate <= 0:
+            raise ValueError("frame_rate harus lebih dari 0")
+        self.frame_rate = frame_rate
+
+    def frames(self, text: str, delay: float, end: str = "") -> Iterator[Tuple[str, float]]:
+        """Pecah teks menjadi (potongan, jeda setelahnya); `end` ikut di frame terakhir"""
+        if delay <= 0 or not text:
+            yield text + end, 0.0
+            return
+        budget = max(1.0 / self.frame_rate, delay)
+        started = 0.0  # waktu frame yang sedang dikumpulkan dikirim
+        visible = 0
+        chunk_start = 0
+        pos = 0
+        line_done = False
+        length = len(text)
+        while pos < length:
+            # Kode ANSI tidak terlihat dan tidak boleh terpotong di tengah
+            match = ANSI_ESCAPE.match(text, pos)
+            if match:
+                pos = match.end()
+                continue
+            due = (visible + 1) * delay
+            if pos > chunk_start and (line_done or due > started + budget + 1e-9):
+                # Frame berikutnya mulai saat karakter terakhir frame ini selesai diketik
+                # (akhir baris) atau saat budget frame ini habis
+                following = visible * delay if line_done else started + budget
+                yield text[chunk_start:pos], following - started
+                started = following
+                chunk_start = pos
+                line_done = False
+            line_done = text[pos] == "\n"
+            pos += 1
+            visible += 1
+        yield text[chunk_start:] + end, visible * delay - started
+
+TYPEWRITER = Typewriter()
+
+def fps_from_env() -> float:
+    """Frame per detik typewriter dari CLANK_FPS (default DEFAULT_FPS)"""
+    return float(os.environ.get("CLANK_FPS") or DEFAULT_FPS)
+
+@lru_cache(maxsize=None)
+def get_typewriter(fps: float) -> Typewriter:
+    """Typewriter bersama per frame rate"""
+    return Typewriter(fps)
+
+class Pacing:
+    """Kebijakan tempo: semua delay typewriter dan jeda dikalikan `scale`.
+
+    scale 1.0 = realistic, 0 = instant (tanpa jeda sama sekali, untuk bot,
+    test dan replay), nilai lain = scaled.
+    """
+    def __init__(self, scale: float = 1.0):
+        if scale < 0:
+            raise ValueError("scale pacing tidak boleh negatif")
+        self.scale = scale
+
+    @property
+    def instant(self) -> bool:
+        """True jika semua jeda dihilangkan"""
+        return self.scale == 0
+
+    def delay(self, seconds: float) -> float:
+        """Delay setelah diterapkan kebijakan tempo"""
+        return seconds * self.scale
+
+    @classmethod
+    def parse(cls, value: str) -> "Pacing":
+        """Buat Pacing dari 'instant', 'realistic' atau angka skala"""
+        value = value.strip().lower()
+        if value == "instant":
+            return cls(0.0)
+        if value == "realistic":
+            return cls(1.0)
+        try:
+            return cls(float(value))
+        except ValueError:
+            raise ValueError(f"pacing tidak dikenal: {value!r}") from None
+
+    def __repr__(self) -> str:
+        return f"Pacing({self.scale})"
+
+REALISTIC = Pacing(1.0)
+INSTANT = Pacing(0.0)
+
+def pacing_from_env() -> Pacing:
+    """Pacing dari variabel lingkungan CLANK_PACING (default realistic)"""
+    return Pacing.parse(os.environ.get("CLANK_PACING", "realistic"))
+
+def locale_from_env() -> Optional[str]:
+    """Locale dari CLANK_LOCALE, atau None untuk teks sumber"""
+    return os.environ.get("CLANK_LOCALE") or None
+
+def escape_markup(text: str) -> str:
+    """Escape kurung kurawal supaya teks bebas aman dipakai sebagai markup"""
+    return text.replace("{", "{{").replace("}", "}}")
+
+def divider_markup(title: str = "") -> str:
+    """Markup pemisah section dengan judul"""
+    rule = "{cyan}" + "=" * 60 + "{end}"
+    if not title:
+        return "\n" + rule
+    return "\n" + rule + "\n{bold}{cyan}" + escape_markup(title.center(60)) + "{end}\n" + rule
+
+def menu_markup(choices: Sequence[Tuple[int, str]], header: str = MENU_HEADER_MARKUP) -> str:
+    """Markup menu pilihan"""
+    lines = [header]
+    for num, choice_text in choices:
+        lines.append("{green}" + escape_markup(f"{num}. {choice_text}") + "{end}")
+    return "\n".join(lines)
+
+Frames = Tuple[Tuple[bytes, float], ...]
+
+def _frames_size(frames: Frames) -> int:
+    """Jumlah byte output dalam frame"""
+    return sum(len(chunk) for chunk, _ in frames)
+
+class SceneCache:
+    """Frame scene utuh yang sudah di-render, dipakai bersama oleh semua sesi.
+
+    Kuncinya (profil backend, locale, frame rate, skala pacing, kunci isi
+    scene; lihat story.scene_key). Total byte frame dibatasi `max_bytes`;
+    entri yang paling lama tidak dipakai dibuang lebih dulu.
+    """
+    def __init__(self, max_bytes: int = 8 << 20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Hashable, Frames]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, render: Callable[[], Frames]) -> Frames:
+        """Frame untuk `key`; di-render dengan `render()` jika belum ada"""
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            if METRICS.enabled:
+                METRICS.count("scene_cache_hit")
+            return data
+        self.misses += 1
+        if METRICS.enabled:
+            METRICS.count("scene_cache_miss")
+        data = render()
+        size = _frames_size(data)
+        if size <= self.max_bytes:
+            self.entries[key] = data
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= _frames_size(evicted)
+        return data
+
+    @property
+    def hit_rate(self) -> float:
+        """Proporsi permintaan yang dilayani dari cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Kosongkan cache dan statistiknya"""
+        self.entries.clear()
+        self.size = self.hits = self.misses = 0
+
+# Cache scene bersama untuk seluruh proses
+SCENE_CACHE = SceneCache()
+
+class Renderer:
+    """Output cerita yang sudah di-render ke bytes untuk satu profil terminal.
+
+    Step cerita tidak bergantung pada state pemain, jadi hasil render-nya
+    (termasuk pemisah section dan pecahan frame typewriter) di-cache sekali
+    dan dipakai bersama oleh semua sesi: menampilkan scene cukup menyalin
+    buffer, bukan memformat ulang string.
+    """
+    def __init__(self, profile: str = "ansi", typewriter: Typewriter = TYPEWRITER,
+                 max_entries: int = 4096, scenes: SceneCache = SCENE_CACHE, locale: Optional[str] = None):
+        if profile not in BACKENDS:
+            raise ValueError(f"profil terminal tidak dikenal: {profile!r}")
+        self.profile = profile
+        self.backend = BACKENDS[profile]
+        self.typewriter = typewriter
+        self.max_entries = max_entries
+        self.scenes = scenes
+        self.locale = None if locale == SOURCE_LOCALE else locale
+        self.strings = None
+        if self.locale is not None:
+            from i18n import load_table
+            self.strings = load_table(self.locale)
+        self._blocks: Dict[Step, bytes] = {}
+        self._frames: Dict[Tuple[Step, float], Frames] = {}
+        self._menus: Dict[Tuple[Tuple[int, str], ...], bytes] = {}
+        self.prompt = self.encode(self.tr(CHOICE_PROMPT_MARKUP))
+        self.invalid_choice = self.encode(self.tr(INVALID_CHOICE_MARKUP) + "\n")
+        self.invalid_number = self.encode(self.tr(INVALID_NUMBER_MARKUP) + "\n")
+        self.parked = self.encode(self.tr(PARKED_MARKUP) + "\n")
+
+    def tr(self, text: str) -> str:
+        """Terjemahan teks sumber untuk locale renderer ini (teks itu sendiri jika belum diterjemahkan)"""
+        if self.strings is None:
+            return text
+        return self.strings.get(text, text)
+
+    def text(self, markup: str) -> str:
+        """Render markup menjadi teks untuk profil ini"""
+        return self.backend.text(markup)
+
+    def encode(self, markup: str) -> bytes:
+        """Render markup menjadi bytes UTF-8"""
+        return self.text(markup).encode("utf-8")
+
+    def timed_out(self, value: int) -> bytes:
+        """Pemberitahuan pilihan otomatis setelah waktu tunggu habis"""
+        return self.encode(self.tr(TIMEOUT_MARKUP) % escape_markup(str(value)) + "\n")
+
+    def block(self, step: Step) -> bytes:
+        """Seluruh output sebuah step sekaligus (tanpa efek typewriter)"""
+        data = self._blocks.get(step)
+        if data is None:
+            if step.kind in ("say", "print"):
+                data = self.encode(self.tr(step.text) + "\n")
+            elif step.kind == "divider":
+                data = self.encode(divider_markup(self.tr(step.text)) + "\n")
+            else:
+                data = b""
+            if len(self._blocks) < self.max_entries:
+                self._blocks[step] = data
+        return data
+
+    def frames(self, step: Step, delay: float) -> Frames:
+        """Frame typewriter (bytes, jeda) untuk step 'say' dengan delay per karakter"""
+        if delay <= 0:
+            return ((self.block(step), 0.0),)
+        key = (step, delay)
+        frames = self._frames.get(key)
+        if frames is None:
+            frames = tuple((chunk.encode("utf-8"), pause)
+                           for chunk, pause in self.typewriter.frames(self.text(self.tr(step.text)), delay, end="\n"))
+            if len(self._frames) < self.max_entries:
+                self._frames[key] = frames
+        return frames
+
+    def scene(self, scene: Optional[str], key: Optional[Hashable], steps: Callable[[], Iterable[Step]],
+              pacing: Pacing = INSTANT) -> Frames:
+        """Frame seluruh output beberapa step, lewat cache scene.
+
+        `key` harus menentukan isi step-nya, mis. story.scene_key() untuk
+        scene cerita; None = tanpa cache, untuk output per pemain seperti
+        ringkasan. Dengan pacing instant hasilnya satu frame.
+        """
+        if key is None:
+            return self.scene_frames(steps(), pacing)
+        return self.scenes.get((self.profile, self.locale, self.typewriter.frame_rate, pacing.scale, scene, key),
+                               lambda: self.scene_frames(steps(), pacing))
+
+    def scene_frames(self, steps: Iterable[Step], pacing: Pacing) -> Frames:
+        """Gabungkan frame typewriter, blok dan jeda beberapa step menjadi satu rangkaian frame.
+
+        Output tanpa jeda di antaranya disatukan ke satu frame, dan step
+        pause menambah jeda frame sebelumnya.
+        """
+        chunks: List[bytearray] = []
+        pauses: List[float] = []
+        for step in steps:
+            if step.kind == "pause":
+                if not chunks:
+                    chunks.append(bytearray())
+                    pauses.append(0.0)
+                pauses[-1] += pacing.delay(step.delay)
+                continue
+            if step.kind == "say":
+                frames = self.frames(step, pacing.delay(step.delay))
+            else:
+                frames = ((self.block(step), 0.0),)
+            for chunk, pause in frames:
+                if chunks and not pauses[-1]:
+                    chunks[-1] += chunk
+                    pauses[-1] = pause
+                else:
+                    chunks.append(bytearray(chunk))
+                    pauses.append(pause)
+        return tuple((bytes(chunk), pause) for chunk, pause in zip(chunks, pauses))
+
+    def menu(self, choices: Sequence[Tuple[int, str]]) -> bytes:
+        """Menu pilihan yang sudah di-render"""
+        key = tuple(choices)
+        data = self._menus.get(key)
+        if data is None:
+            data = self.encode(menu_markup([(num, self.tr(label)) for num, label in key],
+                                           self.tr(MENU_HEADER_MARKUP)) + "\n")
+            if len(self._menus) < self.max_entries:
+                self._menus[key] = data
+        return data
+
+def get_renderer(profile: str = "ansi", locale: Optional[str] = None, fps: Optional[float] = None) -> Renderer:
+    """Renderer bersama per profil terminal, locale dan frame rate typewriter (default CLANK_FPS)"""
+    return _shared_renderer(profile, None if locale == SOURCE_LOCALE else locale,
+                            fps if fps is not None else fps_from_env())
+
+@lru_cache(maxsize=None)
+def _shared_renderer(profile: str, locale: Optional[str], fps: float) -> Renderer:
+    """Satu Renderer per (profil, locale, fps) untuk seluruh proses"""
+    return Renderer(profile, get_typewriter(fps), locale=locale)
+
+def _same(text: str) -> str:
+    """Tanpa terjemahan"""
+    return text
+
+def opening_steps() -> List[Step]:
+    """Banner judul sebelum cerita dimulai"""
+    return [
+        Step("print", "\n{bold}{cyan}"),
+        Step("print", "╔════════════════════════════════════════════════════════╗"),
+        Step("print", "║          CLANK: Petualangan Dimensi Temporal           ║"),
+        Step("print", "║       Sebuah Visual Novel Misteri Interaktif            ║"),
+        Step("print", "╚════════════════════════════════════════════════════════╝"),
+        Step("print", "{end}\n"),
+        Step("pause", delay=2),
+    ]
+
+def summary_steps(state: GameState, tr: Callable[[str], str] = _same) -> List[Step]:
+    """Ringkasan ending dan pilihan pemain.
+
+    Baris yang dibentuk dari state sudah diterjemahkan dengan `tr` (mis.
+    Renderer.tr), baris tetap diterjemahkan renderer saat di-render.
+    """
+    steps = [
+        Step("divider", "RINGKASAN PETUALANGAN"),
+        Step("say", "\n{bold}Pilihan yang Anda buat:{end}\n", 0.02),
+    ]
+    for choice_key, choice_value in state.choices_made.items():
+        steps.append(Step("print", escape_markup(tr(SUMMARY_CHOICE_LINE).format(key=choice_key, value=choice_value))))
+
+    steps.append(Step("say", "\n{bold}Pengetahuan yang dikumpulkan:{end}\n", 0.02))
+    for knowledge in state.knowledge:
+        steps.append(Step("print", escape_markup(tr(SUMMARY_KNOWLEDGE_LINE).format(text=tr(knowledge)))))
+
+    steps.append(Step("say", "\n{bold}Hubungan akhir:{end}\n", 0.02))
+    for character, level in state.relationships.items():
+        relationship_str = "❤️ " * max(0, level) + "💔 " * max(0, -level) if level != 0 else tr(NEUTRAL)
+        steps.append(Step("print", escape_markup(tr(SUMMARY_RELATION_LINE).format(
+            name=character, level=level, hearts=relationship_str))))
+
+    steps.append(Step("say", "\n{bold}Ending yang dicapai:{end}\n", 0.02))
+    if state.ending_type is not None:
+        steps.append(Step("print", "{green}" + escape_markup(tr(ENDING_LINES[state.ending_type])) + "{end}"))
+    return steps
+
+def closing_steps() -> List[Step]:
+    """Penutup setelah ringkasan"""
+    return [
+        Step("divider"),
+        Step("print", "\n{bold}{cyan}Terima kasih telah bermain CLANK!{end}\n"),
+        Step("print", "{yellow}Untuk bermain lagi dan membuat pilihan berbeda, jalankan program ini kembali.{end}\n\n"),
+    ]
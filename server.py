@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Server jaringan CLANK: banyak pemain lewat TCP dan WebSocket
+
+Semua koneksi dilayani oleh satu Engine di satu event loop::
+
+    TCP        satu baris teks per input pemain, output dikirim apa adanya
+               (cocok untuk telnet/nc)
+    WebSocket  satu pesan teks per input pemain, output sebagai pesan teks
+
+Setiap koneksi punya buffer output sendiri (buffer transport asyncio, dibatasi
+`high_water` byte). Setelah setiap step cerita sesi menunggu drain(), jadi
+klien yang lambat hanya memperlambat sesinya sendiri dan memori server tidak
+tumbuh tanpa batas.
+
+Bahasa cerita mengikuti --locale (default CLANK_LOCALE); klien WebSocket bisa
+memilih sendiri lewat query string, mis. ws://host:4001/?lang=en.
+
+Jalankan: python server.py --tcp-port 4000 --ws-port 4001
+Klien:    python server.py --connect 127.0.0.1:4000 [--script 1,2,3,2,1,4,5]
+"""
+
+import asyncio
+import base64
+import hashlib
+import itertools
+import struct
+import sys
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from engine import Engine
+from render import BACKENDS, get_renderer
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_WS_TEXT = 0x1
+_WS_CLOSE = 0x8
+_WS_PING = 0x9
+_WS_PONG = 0xA
+# Batas ukuran satu pesan/baris input dari klien
+MAX_INPUT = 4096
+
+class Server:
+    """Menghubungkan koneksi jaringan ke sesi Engine"""
+    def __init__(self, engine: Optional[Engine] = None, tcp_profile: str = "ansi",
+                 ws_profile: str = "plain", high_water: int = 64 * 1024, locale: Optional[str] = None):
+        self.engine = engine or Engine()
+        self.tcp_profile = tcp_profile
+        self.ws_profile = ws_profile
+        self.locale = locale
+        self.high_water = high_water
+        self.ids = itertools.count(1)
+        self.servers: List[asyncio.AbstractServer] = []
+
+    async def serve(self, host: str = "127.0.0.1", tcp_port: Optional[int] = 4000,
+                    ws_port: Optional[int] = None) -> None:
+        """Mulai menerima koneksi"""
+        if tcp_port is not None:
+            self.servers.append(await asyncio.start_server(self.handle_tcp, host, tcp_port, limit=MAX_INPUT))
+        if ws_port is not None:
+            self.servers.append(await asyncio.start_server(self.handle_ws, host, ws_port, limit=MAX_INPUT))
+
+    async def close(self) -> None:
+        """Berhenti menerima koneksi baru"""
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers.clear()
+
+    async def _play(self, kind: str, writer: asyncio.StreamWriter, write, lines: AsyncIterator[str],
+                    profile: str, locale: Optional[str] = None,
+                    farewell: Optional[Callable[[], None]] = None) -> None:
+        """Jalankan satu sesi untuk satu koneksi sampai cerita atau koneksi selesai.
+
+        `farewell` dipanggil tepat sebelum koneksi ditutup (mis. frame close WebSocket).
+        """
+        writer.transport.set_write_buffer_limits(high=self.high_water)
+        session_id = f"{kind}-{next(self.ids)}"
+        self.engine.start(session_id, write, profile=profile, drain=writer.drain, locale=locale or self.locale)
+
+        async def pump() -> None:
+            try:
+                async for line in lines:
+                    if session_id in self.engine:
+                        self.engine.send(session_id, line)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                pass
+            self.engine.close(session_id)
+
+        reading = asyncio.get_running_loop().create_task(pump())
+        try:
+            # Sesi yang diparkir karena idle dilanjutkan oleh input berikutnya
+            await self.engine.wait(session_id)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            reading.cancel()
+            if farewell is not None:
+                farewell()
+            writer.close()
+
+    async def handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Koneksi TCP berbasis baris"""
+        async def lines() -> AsyncIterator[str]:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                yield line.decode("utf-8", "replace").strip()
+
+        await self._play("tcp", writer, writer.write, lines(), self.tcp_profile)
+
+    async def handle_ws(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Koneksi WebSocket (RFC 6455, hanya pesan teks)"""
+        request = await _ws_handshake(reader)
+        if request is None:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return
+        key, locale = request
+        accept = base64.b64encode(hashlib.sha1(key + _WS_GUID).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        # Frame close hanya dikirim sekali: balasan close klien, atau 1000 saat cerita selesai
+        closed = False
+
+        def close(payload: bytes) -> None:
+            nonlocal closed
+            if not closed and not writer.is_closing():
+                closed = True
+                writer.write(_ws_frame(_WS_CLOSE, payload))
+
+        def write(data: bytes) -> None:
+            if not closed and not writer.is_closing():
+                writer.write(_ws_frame(_WS_TEXT, data))
+
+        async def messages() -> AsyncIterator[str]:
+            async for opcode, payload in _ws_messages(reader):
+                if opcode == _WS_TEXT:
+                    for line in payload.decode("utf-8", "replace").splitlines() or [""]:
+                        yield line.strip()
+                elif opcode == _WS_PING:
+                    writer.write(_ws_frame(_WS_PONG, payload))
+                elif opcode == _WS_CLOSE:
+                    close(payload[:2])
+                    return
+
+        await self._play("ws", writer, write, messages(), self.ws_profile, locale,
+                         lambda: close(struct.pack("!H", 1000)))
+
+async def _ws_handshake(reader: asyncio.StreamReader) -> Optional[Tuple[bytes, Optional[str]]]:
+    """Baca request upgrade HTTP; kembalikan (Sec-WebSocket-Key, locale dari ?lang=) atau None"""
+    try:
+        request = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.LimitOverrunError, asyncio.IncompleteReadError):
+        # Header lebih besar dari MAX_INPUT, atau koneksi putus sebelum header lengkap
+        return None
+    lines = request.split(b"\r\n")
+    if not lines[0].startswith(b"GET "):
+        return None
+    target = lines[0].split(b" ")[1].decode("latin-1") if lines[0].count(b" ") >= 2 else "/"
+    locale = parse_qs(urlsplit(target).query).get("lang", [None])[0]
+    if locale is not None:
+        from i18n import available_locales
+
+        if locale not in available_locales():
+            locale = None
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get(b"upgrade", b"").lower() != b"websocket":
+        return None
+    key = headers.get(b"sec-websocket-key")
+    return (key, locale) if key is not None else None
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    """Satu frame WebSocket dari server (tanpa mask)"""
+    size = len(payload)
+    if size < 126:
+        header = struct.pack("!BB", 0x80 | opcode, size)
+    elif size < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, size)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, size)
+    return header + payload
+
+async def _ws_messages(reader: asyncio.StreamReader) -> AsyncIterator:
+    """Pesan (opcode, payload) dari klien, fragmen sudah digabung"""
+    fragments = bytearray()
+    message_opcode = 0
+    while True:
+        try:
+            first, second = await reader.readexactly(2)
+        except asyncio.IncompleteReadError:
+            return
+        fin, opcode, size = first & 0x80, first & 0x0F, second & 0x7F
+        if size == 126:
+            size = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif size == 127:
+            size = struct.unpack("!Q", await reader.readexactly(8))[0]
+        if size > MAX_INPUT:
+            raise ValueError("pesan WebSocket terlalu besar")
+        if not second & 0x80:
+            # RFC 6455 5.1: semua frame dari klien wajib di-mask
+            raise ValueError("frame WebSocket dari klien harus di-mask")
+        mask = await reader.readexactly(4)
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(size)))
+        if opcode >= 0x8:
+            yield opcode, payload  # frame kontrol tidak pernah difragmentasi
+            continue
+        if opcode:
+            message_opcode = opcode
+        fragments += payload
+        if len(fragments) > MAX_INPUT:
+            raise ValueError("pesan WebSocket terlalu besar")
+        if fin:
+            yield message_opcode, bytes(fragments)
+            fragments.clear()
+
+async def play_remote(host: str, port: int, script: Optional[List[int]] = None) -> bytes:
+    """Klien TCP lokal: tampilkan output dan jawab menu dari `script` atau stdin"""
+    reader, writer = await asyncio.open_connection(host, port)
+    from i18n import available_locales
+
+    prompts = tuple(get_renderer(profile, locale).prompt for profile in BACKENDS for locale in available_locales())
+    choices = iter(script) if script is not None else None
+    received = bytearray()
+    loop = asyncio.get_running_loop()
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            break
+        received += data
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        if received.endswith(prompts):
+            if choices is not None:
+                line = str(next(choices))
+                sys.stdout.write(line + "\n")
+            else:
+                line = (await loop.run_in_executor(None, sys.stdin.readline)).strip()
+            writer.write(line.encode("utf-8") + b"\n")
+            await writer.drain()
+    writer.close()
+    return bytes(received)
+
+async def _serve_forever(args) -> None:
+    """Jalankan server sampai dihentikan"""
+    engine = Engine(renderer=get_renderer(args.tcp_profile, args.locale, args.fps)) if args.fps else None
+    server = Server(engine, tcp_profile=args.tcp_profile, ws_profile=args.ws_profile, locale=args.locale)
+    await server.serve(args.host, args.tcp_port, args.ws_port)
+    print(f"CLANK server: tcp={args.tcp_port} ws={args.ws_port} di {args.host}", file=sys.stderr)
+    await asyncio.Event().wait()
+
+def main(argv: List[str]) -> int:
+    """Jalankan server, atau klien lokal dengan --connect"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Server jaringan CLANK")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--tcp-port", type=int, default=4000)
+    parser.add_argument("--ws-port", type=int, default=None)
+    parser.add_argument("--tcp-profile", choices=sorted(BACKENDS), default="ansi")
+    parser.add_argument("--ws-profile", choices=sorted(BACKENDS), default="plain")
+    parser.add_argument("--locale", default=None, help="bahasa cerita default, mis. en")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="frame per detik efek typewriter (default: CLANK_FPS atau 10)")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="mainkan sebagai klien TCP")
+    parser.add_argument("--script", help="pilihan otomatis untuk klien, mis. 1,2,3,2,1,4,5")
+    args = parser.parse_args(argv)
+    try:
+        if args.connect:
+            host, _, port = args.connect.rpartition(":")
+            script = [int(value) for value in args.script.split(",")] if args.script else None
+            asyncio.run(play_remote(host or "127.0.0.1", int(port), script))
+        else:
+            asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Supervisor multi-proses: sesi pemain dibagi ke beberapa worker
+
+Setiap worker adalah proses terpisah yang menjalankan Engine asyncio-nya
+sendiri, jadi rendering dan update state tidak lagi dibatasi satu core oleh
+GIL. Sesi dipetakan ke worker dengan crc32(session_id) % jumlah worker,
+sehingga semua input satu sesi selalu sampai ke worker yang sama.
+
+Story graph dan cache renderer dimuat di supervisor sebelum worker di-fork,
+jadi semua worker memakai salinan copy-on-write yang sama dan tidak perlu
+membaca ulang file cerita.
+
+Saat worker di-restart dengan sengaja (restart()), checkpoint semua sesinya
+dikirim sebagai snapshot ke worker pengganti. Jika worker mati mendadak dan
+`log_dir` diberikan, worker pengganti memulihkan sesi dari event log-nya.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+import zlib
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import events
+import snapshot
+from engine import Engine, Writer
+from render import Pacing, get_renderer, pacing_from_env
+from story import StoryGraph, load_story
+
+def shard_for(session_id: str, shards: int) -> int:
+    """Indeks worker untuk sebuah sesi"""
+    return zlib.crc32(session_id.encode("utf-8")) % shards
+
+def warm_renderer(graph: StoryGraph, pacing: Pacing, profile: str = "ansi",
+                  nodes: Optional[Iterable[str]] = None) -> None:
+    """Render step node tertentu sekali supaya cache-nya ikut dibagi ke worker.
+
+    Default-nya hanya node awal: semua sesi baru melewatinya, sedangkan
+    me-render seluruh cerita akan meng-compile setiap node pack mmap yang
+    seharusnya lazy (lihat pack.py).
+    """
+    renderer = get_renderer(profile)
+    for name in (graph.start,) if nodes is None else nodes:
+        node = graph.nodes[name]
+        steps = list(node.steps) + list(node.after)
+        if node.choice is not None:
+            renderer.menu(node.choice.menu)
+            for option in node.choice.options:
+                steps += option.steps
+        for step in steps:
+            if step.kind == "say":
+                renderer.frames(step, pacing.delay(step.delay))
+            else:
+                renderer.block(step)
+
+def _worker_main(conn: Connection, pacing: Pacing, log_path: Optional[str],
+                 handoff: Optional[bytes], recover: bool) -> None:
+    """Entry point proses worker"""
+    try:
+        asyncio.run(_serve(conn, pacing, log_path, handoff, recover))
+    except KeyboardInterrupt:
+        pass
+
+async def _serve(conn: Connection, pacing: Pacing, log_path: Optional[str],
+                 handoff: Optional[bytes], recover: bool) -> None:
+    """Loop worker: jalankan Engine dan layani pesan dari supervisor"""
+    loop = asyncio.get_running_loop()
+    event_log = events.EventLog(log_path) if log_path is not None else None
+    engine = Engine(load_story(), pacing=pacing, event_log=event_log)
+    stopped = loop.create_future()
+    # Pesan ke supervisor dikirim dari thread sendiri: jika pipe penuh, hanya
+    # thread itu yang menunggu dan loop tetap membaca input (tidak deadlock)
+    outbox: "queue.SimpleQueue[Optional[Tuple[Any, ...]]]" = queue.SimpleQueue()
+
+    def sender() -> None:
+        for message in iter(outbox.get, None):
+            conn.send(message)
+
+    send = outbox.put
+    sending = threading.Thread(target=sender, name="clank-worker-sender", daemon=True)
+    sending.start()
+    # Output dikumpulkan per putaran event loop dan dikirim sebagai satu pesan
+    pending: Dict[str, bytearray] = {}
+
+    def flush() -> None:
+        if pending:
+            send(("output", [(session_id, bytes(data)) for session_id, data in pending.items()]))
+            pending.clear()
+
+    def writer_for(session_id: str) -> Writer:
+        def write(data: bytes) -> None:
+            buffer = pending.get(session_id)
+            if buffer is None:
+                if not pending:
+                    loop.call_soon(flush)
+                pending[session_id] = bytearray(data)
+            else:
+                buffer += data
+        return write
+
+    def track(session_id: str) -> None:
+        def done(_: "asyncio.Task[Any]") -> None:
+            # Sesi yang dibatalkan karena worker berhenti tidak dilaporkan selesai
+            if not stopped.done() and session_id not in engine.parked:
+                flush()
+                send(("done", session_id))
+        engine.tasks[session_id].add_done_callback(done)
+
+    def on_message() -> None:
+        while not stopped.done() and conn.poll():
+            try:
+                message = conn.recv()
+            except EOFError:
+                stopped.set_result(None)
+                return
+            kind = message[0]
+            if kind == "input":
+                if message[1] in engine.parked:
+                    engine.resume(message[1])
+                    track(message[1])
+                if message[1] in engine.sessions:
+                    engine.send(message[1], message[2])
+            elif kind == "start":
+                engine.start(message[1], writer_for(message[1]), profile=message[2], locale=message[3])
+                track(message[1])
+            elif kind == "close":
+                parked = message[1] in engine.parked
+                engine.close(message[1])
+                if parked:
+                    send(("done", message[1]))
+            elif kind == "handoff":
+                flush()
+                send(("handoff", snapshot.dumps(engine.snapshot())))
+                stopped.set_result(None)
+            elif kind == "stop":
+                stopped.set_result(None)
+
+    restored: List[str] = []
+    if handoff is not None:
+        states = snapshot.loads(handoff)
+    elif recover and log_path is not None and os.path.exists(log_path):
+        states = events.recover(events.read(log_path))
+    else:
+        states = {}
+    engine.restore(states, writer_for)
+    for session_id in states:
+        track(session_id)
+        restored.append(session_id)
+    send(("ready", restored))
+
+    loop.add_reader(conn.fileno(), on_message)
+    try:
+        await stopped
+    finally:
+        loop.remove_reader(conn.fileno())
+        for task in list(engine.tasks.values()):
+            task.cancel()
+        flush()
+        outbox.put(None)
+        sending.join()
+        if event_log is not None:
+            event_log.close()
+
+class _Worker:
+    """Handle supervisor untuk satu proses worker"""
+    def __init__(self, index: int, process: multiprocessing.process.BaseProcess, conn: Connection):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.ready: "asyncio.Future[List[str]]" = asyncio.get_running_loop().create_future()
+        self.handoff: "Optional[asyncio.Future[bytes]]" = None
+        # Pesan yang ditahan selama worker diganti
+        self.backlog: List[Tuple[Any, ...]] = []
+
+class Supervisor:
+    """Membagi sesi pemain ke beberapa proses worker"""
+    def __init__(self, workers: Optional[int] = None, pacing: Optional[Pacing] = None,
+                 log_dir: Optional[str] = None):
+        self.shards = workers or os.cpu_count() or 1
+        self.pacing = pacing or pacing_from_env()
+        self.log_dir = log_dir
+        # Dimuat sebelum fork supaya dibagi copy-on-write oleh semua worker
+        self.story = load_story()
+        warm_renderer(self.story, self.pacing)
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.workers: List[_Worker] = []
+        self.writers: Dict[str, Writer] = {}
+        # (profile, locale) per sesi, untuk memulai ulang sesi di worker pengganti
+        self.profiles: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self.idle = asyncio.Event()
+        self.restarts = 0
+        # Penggantian worker yang mati dan masih berjalan
+        self._replacing: "Set[asyncio.Task[None]]" = set()
+
+    async def start_workers(self) -> None:
+        """Jalankan semua worker dan tunggu sampai siap"""
+        self.workers = [self._spawn(index) for index in range(self.shards)]
+        await asyncio.gather(*(worker.ready for worker in self.workers))
+        self.idle.set()
+
+    def _log_path(self, index: int) -> Optional[str]:
+        """File event log milik worker `index`"""
+        return os.path.join(self.log_dir, f"worker-{index}.jsonl") if self.log_dir is not None else None
+
+    def _spawn(self, index: int, handoff: Optional[bytes] = None, recover: bool = False) -> _Worker:
+        """Jalankan proses worker baru untuk shard `index`"""
+        parent, child = self.context.Pipe()
+        process = self.context.Process(target=_worker_main, name=f"clank-worker-{index}", daemon=True,
+                                       args=(child, self.pacing, self._log_path(index), handoff, recover))
+        process.start()
+        child.close()
+        worker = _Worker(index, process, parent)
+        asyncio.get_running_loop().add_reader(parent.fileno(), self._on_message, worker)
+        return worker
+
+    def _send(self, session_id: str, message: Tuple[Any, ...]) -> None:
+        """Kirim pesan ke worker pemilik sesi"""
+        worker = self.workers[shard_for(session_id, self.shards)]
+        if worker.handoff is not None or not worker.ready.done():
+            worker.backlog.append(message)
+        else:
+            worker.conn.send(message)
+
+    def start(self, session_id: str, write: Writer, profile: Optional[str] = None,
+              locale: Optional[str] = None) -> None:
+        """Mulai sesi baru di worker pemiliknya"""
+        if session_id in self.writers:
+            raise ValueError(f"sesi '{session_id}' sudah berjalan")
+        self.writers[session_id] = write
+        self.profiles[session_id] = (profile, locale)
+        self.idle.clear()
+        self._send(session_id, ("start", session_id, profile, locale))
+
+    def send(self, session_id: str, line: str) -> None:
+        """Kirim input pemain ke sesinya"""
+        self._send(session_id, ("input", session_id, line))
+
+    def close(self, session_id: str) -> None:
+        """Tandai input sesi sudah habis"""
+        self._send(session_id, ("close", session_id))
+
+    async def restart(self, index: int) -> None:
+        """Ganti worker `index` dengan proses baru tanpa kehilangan sesinya"""
+        old = self.workers[index]
+        old.handoff = asyncio.get_running_loop().create_future()
+        old.conn.send(("handoff",))
+        data = await old.handoff
+        await self._replace(old, handoff=data)
+
+    async def _replace(self, old: _Worker, handoff: Optional[bytes] = None, recover: bool = False) -> None:
+        """Ganti worker lama dengan proses baru dan kirim pesan yang tertahan.
+
+        Worker pengganti baru dijalankan setelah proses lama keluar, jadi
+        event log yang sama tidak ditulis dua proses sekaligus dan event
+        resume dari pengganti selalu ada setelah event terakhir worker lama.
+        """
+        loop = asyncio.get_running_loop()
+        loop.remove_reader(old.conn.fileno())
+        old.conn.close()
+        await loop.run_in_executor(None, old.process.join, 5)
+        if old.process.is_alive():
+            old.process.kill()
+            await loop.run_in_executor(None, old.process.join)
+        # Pengganti baru dipasang setelah siap; sampai itu pesan untuk shard
+        # ini ditahan di old.backlog (old.handoff sudah diisi)
+        new = self._spawn(old.index, handoff, recover)
+        restored = set(await new.ready)
+        self.workers[old.index] = new
+        self.restarts += 1
+        # Sesi yang belum punya checkpoint dimulai lagi dari awal, sekali saja:
+        # "start" yang masih tertahan untuk sesi itu tidak dikirim lagi
+        started = set(restored)
+        for session_id, (profile, locale) in self.profiles.items():
+            if shard_for(session_id, self.shards) == old.index and session_id not in started:
+                new.conn.send(("start", session_id, profile, locale))
+                started.add(session_id)
+        for message in old.backlog + new.backlog:
+            if message[0] != "start" or message[1] not in started:
+                new.conn.send(message)
+        old.backlog.clear()
+        new.backlog.clear()
+
+    def _on_message(self, worker: _Worker) -> None:
+        """Terima pesan dari worker"""
+        try:
+            message = worker.conn.recv()
+        except (EOFError, OSError):
+            self._crashed(worker)
+            return
+        kind = message[0]
+        if kind == "output":
+            for session_id, data in message[1]:
+                write = self.writers.get(session_id)
+                if write is not None:
+                    write(data)
+        elif kind == "done":
+            self.writers.pop(message[1], None)
+            self.profiles.pop(message[1], None)
+            if not self.writers:
+                self.idle.set()
+        elif kind == "ready":
+            worker.ready.set_result(message[1])
+            if worker.backlog and self.workers[worker.index] is worker:
+                for queued in worker.backlog:
+                    worker.conn.send(queued)
+                worker.backlog.clear()
+        elif kind == "handoff" and worker.handoff is not None:
+            worker.handoff.set_result(message[1])
+
+    def _crashed(self, worker: _Worker) -> None:
+        """Worker mati mendadak: ganti dan pulihkan sesinya dari event log"""
+        if worker.handoff is not None or self.workers[worker.index] is not worker:
+            return
+        asyncio.get_running_loop().remove_reader(worker.conn.fileno())
+        worker.handoff = asyncio.get_running_loop().create_future()
+        task = asyncio.get_running_loop().create_task(self._replace(worker, recover=True))
+        self._replacing.add(task)
+        task.add_done_callback(self._replacing.discard)
+
+    async def join(self) -> None:
+        """Tunggu sampai semua sesi selesai"""
+        await self.idle.wait()
+
+    async def stop(self) -> None:
+        """Hentikan semua worker"""
+        loop = asyncio.get_running_loop()
+        if self._replacing:
+            await asyncio.gather(*self._replacing)
+        for worker in self.workers:
+            loop.remove_reader(worker.conn.fileno())
+            try:
+                worker.conn.send(("stop",))
+            except OSError:
+                pass
+        for worker in self.workers:
+            await loop.run_in_executor(None, worker.process.join, 5)
+            worker.conn.close()
+
+async def _bench(workers: int, sessions: int, script: List[int]) -> float:
+    """Mainkan `sessions` playthrough lewat supervisor; kembalikan sesi per detik"""
+    supervisor = Supervisor(workers, pacing=Pacing(0.0))
+    await supervisor.start_workers()
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    prompt = get_renderer().prompt
+
+    def start(session_id: str) -> None:
+        choices = iter(script)
+
+        def write(data: bytes) -> None:
+            # Jawab setiap kali prompt muncul di akhir output
+            for _ in range(data.count(prompt)):
+                loop.call_soon(supervisor.send, session_id, str(next(choices)))
+
+        supervisor.start(session_id, write)
+
+    for index in range(sessions):
+        start(f"bench-{index}")
+    await supervisor.join()
+    elapsed = time.perf_counter() - started
+    await supervisor.stop()
+    return sessions / elapsed
+
+def main(argv: List[str]) -> int:
+    """Ukur throughput supervisor untuk beberapa jumlah worker"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Throughput sesi CLANK per jumlah worker")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--repeat", type=int, default=5, help="ulangi setiap ukuran dan laporkan median")
+    args = parser.parse_args(argv)
+    print(f"{os.cpu_count()} core, {args.sessions} sesi, median dari {args.repeat} run")
+    for workers in args.workers:
+        rates = sorted(asyncio.run(_bench(workers, args.sessions, [1, 2, 3, 2, 1, 4, 5]))
+                       for _ in range(args.repeat))
+        print(f"{workers:>3} worker: {statistics.median(rates):>10.1f} sesi/detik "
+              f"(min {rates[0]:.1f}, maks {rates[-1]:.1f})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
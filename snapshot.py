@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Snapshot biner GameState untuk save/resume sesi
+
+Format (versi 1), semua bilangan bulat memakai varint LEB128::
+
+    b"CLNK" | versi (1 byte) | jumlah string | string... | jumlah sesi | sesi...
+
+    string: panjang + UTF-8
+    sesi:   id | scene | flags | ending | choices | knowledge | relationships | inventory
+
+Semua teks (id sesi, nama scene, kunci pilihan, kalimat knowledge, nama
+karakter) disimpan sekali di tabel string dan sesi hanya menyimpan indeksnya,
+jadi ribuan sesi dengan knowledge yang sama tetap kecil. Saat load, tabel
+string di-decode sekali dan objek str-nya dipakai bersama oleh semua sesi.
+"""
+
+import os
+from typing import Dict, List, Mapping, Tuple
+
+from game_state import EndingType, GameState
+
+MAGIC = b"CLNK"
+VERSION = 1
+
+_FLAG_AT_CHOICE = 1
+_FLAG_PLOT_TWIST = 2
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Tulis bilangan bulat non-negatif sebagai varint"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Baca varint; kembalikan (nilai, posisi berikutnya)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def _zigzag(value: int) -> int:
+    """Petakan bilangan bertanda ke non-negatif (0, -1, 1, -2, ...)"""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def _unzigzag(value: int) -> int:
+    """Kebalikan dari _zigzag"""
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+class _StringTable:
+    """Tabel string yang dibangun saat encode"""
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def __call__(self, text: str) -> int:
+        index = self.ids.get(text)
+        if index is None:
+            index = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+def dumps(states: Mapping[str, GameState]) -> bytes:
+    """Encode banyak GameState (per id sesi) menjadi satu snapshot"""
+    intern = _StringTable()
+    body = bytearray()
+    _write_varint(body, len(states))
+    for session_id, state in states.items():
+        _write_varint(body, intern(session_id))
+        # scene 0 = belum mulai / sudah selesai, selain itu indeks + 1
+        _write_varint(body, intern(state.scene) + 1 if state.scene is not None else 0)
+        flags = (_FLAG_AT_CHOICE if state.at_choice else 0) | (_FLAG_PLOT_TWIST if state.plot_twist_revealed else 0)
+        body.append(flags)
+        body.append(state.ending_type.value if state.ending_type is not None else 0)
+
+        _write_varint(body, len(state.choices_made))
+        for key, value in state.choices_made.items():
+            _write_varint(body, intern(key))
+            _write_varint(body, intern(value))
+        _write_varint(body, len(state.knowledge))
+        for knowledge in state.knowledge:
+            _write_varint(body, intern(knowledge))
+        _write_varint(body, len(state.relationships))
+        for character, level in state.relationships.items():
+            _write_varint(body, intern(character))
+            _write_varint(body, _zigzag(level))
+        _write_varint(body, len(state.inventory))
+        for item in state.inventory:
+            _write_varint(body, intern(item))
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_varint(out, len(intern.strings))
+    for text in intern.strings:
+        encoded = text.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+    out += body
+    return bytes(out)
+
+def loads(data: bytes) -> Dict[str, GameState]:
+    """Decode snapshot menjadi GameState per id sesi
+
+    Snapshot yang terpotong atau rusak ditolak dengan ValueError.
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("bukan snapshot CLANK")
+    if len(data) < 5 or data[4] != VERSION:
+        raise ValueError(f"versi snapshot tidak didukung: {data[4] if len(data) > 4 else None}")
+    try:
+        states, pos = _read_sessions(data, 5)
+    except (IndexError, KeyError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"snapshot rusak atau terpotong: {exc!r}") from exc
+    if pos != len(data):
+        raise ValueError(f"snapshot rusak: {len(data) - pos} byte sisa di akhir")
+    return states
+
+def _read_sessions(data: bytes, pos: int) -> Tuple[Dict[str, GameState], int]:
+    """Decode tabel string dan sesi mulai dari pos; kembalikan (states, posisi akhir)"""
+    count, pos = _read_varint(data, pos)
+    strings: List[str] = []
+    for _ in range(count):
+        size, pos = _read_varint(data, pos)
+        if pos + size > len(data):
+            raise IndexError("string melewati akhir data")
+        strings.append(data[pos:pos + size].decode("utf-8"))
+        pos += size
+
+    states: Dict[str, GameState] = {}
+    sessions, pos = _read_varint(data, pos)
+    for _ in range(sessions):
+        state = GameState()
+        index, pos = _read_varint(data, pos)
+        session_id = strings[index]
+        scene, pos = _read_varint(data, pos)
+        state.scene = strings[scene - 1] if scene else None
+        flags = data[pos]
+        ending = data[pos + 1]
+        pos += 2
+        state.at_choice = bool(flags & _FLAG_AT_CHOICE)
+        state.plot_twist_revealed = bool(flags & _FLAG_PLOT_TWIST)
+        state.ending_type = EndingType(ending) if ending else None
+
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            key, pos = _read_varint(data, pos)
+            value, pos = _read_varint(data, pos)
+            state.choices_made[strings[key]] = strings[value]
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            index, pos = _read_varint(data, pos)
+            state.knowledge.append(strings[index])
+        count, pos = _read_varint(data, pos)
+        for _ in range(count):
+            character, pos = _read_varint(data, pos)
+            level, pos = _read_varint(data, pos)
+            state.relationships[strings[character]] = _unzigzag(level)
+        count, pos = _read_varint(data, pos)
+        inventory = []
+        for _ in range(count):
+            index, pos = _read_varint(data, pos)
+            inventory.append(strings[index])
+        state.inventory = tuple(inventory)
+        states[session_id] = state
+    return states, pos
+
+def save(path: str, states: Mapping[str, GameState]) -> None:
+    """Tulis snapshot ke file secara atomik"""
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        f.write(dumps(states))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+def load(path: str) -> Dict[str, GameState]:
+    """Baca snapshot dari file"""
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Penyimpanan state sesi dengan group commit
+
+Setiap kali sesi sampai di menu pilihan, Engine menyimpan checkpoint
+GameState-nya (pilihan, hubungan, knowledge, posisi cerita) ke Storage, dan
+sesi yang selesai, ditutup pemain atau dihentikan dihapus dari Storage. put()
+hanya mencatat checkpoint terbaru per sesi di memori. Thread penulis
+mengumpulkan semua checkpoint yang masuk selama `interval` detik lalu
+menulisnya sebagai satu batch: ribuan sesi yang memilih bersamaan cukup satu
+transaksi dan satu fsync, dan sesi yang memilih beberapa kali dalam satu
+interval hanya ditulis sekali. Batch selalu ditulis sesuai urutan diambilnya.
+
+Backend (CLANK_STORAGE):
+
+    sqlite:PATH   tabel sessions di SQLite mode WAL, satu transaksi per batch
+    file:PATH     file append-only berisi record batch ber-CRC (isi record
+                  memakai format snapshot.py), dipadatkan ulang jika sudah
+                  jauh lebih besar dari isinya
+
+Trade-off durability/latensi (CLANK_STORAGE_SYNC):
+
+    always  ditulis dan di-fsync di dalam put(), sebelum sesi lanjut; tidak
+            ada yang hilang, tapi setiap pilihan menunggu satu fsync
+    batch   group commit dengan fsync setiap CLANK_STORAGE_INTERVAL detik
+            (default); crash kehilangan paling banyak satu interval
+    off     group commit tanpa fsync: aman dari crash proses, tidak dari
+            crash OS atau listrik mati
+
+Setelah restart, Engine.restore_stored() melanjutkan semua sesi yang
+tersimpan dari menu pilihan terakhirnya.
+"""
+
+import atexit
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+import snapshot
+from game_state import GameState
+from metrics import METRICS
+
+SYNC_MODES = ("always", "batch", "off")
+# Lama checkpoint dikumpulkan sebelum ditulis sebagai satu batch (detik)
+FLUSH_INTERVAL = 0.05
+# Batch ditulis lebih awal jika sudah memuat sebanyak ini sesi
+MAX_BATCH = 4096
+
+# Batch yang menunggu ditulis: id sesi -> checkpoint, atau None untuk dihapus
+Batch = Dict[str, Optional[GameState]]
+
+class Storage:
+    """Checkpoint sesi dengan group commit; subclass menulis batch ke medianya"""
+    def __init__(self, sync: str = "batch", interval: float = FLUSH_INTERVAL, max_batch: int = MAX_BATCH):
+        if sync not in SYNC_MODES:
+            raise ValueError(f"mode sync tidak dikenal: {sync!r}")
+        if interval < 0 or max_batch < 1:
+            raise ValueError("interval tidak boleh negatif dan max_batch minimal 1")
+        self.sync = sync
+        self.interval = interval
+        self.max_batch = max_batch
+        self.pending: Batch = {}
+        self.closed = False
+        self.batches = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        # Hanya satu penulisan ke media dalam satu waktu
+        self._io = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if sync != "always":
+            self._thread = threading.Thread(target=self._run, name="storage-flush", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, session_id: str, state: GameState) -> None:
+        """Simpan checkpoint sesi; `state` tidak boleh diubah lagi setelahnya (pakai state.copy())"""
+        self._submit(session_id, state)
+
+    def delete(self, session_id: str) -> None:
+        """Hapus sesi yang sudah selesai"""
+        self._submit(session_id, None)
+
+    def _submit(self, session_id: str, state: Optional[GameState]) -> None:
+        if self.closed:
+            raise ValueError("storage sudah ditutup")
+        if self._thread is None:
+            with self._io:
+                self._commit({session_id: state})
+            return
+        with self._lock:
+            self.pending[session_id] = state
+            if len(self.pending) == 1 or len(self.pending) >= self.max_batch:
+                self._wake.notify()
+
+    def flush(self) -> None:
+        """Tulis semua checkpoint yang masih tertahan sekarang juga.
+
+        `_io` dipegang sejak batch diambil sampai selesai ditulis, jadi batch
+        selalu sampai ke media sesuai urutan diambilnya: checkpoint lama dari
+        flush yang kalah cepat tidak bisa menimpa checkpoint yang lebih baru.
+        """
+        with self._io:
+            with self._lock:
+                batch, self.pending = self.pending, {}
+            if not batch:
+                return
+            try:
+                self._commit(batch)
+            except Exception:
+                with self._lock:
+                    # Checkpoint yang lebih baru dari batch gagal ini tetap menang
+                    for session_id, state in batch.items():
+                        self.pending.setdefault(session_id, state)
+                raise
+
+    def _commit(self, batch: Batch) -> None:
+        """Tulis satu batch ke media; pemanggil memegang `_io`"""
+        self._write(batch, self.sync != "off")
+        self.batches += 1
+        self.writes += len(batch)
+        if METRICS.enabled:
+            METRICS.count("storage_batches")
+            METRICS.count("storage_writes", len(batch))
+
+    def _run(self) -> None:
+        """Thread penulis: tunggu checkpoint pertama, kumpulkan selama interval, tulis"""
+        while True:
+            with self._lock:
+                while not self.pending and not self.closed:
+                    self._wake.wait()
+                if not self.closed and len(self.pending) < self.max_batch:
+                    self._wake.wait(self.interval)
+                closed = self.closed
+            try:
+                self.flush()
+            except Exception as error:
+                print(f"storage: gagal menulis batch, dicoba lagi: {error}", file=sys.stderr)
+                time.sleep(self.interval)
+            if closed:
+                return
+
+    def load(self) -> Dict[str, GameState]:
+        """Checkpoint semua sesi yang tersimpan (termasuk yang masih tertahan)"""
+        self.flush()
+        with self._io:
+            return self._read()
+
+    def close(self) -> None:
+        """Tulis sisa batch lalu tutup media"""
+        if self.closed:
+            return
+        with self._lock:
+            self.closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._io:
+            self._close()
+        atexit.unregister(self.close)
+
+    def _write(self, batch: Batch, fsync: bool) -> None:
+        raise NotImplementedError
+
+    def _read(self) -> Dict[str, GameState]:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+class SqliteStorage(Storage):
+    """Checkpoint di tabel SQLite (mode WAL), satu transaksi per batch"""
+    def __init__(self, path: str, sync: str = "batch", interval: float = FLUSH_INTERVAL,
+                 max_batch: int = MAX_BATCH):
+        import sqlite3
+
+        self.path = path
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        # Di mode WAL, FULL berarti satu fsync WAL per commit (= per batch)
+        self.db.execute("PRAGMA synchronous=" + ("OFF" if sync == "off" else "FULL"))
+        self.db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                        "id TEXT PRIMARY KEY, state BLOB NOT NULL, updated REAL NOT NULL)")
+        super().__init__(sync, interval, max_batch)
+
+    def _write(self, batch: Batch, fsync: bool) -> None:
+        now = time.time()
+        rows = [(session_id, snapshot.dumps({session_id: state}), now)
+                for session_id, state in batch.items() if state is not None]
+        gone = [(session_id,) for session_id, state in batch.items() if state is None]
+        self.db.execute("BEGIN")
+        try:
+            self.db.executemany("INSERT INTO sessions (id, state, updated) VALUES (?, ?, ?) "
+                                "ON CONFLICT(id) DO UPDATE SET state = excluded.state, "
+                                "updated = excluded.updated", rows)
+            self.db.executemany("DELETE FROM sessions WHERE id = ?", gone)
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    def _read(self) -> Dict[str, GameState]:
+        states: Dict[str, GameState] = {}
+        for session_id, data in self.db.execute("SELECT id, state FROM sessions"):
+            states[session_id] = snapshot.loads(data)[session_id]
+        return states
+
+    def _close(self) -> None:
+        self.db.close()
+
+_RECORD = struct.Struct("<BII")
+_PUT = 1
+_DELETE = 2
+
+class FileStorage(Storage):
+    """Checkpoint di file append-only, satu write (dan fsync) per batch.
+
+    Satu record = jenis (1 byte) | panjang isi (4 byte) | crc32 isi (4 byte) | isi;
+    isi record put adalah snapshot semua sesi di batch, isi record delete
+    adalah id sesi dipisah byte 0. Record terakhir yang terpotong saat crash
+    dibuang saat file dibuka. File dipadatkan menjadi satu record put jika
+    ukurannya melebihi `compact_ratio` kali ukuran setelah pemadatan terakhir.
+    """
+    def __init__(self, path: str, sync: str = "batch", interval: float = FLUSH_INTERVAL,
+                 max_batch: int = MAX_BATCH, compact_ratio: float = 4.0, compact_min: int = 1 << 20):
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        valid = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                _, valid = _scan(f.read())
+            with open(path, "r+b") as f:
+                f.truncate(valid)
+        self.file = open(path, "ab")
+        self.size = self.compacted = valid
+        super().__init__(sync, interval, max_batch)
+
+    def _write(self, batch: Batch, fsync: bool) -> None:
+        puts = {session_id: state for session_id, state in batch.items() if state is not None}
+        gone = [session_id for session_id, state in batch.items() if state is None]
+        data = bytearray()
+        if puts:
+            data += _record(_PUT, snapshot.dumps(puts))
+        if gone:
+            data += _record(_DELETE, "\0".join(gone).encode("utf-8"))
+        self.file.write(data)
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+        self.size += len(data)
+        if self.size > max(self.compact_min, self.compact_ratio * self.compacted):
+            self._compact(fsync)
+
+    def _compact(self, fsync: bool) -> None:
+        """Tulis ulang file berisi satu record put untuk sesi yang masih hidup"""
+        data = _record(_PUT, snapshot.dumps(self._read()))
+        temp = f"{self.path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        self.file.close()
+        os.replace(temp, self.path)
+        self.file = open(self.path, "ab")
+        self.size = self.compacted = len(data)
+        if METRICS.enabled:
+            METRICS.count("storage_compactions")
+
+    def _read(self) -> Dict[str, GameState]:
+        self.file.flush()
+        with open(self.path, "rb") as f:
+            return _scan(f.read())[0]
+
+    def _close(self) -> None:
+        self.file.close()
+
+def _record(kind: int, payload: bytes) -> bytes:
+    """Satu record file storage"""
+    return _RECORD.pack(kind, len(payload), zlib.crc32(payload)) + payload
+
+def _scan(data: bytes) -> Tuple[Dict[str, GameState], int]:
+    """State sesi dari isi file storage dan panjang bagian yang utuh"""
+    states: Dict[str, GameState] = {}
+    pos = 0
+    while pos + _RECORD.size <= len(data):
+        kind, size, crc = _RECORD.unpack_from(data, pos)
+        start = pos + _RECORD.size
+        payload = data[start:start + size]
+        if len(payload) < size or zlib.crc32(payload) != crc or kind not in (_PUT, _DELETE):
+            break
+        if kind == _PUT:
+            states.update(snapshot.loads(payload))
+        else:
+            for session_id in payload.decode("utf-8").split("\0"):
+                states.pop(session_id, None)
+        pos = start + size
+    return states, pos
+
+def open_storage(spec: str, sync: str = "batch", interval: float = FLUSH_INTERVAL) -> Storage:
+    """Storage dari 'sqlite:PATH' atau 'file:PATH'"""
+    kind, _, path = spec.partition(":")
+    if not path:
+        raise ValueError(f"storage tidak dikenal: {spec!r}")
+    if kind == "sqlite":
+        return SqliteStorage(path, sync, interval)
+    if kind == "file":
+        return FileStorage(path, sync, interval)
+    raise ValueError(f"backend storage tidak dikenal: {kind!r}")
+
+def storage_from_env() -> Optional[Storage]:
+    """Storage dari CLANK_STORAGE, CLANK_STORAGE_SYNC dan CLANK_STORAGE_INTERVAL, atau None"""
+    spec = os.environ.get("CLANK_STORAGE")
+    if not spec:
+        return None
+    interval = os.environ.get("CLANK_STORAGE_INTERVAL")
+    return open_storage(spec, os.environ.get("CLANK_STORAGE_SYNC", "batch"),
+                        float(interval) if interval else FLUSH_INTERVAL)
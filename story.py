@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Story graph CLANK: format data cerita dan compiler-nya
+
+Cerita disimpan sebagai JSON (lihat content/clank.json)::
+
+    {"title": ..., "start": "intro_scene", "nodes": {
+        "<id>": {"title": ..., "steps": [...], "effects": [...],
+                 "choice": {"key": ..., "options": [
+                     {"value": 1, "label": ..., "steps": [...], "effects": [...], "next": ...}]},
+                 "after": [...], "next": "<id>"}},
+     "endings": [{"ending": "NAMA_ENDING", "when": [...], "steps": [...], "next": "<id>"}]}
+
+Step: {"say": teks, "delay": detik_per_karakter}, {"print": teks}, {"pause": detik},
+{"divider": judul}. Teks boleh memakai tag warna seperti {yellow} dan {end}.
+Effect: {"learn": teks}, {"relate": nama, "delta": n}, {"relate": nama, "value": n},
+{"reveal": true}, {"ending": "NAMA_ENDING"}.
+
+Node dengan "resolve": true menentukan ending dari seluruh state pemain lewat
+rule di "endings": rule pertama yang semua syaratnya terpenuhi dipakai, step-nya
+ditampilkan, ending-nya di-set dan cerita lanjut ke "next" rule itu. Syarat:
+{"knows": teks}, {"revealed": true}, {"relation": nama, "min": n, "max": n},
+{"chose": kunci, "value": n}, {"ending": "NAMA_ENDING"} (ending yang sedang
+dituju pemain). Jika tidak ada rule yang cocok, node lanjut ke "next"-nya.
+
+Hasil compile adalah StoryGraph yang immutable dan terindeks, jadi satu graph
+bisa dipakai bersama oleh semua sesi pemain.
+"""
+
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import (Any, Callable, Dict, FrozenSet, Generator, Hashable, Iterable, List, Mapping, NamedTuple,
+                    Optional, Tuple, Union)
+
+from game_state import (CHARACTERS, RELATION_MAX, RELATION_MIN, EndingType, GameState, intern_choice_key,
+                        intern_knowledge)
+
+# CLANK_STORY bisa menunjuk ke file cerita lain, termasuk story pack .clkp
+DEFAULT_STORY = (os.environ.get("CLANK_STORY")
+                 or os.path.join(os.path.dirname(os.path.abspath(__file__)), "content", "clank.json"))
+
+class Step(NamedTuple):
+    """Satu langkah output: say, print, pause atau divider"""
+    kind: str
+    text: str = ""
+    delay: float = 0.0
+
+class Effect(NamedTuple):
+    """Perubahan state: learn, relate, set, reveal atau ending"""
+    op: str
+    target: str = ""
+    amount: int = 0
+
+class Option(NamedTuple):
+    """Satu pilihan di menu beserta akibatnya"""
+    value: int
+    label: str
+    steps: Tuple[Step, ...]
+    effects: Tuple[Effect, ...]
+    next: Optional[str]
+
+class Choice(NamedTuple):
+    """Titik pilihan di sebuah node"""
+    key: Optional[str]
+    options: Tuple[Option, ...]
+    index: Mapping[int, Option]
+
+    @property
+    def menu(self) -> List[Tuple[int, str]]:
+        """Pilihan dalam format print_choice_menu"""
+        return [(option.value, option.label) for option in self.options]
+
+class Node(NamedTuple):
+    """Satu scene di story graph"""
+    id: str
+    title: str
+    steps: Tuple[Step, ...]
+    effects: Tuple[Effect, ...]
+    choice: Optional[Choice]
+    after: Tuple[Step, ...]
+    next: Optional[str]
+    resolve: bool = False
+
+class Condition(NamedTuple):
+    """Satu syarat rule ending: knows, revealed, relation, chose atau ending.
+
+    Untuk relation, `low`..`high` adalah rentang level yang diterima
+    (inklusif); batas yang tidak ditulis di cerita berarti tak terbatas
+    (RELATION_MIN/RELATION_MAX).
+    """
+    field: str
+    key: str = ""
+    low: int = 0
+    high: int = 0
+
+    def test(self, state: GameState) -> bool:
+        """True jika state memenuhi syarat ini"""
+        field = self.field
+        if field == "relation":
+            return self.low <= state.relationships[self.key] <= self.high
+        if field == "knows":
+            return self.key in state.knowledge
+        if field == "chose":
+            return state.choices_made.get(self.key) == str(self.low)
+        if field == "revealed":
+            return state.plot_twist_revealed is bool(self.low)
+        return state.ending_type is not None and state.ending_type.value == self.low
+
+    def bucket(self) -> Optional[Hashable]:
+        """Kunci indeks jika syarat ini berupa kesamaan, None untuk rentang"""
+        if self.field == "relation":
+            return None
+        if self.field == "revealed":
+            return ("revealed", bool(self.low))
+        if self.field == "knows":
+            return ("knows", self.key)
+        return (self.field, self.key, self.low) if self.field == "chose" else ("ending", self.low)
+
+class Rule(NamedTuple):
+    """Rule ending yang sudah di-compile"""
+    ending: str
+    conditions: Tuple[Condition, ...]
+    steps: Tuple[Step, ...]
+    effects: Tuple[Effect, ...]
+    next: Optional[str]
+
+# Urutan pemilihan syarat yang dipakai sebagai indeks rule: yang paling selektif dulu
+_INDEX_ORDER = ("ending", "chose", "knows", "revealed")
+
+class EndingRules:
+    """Rule ending terindeks menurut field state yang dibacanya.
+
+    Setiap rule dimasukkan ke satu bucket berdasarkan salah satu syarat
+    kesamaannya (ending yang dituju, pilihan tertentu, knowledge, reveal).
+    resolve() hanya mengambil bucket yang cocok dengan state pemain, lalu
+    menguji rule kandidat sesuai urutan aslinya, jadi biayanya sebanding
+    dengan rule yang tersentuh, bukan dengan jumlah semua rule.
+    """
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = tuple(rules)
+        self.fields: FrozenSet[str] = frozenset(c.field for rule in self.rules for c in rule.conditions)
+        conditions = [c for rule in self.rules for c in rule.conditions]
+        self.reads: Tuple[Tuple[str, str], ...] = tuple(dict.fromkeys(
+            (c.field, c.key) for c in conditions if c.field not in ("ending", "revealed")))
+        self.reads_revealed = "revealed" in self.fields
+        self.always: List[int] = []
+        self.index: Dict[Hashable, List[int]] = {}
+        for order, rule in enumerate(self.rules):
+            ranked = sorted((c for c in rule.conditions if c.field != "relation"),
+                            key=lambda c: _INDEX_ORDER.index(c.field))
+            if ranked:
+                self.index.setdefault(ranked[0].bucket(), []).append(order)
+            else:
+                self.always.append(order)
+        self.indexed: FrozenSet[str] = frozenset(bucket[0] for bucket in self.index)
+
+    def candidates(self, state: GameState) -> List[int]:
+        """Nomor urut rule yang bucket-nya cocok dengan state"""
+        found = list(self.always)
+        index = self.index
+        if "ending" in self.indexed and state.ending_type is not None:
+            found += index.get(("ending", state.ending_type.value), ())
+        if "chose" in self.indexed:
+            for key, value in state.choices_made.items():
+                found += index.get(("chose", key, int(value)), ())
+        if "knows" in self.indexed:
+            for text in state.knowledge:
+                found += index.get(("knows", text), ())
+        if "revealed" in self.indexed:
+            found += index.get(("revealed", state.plot_twist_revealed), ())
+        found.sort()
+        return found
+
+    def state_key(self, state: GameState) -> Tuple[Any, ...]:
+        """Nilai field state yang dibaca rule (di luar ending yang sedang dituju)"""
+        key: List[Any] = [state.plot_twist_revealed] if self.reads_revealed else []
+        for field, name in self.reads:
+            if field == "relation":
+                key.append(state.relationships[name])
+            elif field == "knows":
+                key.append(name in state.knowledge)
+            else:
+                key.append(state.choices_made.get(name))
+        return tuple(key)
+
+    def resolve(self, state: GameState) -> Optional[Rule]:
+        """Rule pertama yang semua syaratnya terpenuhi, atau None"""
+        for order in self.candidates(state):
+            rule = self.rules[order]
+            if all(condition.test(state) for condition in rule.conditions):
+                return rule
+        return None
+
+class StoryGraph(NamedTuple):
+    """Story graph yang sudah di-compile"""
+    title: str
+    start: str
+    nodes: Mapping[str, Node]
+    endings: Optional[EndingRules] = None
+
+# Penerima event dari walk(): (jenis, node, payload), lihat events.py
+EventSink = Callable[[str, str, Any], None]
+
+def _compile_steps(raw: List[Dict[str, Any]], where: str) -> Tuple[Step, ...]:
+    """Compile daftar step mentah"""
+    steps = []
+    for item in raw:
+        if "say" in item:
+            steps.append(Step("say", item["say"], float(item.get("delay", 0.03))))
+        elif "print" in item:
+            steps.append(Step("print", item["print"]))
+        elif "pause" in item:
+            steps.append(Step("pause", delay=float(item["pause"])))
+        elif "divider" in item:
+            steps.append(Step("divider", item["divider"]))
+        else:
+            raise ValueError(f"{where}: step tidak dikenal {item!r}")
+    return tuple(steps)
+
+def _compile_effects(raw: List[Dict[str, Any]], where: str) -> Tuple[Effect, ...]:
+    """Compile daftar effect mentah"""
+    effects = []
+    for item in raw:
+        if "learn" in item:
+            intern_knowledge(item["learn"])
+            effects.append(Effect("learn", item["learn"]))
+        elif "relate" in item:
+            if item["relate"] not in CHARACTERS:
+                raise ValueError(f"{where}: karakter tidak dikenal {item['relate']!r}")
+            if "value" in item:
+                effects.append(Effect("set", item["relate"], int(item["value"])))
+            else:
+                effects.append(Effect("relate", item["relate"], int(item["delta"])))
+        elif "reveal" in item:
+            effects.append(Effect("reveal", amount=int(bool(item["reveal"]))))
+        elif "ending" in item:
+            if item["ending"] not in EndingType.__members__:
+                raise ValueError(f"{where}: ending tidak dikenal {item['ending']!r}")
+            effects.append(Effect("ending", item["ending"], EndingType[item["ending"]].value))
+        else:
+            raise ValueError(f"{where}: effect tidak dikenal {item!r}")
+    return tuple(effects)
+
+def _compile_condition(item: Dict[str, Any], where: str) -> Condition:
+    """Compile satu syarat rule ending"""
+    if "knows" in item:
+        return Condition("knows", item["knows"])
+    if "revealed" in item:
+        return Condition("revealed", low=int(bool(item["revealed"])))
+    if "relation" in item:
+        if item["relation"] not in CHARACTERS:
+            raise ValueError(f"{where}: karakter tidak dikenal {item['relation']!r}")
+        low, high = int(item.get("min", RELATION_MIN)), int(item.get("max", RELATION_MAX))
+        if not (RELATION_MIN <= low <= RELATION_MAX and RELATION_MIN <= high <= RELATION_MAX):
+            raise ValueError(f"{where}: batas hubungan di luar {RELATION_MIN}..{RELATION_MAX}: {item!r}")
+        return Condition("relation", item["relation"], low, high)
+    if "chose" in item:
+        return Condition("chose", item["chose"], int(item["value"]))
+    if "ending" in item:
+        if item["ending"] not in EndingType.__members__:
+            raise ValueError(f"{where}: ending tidak dikenal {item['ending']!r}")
+        return Condition("ending", item["ending"], EndingType[item["ending"]].value)
+    raise ValueError(f"{where}: syarat tidak dikenal {item!r}")
+
+def compile_rules(raw: List[Dict[str, Any]]) -> EndingRules:
+    """Compile daftar rule ending (tanpa memeriksa referensi ke node lain)"""
+    rules = []
+    for number, item in enumerate(raw, 1):
+        where = f"rule ending #{number}"
+        effects = _compile_effects([{"ending": item["ending"]}], where)
+        conditions = tuple(_compile_condition(condition, where) for condition in item.get("when", []))
+        rules.append(Rule(item["ending"], conditions, _compile_steps(item.get("steps", []), where),
+                          effects, item.get("next")))
+    return EndingRules(rules)
+
+def compile_node(node_id: str, raw: Dict[str, Any]) -> Node:
+    """Compile satu node mentah (tanpa memeriksa referensi ke node lain)"""
+    where = f"node '{node_id}'"
+    next_id = raw.get("next")
+    choice = None
+    if "choice" in raw:
+        options = tuple(
+            Option(
+                int(opt["value"]),
+                opt["label"],
+                _compile_steps(opt.get("steps", []), where),
+                _compile_effects(opt.get("effects", []), where),
+                opt.get("next", next_id),
+            )
+            for opt in raw["choice"]["options"]
+        )
+        if raw["choice"].get("key") is not None:
+            intern_choice_key(raw["choice"]["key"])
+        index = {option.value: option for option in options}
+        if len(index) != len(options):
+            raise ValueError(f"{where}: nilai pilihan duplikat")
+        choice = Choice(raw["choice"].get("key"), options, MappingProxyType(index))
+    return Node(
+        node_id,
+        raw.get("title", ""),
+        _compile_steps(raw.get("steps", []), where),
+        _compile_effects(raw.get("effects", []), where),
+        choice,
+        _compile_steps(raw.get("after", []), where),
+        next_id,
+        bool(raw.get("resolve", False)),
+    )
+
+def compile_story(data: Dict[str, Any]) -> StoryGraph:
+    """Compile data cerita menjadi StoryGraph yang immutable"""
+    nodes = {node_id: compile_node(node_id, raw) for node_id, raw in data["nodes"].items()}
+
+    # Pastikan semua referensi antar node valid
+    for node in nodes.values():
+        targets = [node.next] if node.choice is None else [option.next for option in node.choice.options]
+        for target in targets:
+            if target is not None and target not in nodes:
+                raise ValueError(f"node '{node.id}' merujuk ke node tidak dikenal '{target}'")
+    if data["start"] not in nodes:
+        raise ValueError(f"node awal tidak dikenal '{data['start']}'")
+
+    endings = compile_rules(data["endings"]) if "endings" in data else None
+    _check_rules(nodes, endings)
+    return StoryGraph(data.get("title", ""), data["start"], MappingProxyType(nodes), endings)
+
+def _check_rules(nodes: Mapping[str, Node], endings: Optional[EndingRules]) -> None:
+    """Pastikan rule ending hanya merujuk ke node, knowledge dan pilihan yang ada di cerita"""
+    resolvers = [node.id for node in nodes.values() if node.resolve]
+    for node_id in resolvers:
+        if nodes[node_id].choice is not None:
+            raise ValueError(f"node '{node_id}': node resolve tidak boleh punya pilihan")
+    if endings is None:
+        if resolvers:
+            raise ValueError(f"node '{resolvers[0]}' memakai resolve tetapi cerita tidak punya rule ending")
+        return
+    learned = set()
+    keys = set()
+    for node in nodes.values():
+        effects = list(node.effects)
+        if node.choice is not None:
+            effects += [effect for option in node.choice.options for effect in option.effects]
+            keys.add(node.choice.key)
+        learned.update(effect.target for effect in effects if effect.op == "learn")
+    for number, rule in enumerate(endings.rules, 1):
+        if rule.next is not None and rule.next not in nodes:
+            raise ValueError(f"rule ending #{number} merujuk ke node tidak dikenal '{rule.next}'")
+        for condition in rule.conditions:
+            if condition.field == "knows" and condition.key not in learned:
+                raise ValueError(f"rule ending #{number}: knowledge tidak pernah dipelajari {condition.key!r}")
+            if condition.field == "chose" and condition.key not in keys:
+                raise ValueError(f"rule ending #{number}: kunci pilihan tidak dikenal {condition.key!r}")
+
+@lru_cache(maxsize=None)
+def load_story(path: str = DEFAULT_STORY) -> StoryGraph:
+    """Load dan compile file cerita (sekali per proses).
+
+    File .clkp (lihat pack.py) dibuka lewat mmap dan node-nya baru di-compile
+    saat pertama kali dipakai. pack dan json baru di-import di sini supaya
+    startup ringan.
+    """
+    if path.endswith(".clkp"):
+        import pack
+        return pack.open_pack(path)
+    import json
+    with open(path, encoding="utf-8") as f:
+        return compile_story(json.load(f))
+
+def apply_effects(effects: Tuple[Effect, ...], state: GameState) -> None:
+    """Terapkan effect ke state pemain"""
+    for effect in effects:
+        if effect.op == "learn":
+            state.knowledge.append(effect.target)
+        elif effect.op == "relate":
+            state.relationships[effect.target] += effect.amount
+        elif effect.op == "set":
+            state.relationships[effect.target] = effect.amount
+        elif effect.op == "reveal":
+            state.plot_twist_revealed = bool(effect.amount)
+        elif effect.op == "ending":
+            state.ending_type = EndingType(effect.amount)
+
+def walk(graph: StoryGraph, state: GameState, start: Optional[str] = None,
+         log: Optional[EventSink] = None) -> Generator[Union[Step, Choice], Optional[int], None]:
+    """Jalankan cerita sebagai generator.
+
+    Yield setiap Step untuk ditampilkan, dan yield Choice saat pemain harus
+    memilih; nilai pilihan dikirim balik lewat send(). Tanpa `start`, state
+    yang sudah punya posisi (state.scene) dilanjutkan dari posisi itu.
+    Setiap perubahan state dilaporkan ke `log` jika diberikan.
+    """
+    if start is None and state.scene is not None:
+        node_id, resume = state.scene, state.at_choice
+    else:
+        node_id, resume = start or graph.start, False
+    while node_id is not None:
+        node = graph.nodes[node_id]
+        state.scene = node_id
+        if not resume:
+            if log is not None:
+                log("enter", node_id, None)
+            yield from node.steps
+            apply_effects(node.effects, state)
+            if log is not None and node.effects:
+                log("delta", node_id, node.effects)
+        resume = False
+        next_id = node.next
+        if node.resolve:
+            rule = graph.endings.resolve(state)
+            if rule is not None:
+                yield from rule.steps
+                apply_effects(rule.effects, state)
+                if log is not None:
+                    log("delta", node_id, rule.effects)
+                next_id = rule.next
+        if node.choice is not None:
+            state.at_choice = True
+            if log is not None:
+                log("prompt", node_id, None)
+            value = yield node.choice
+            option = node.choice.index[value]
+            state.at_choice = False
+            if node.choice.key is not None:
+                state.choices_made[node.choice.key] = str(value)
+            if log is not None:
+                log("choice", node_id, (node.choice.key, value))
+            yield from option.steps
+            apply_effects(option.effects, state)
+            if log is not None and option.effects:
+                log("delta", node_id, option.effects)
+            next_id = option.next
+        yield from node.after
+        node_id = next_id
+    state.scene = None
+    if log is not None:
+        log("end", "", None)
+
+def scene_key(graph: StoryGraph, node_id: str, value: Optional[int], state: GameState) -> Hashable:
+    """Kunci isi output satu scene walk() yang dimulai di node `node_id`.
+
+    Dipanggil saat event enter (`value` None) atau choice (`value` pilihan
+    pemain). Step scene itu ditentukan node dan pilihannya, ditambah field
+    state yang dibaca rule ending jika node itu me-resolve ending.
+    """
+    if graph.nodes[node_id].resolve and graph.endings is not None:
+        return node_id, value, state.ending_type, graph.endings.state_key(state)
+    return node_id, value
+
+def play_through(graph: StoryGraph, choices: Iterable[int], state: Optional[GameState] = None) -> GameState:
+    """Mainkan cerita tanpa output memakai urutan pilihan yang sudah ditentukan"""
+    state = state or GameState()
+    script = iter(choices)
+    run = walk(graph, state)
+    reply = None
+    while True:
+        try:
+            item = run.send(reply)
+        except StopIteration:
+            return state
+        reply = next(script) if isinstance(item, Choice) else None
@@ -0,0 +1,21 @@
+import json
+import os
+
+import pytest
+
+from lint import Linter
+
+STORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content", "clank.json")
+
+def errors(data):
+    return [problem for problem in Linter().lint(data) if problem.level == "error"]
+
+def test_bundled_story_has_no_errors():
+    with open(STORY, encoding="utf-8") as f:
+        assert errors(json.load(f)) == []
+
+@pytest.mark.parametrize("step", [{"say": 5}, {"print": ["x"]}, {"divider": None}])
+def test_non_string_step_text_is_an_error(step):
+    found = errors({"start": "a", "nodes": {"a": {"steps": [step, {"say": "ok"}]}}})
+    assert len(found) == 1
+    assert found[0].where == "node 'a' (steps)" and "harus berupa string" in found[0].message
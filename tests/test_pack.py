@@ -0,0 +1,31 @@
+import json
+import os
+
+import pytest
+
+import pack
+
+STORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content", "clank.json")
+
+@pytest.fixture
+def packed(tmp_path):
+    with open(STORY, encoding="utf-8") as f:
+        data = json.load(f)
+    path = str(tmp_path / "clank.clkp")
+    pack.write(path, data)
+    return path, data
+
+def test_round_trip_keeps_endings(packed):
+    path, data = packed
+    assert pack.read_raw(path) == data
+    graph = pack.open_pack(path)
+    assert graph.start == data["start"] and graph.endings is not None
+
+def test_older_pack_is_rejected(packed):
+    path, _ = packed
+    with open(path, "r+b") as f:
+        f.seek(4)
+        f.write(bytes((pack.VERSION - 1,)))
+    for read in (pack.open_pack, pack.read_raw):
+        with pytest.raises(ValueError, match="buat ulang"):
+            read(path)
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import struct
+
+import pytest
+
+from engine import Engine
+from render import INSTANT
+from server import _WS_CLOSE, _WS_PING, _WS_TEXT, MAX_INPUT, Server, _ws_frame, _ws_handshake, _ws_messages
+
+def client_frame(opcode: int, payload: bytes, fin: bool = True, mask: bytes = b"\x01\x02\x03\x04") -> bytes:
+    """Frame dari sisi klien (di-mask kecuali mask kosong)"""
+    first = (0x80 if fin else 0) | opcode
+    size = len(payload)
+    if size < 126:
+        header = struct.pack("!BB", first, size | (0x80 if mask else 0))
+    elif size < 1 << 16:
+        header = struct.pack("!BBH", first, 126 | (0x80 if mask else 0), size)
+    else:
+        header = struct.pack("!BBQ", first, 127 | (0x80 if mask else 0), size)
+    if not mask:
+        return header + payload
+    return header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+def parse(data: bytes):
+    """Jalankan _ws_messages atas data mentah; kembalikan daftar (opcode, payload)"""
+    async def run():
+        reader = asyncio.StreamReader(limit=MAX_INPUT)
+        reader.feed_data(data)
+        reader.feed_eof()
+        return [message async for message in _ws_messages(reader)]
+    return asyncio.run(run())
+
+def handshake(data: bytes):
+    async def run():
+        reader = asyncio.StreamReader(limit=MAX_INPUT)
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await _ws_handshake(reader)
+    return asyncio.run(run())
+
+def test_masked_text_frame():
+    assert parse(client_frame(_WS_TEXT, "halo ünï".encode())) == [(_WS_TEXT, "halo ünï".encode())]
+
+def test_extended_length_frame():
+    payload = os.urandom(300)
+    assert parse(client_frame(_WS_TEXT, payload)) == [(_WS_TEXT, payload)]
+
+def test_fragments_are_joined_around_control_frames():
+    data = (client_frame(_WS_TEXT, b"sa", fin=False) + client_frame(_WS_PING, b"p")
+            + client_frame(0x0, b"tu", fin=False) + client_frame(0x0, b"!"))
+    assert parse(data) == [(_WS_PING, b"p"), (_WS_TEXT, b"satu!")]
+
+def test_eof_ends_messages():
+    assert parse(b"") == []
+    assert parse(client_frame(_WS_TEXT, b"1") + b"\x81") == [(_WS_TEXT, b"1")]
+
+def test_unmasked_frame_is_rejected():
+    with pytest.raises(ValueError, match="mask"):
+        parse(client_frame(_WS_TEXT, b"1", mask=b""))
+
+def test_oversized_frame_is_rejected():
+    with pytest.raises(ValueError, match="terlalu besar"):
+        parse(client_frame(_WS_TEXT, bytes(MAX_INPUT + 1)))
+
+def test_oversized_fragmented_message_is_rejected():
+    half = bytes(MAX_INPUT // 2 + 1)
+    with pytest.raises(ValueError, match="terlalu besar"):
+        parse(client_frame(_WS_TEXT, half, fin=False) + client_frame(0x0, half))
+
+def test_server_frame_lengths():
+    for size in (0, 125, 126, 65535, 65536):
+        frame = _ws_frame(_WS_TEXT, bytes(size))
+        assert frame[0] == 0x80 | _WS_TEXT and not frame[1] & 0x80
+        assert len(frame) - size == (2 if size < 126 else 4 if size < 1 << 16 else 10)
+
+REQUEST = (b"GET /?lang=xx HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+           b"Connection: Upgrade\r\nSec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n\r\n")
+
+def test_handshake_accepts_upgrade():
+    # Locale yang tidak dikenal diabaikan
+    assert handshake(REQUEST) == (b"dGhlIHNhbXBsZSBub25jZQ==", None)
+
+@pytest.mark.parametrize("request_", [
+    REQUEST.replace(b"GET ", b"POST "),
+    REQUEST.replace(b"Upgrade: websocket\r\n", b""),
+    REQUEST.replace(b"Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n", b""),
+    REQUEST[:-4],  # koneksi putus sebelum header lengkap
+    REQUEST[:-2] + b"X-Padding: " + b"x" * MAX_INPUT + b"\r\n\r\n",
+], ids=["not-get", "no-upgrade", "no-key", "truncated", "oversized"])
+def test_handshake_rejects(request_):
+    assert handshake(request_) is None
+
+def test_server_answers_bad_handshake_with_400():
+    async def run():
+        server = Server(Engine(pacing=INSTANT))
+        await server.serve(tcp_port=None, ws_port=0)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(REQUEST.replace(b"Upgrade: websocket\r\n", b""))
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+        finally:
+            await server.close()
+    assert asyncio.run(run()).startswith(b"HTTP/1.1 400 ")
+
+def test_server_closes_on_unmasked_frame():
+    async def run():
+        server = Server(Engine(pacing=INSTANT))
+        await server.serve(tcp_port=None, ws_port=0)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(REQUEST)
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(client_frame(_WS_TEXT, b"1", mask=b""))
+            # Sesi ditutup: server mengirim frame close lalu menutup koneksi
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data
+        finally:
+            await server.close()
+    data = asyncio.run(run())
+    assert data[-4:] == _ws_frame(_WS_CLOSE, struct.pack("!H", 1000))
@@ -0,0 +1,75 @@
+import pytest
+
+import snapshot
+from game_state import RELATION_MAX, RELATION_MIN, EndingType, GameState
+
+def make_state() -> GameState:
+    state = GameState()
+    state.scene = "ruang_kontrol"
+    state.at_choice = True
+    state.plot_twist_revealed = True
+    state.ending_type = EndingType.PARADOX_TRUTH
+    state.choices_made["pintu"] = "2"
+    state.choices_made["percaya_echo"] = "1"
+    # Urutan dipelajari harus bertahan, bukan urutan katalog
+    state.knowledge.append("Observer merekam semua dimensi")
+    state.knowledge.append("Echo bisa mendengar")
+    state.relationships["Echo"] = 300
+    state.relationships["Dr. Maven"] = -7
+    state.relationships["The Observer"] = RELATION_MIN
+    state.inventory = ("kunci", "kristal", "kunci")
+    return state
+
+def assert_same(restored: GameState, state: GameState) -> None:
+    assert restored.scene == state.scene
+    assert restored.at_choice == state.at_choice
+    assert restored.plot_twist_revealed == state.plot_twist_revealed
+    assert restored.ending_type is state.ending_type
+    assert dict(restored.choices_made) == dict(state.choices_made)
+    assert list(restored.knowledge) == list(state.knowledge)
+    assert dict(restored.relationships) == dict(state.relationships)
+    assert restored.inventory == state.inventory
+
+def test_round_trip_full_state():
+    state = make_state()
+    restored = snapshot.loads(snapshot.dumps({"s1": state}))
+    assert sorted(restored) == ["s1"]
+    assert_same(restored["s1"], state)
+
+def test_round_trip_blank_and_many_sessions():
+    blank = GameState()
+    full = make_state()
+    full.relationships["Echo"] = RELATION_MAX
+    restored = snapshot.loads(snapshot.dumps({"kosong": blank, "penuh": full, "ünïcode": full}))
+    assert list(restored) == ["kosong", "penuh", "ünïcode"]
+    assert_same(restored["kosong"], blank)
+    assert_same(restored["penuh"], full)
+    assert_same(restored["ünïcode"], full)
+    assert restored["kosong"].scene is None and restored["kosong"].ending_type is None
+
+def test_save_and_load_file(tmp_path):
+    path = str(tmp_path / "sessions.snap")
+    snapshot.save(path, {"s1": make_state()})
+    assert_same(snapshot.load(path)["s1"], make_state())
+
+def test_rejects_bad_magic():
+    with pytest.raises(ValueError, match="bukan snapshot"):
+        snapshot.loads(b"NOPE" + snapshot.dumps({})[4:])
+
+def test_rejects_unknown_version():
+    data = bytearray(snapshot.dumps({"s1": make_state()}))
+    data[4] = snapshot.VERSION + 1
+    with pytest.raises(ValueError, match="versi"):
+        snapshot.loads(bytes(data))
+    with pytest.raises(ValueError, match="versi"):
+        snapshot.loads(snapshot.MAGIC)
+
+def test_rejects_truncated_data():
+    data = snapshot.dumps({"s1": make_state(), "s2": GameState()})
+    for end in range(5, len(data)):
+        with pytest.raises(ValueError):
+            snapshot.loads(data[:end])
+
+def test_rejects_trailing_garbage():
+    with pytest.raises(ValueError):
+        snapshot.loads(snapshot.dumps({"s1": make_state()}) + b"\0")
@@ -0,0 +1,152 @@
+import os
+import threading
+
+import pytest
+
+from game_state import GameState
+from storage import FileStorage, SqliteStorage, _scan, open_storage
+
+BACKENDS = {"sqlite": SqliteStorage, "file": FileStorage}
+
+def make_state(scene: str, level: int = 0) -> GameState:
+    state = GameState()
+    state.scene = scene
+    state.at_choice = True
+    state.choices_made["pintu"] = "2"
+    state.knowledge.append("Echo bisa mendengar")
+    state.relationships["Echo"] = level
+    return state
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request, tmp_path):
+    return BACKENDS[request.param], str(tmp_path / f"sessions.{request.param}")
+
+@pytest.mark.parametrize("sync", ["always", "batch", "off"])
+def test_put_load_delete(backend, sync):
+    cls, path = backend
+    storage = cls(path, sync=sync, interval=0.01)
+    storage.put("a", make_state("lab", 3))
+    storage.put("b", make_state("gudang", -2))
+    storage.put("a", make_state("atap", 5))
+    storage.delete("b")
+    states = storage.load()
+    assert sorted(states) == ["a"]
+    assert states["a"].scene == "atap"
+    assert states["a"].relationships["Echo"] == 5
+    assert dict(states["a"].choices_made) == {"pintu": "2"}
+    assert list(states["a"].knowledge) == ["Echo bisa mendengar"]
+    storage.close()
+
+    reopened = cls(path, sync=sync)
+    assert {session: state.scene for session, state in reopened.load().items()} == {"a": "atap"}
+    reopened.close()
+
+def test_open_storage_spec(tmp_path):
+    storage = open_storage(f"file:{tmp_path / 'x.log'}", sync="off")
+    assert isinstance(storage, FileStorage)
+    storage.close()
+    with pytest.raises(ValueError):
+        open_storage("redis:localhost")
+    with pytest.raises(ValueError):
+        open_storage("file")
+
+def test_batch_coalesces_puts(backend):
+    cls, path = backend
+    storage = cls(path, sync="off", interval=60)
+    for level in range(10):
+        storage.put("a", make_state("lab", level))
+    storage.flush()
+    assert storage.batches == 1 and storage.writes == 1
+    assert storage.load()["a"].relationships["Echo"] == 9
+    storage.close()
+
+def test_put_during_flush_is_not_overwritten(backend):
+    cls, path = backend
+    writing = threading.Event()
+    release = threading.Event()
+
+    class Slow(cls):
+        def _write(self, batch, fsync):
+            if not writing.is_set():
+                writing.set()
+                assert release.wait(5)
+            super()._write(batch, fsync)
+
+    storage = Slow(path, sync="off", interval=60)
+    storage.put("a", make_state("lama", 1))
+    first = threading.Thread(target=storage.flush)
+    first.start()
+    assert writing.wait(5)
+    # Batch pertama sedang ditulis: checkpoint baru masuk dan di-flush dari thread lain
+    storage.put("a", make_state("baru", 2))
+    second = threading.Thread(target=storage.flush)
+    second.start()
+    second.join(0.1)
+    assert second.is_alive()  # menunggu _io, tidak menulis mendahului batch pertama
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert storage.load()["a"].scene == "baru"
+    storage.close()
+    reopened = cls(path, sync="off")
+    assert reopened.load()["a"].scene == "baru"
+    reopened.close()
+
+def test_file_truncated_trailing_record(tmp_path):
+    path = str(tmp_path / "sessions.log")
+    storage = FileStorage(path, sync="always")
+    storage.put("a", make_state("lab", 1))
+    intact = os.path.getsize(path)
+    storage.put("b", make_state("gudang", 2))
+    storage.close()
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+
+    reopened = FileStorage(path, sync="always")
+    assert sorted(reopened.load()) == ["a"]
+    assert os.path.getsize(path) == intact
+    reopened.put("c", make_state("atap", 3))
+    reopened.close()
+    with open(path, "rb") as f:
+        states, valid = _scan(f.read())
+    assert sorted(states) == ["a", "c"] and valid == os.path.getsize(path)
+
+def test_file_corrupt_record_is_dropped(tmp_path):
+    path = str(tmp_path / "sessions.log")
+    storage = FileStorage(path, sync="always")
+    storage.put("a", make_state("lab"))
+    storage.put("b", make_state("gudang"))
+    storage.close()
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes((last[0] ^ 0xFF,)))
+    reopened = FileStorage(path, sync="always")
+    assert sorted(reopened.load()) == ["a"]
+    reopened.close()
+
+def test_file_compaction_keeps_live_sessions(tmp_path):
+    path = str(tmp_path / "sessions.log")
+    storage = FileStorage(path, sync="always", compact_ratio=2.0, compact_min=0)
+    for round_ in range(20):
+        for session in ("a", "b", "c"):
+            storage.put(session, make_state(f"scene-{round_}", round_))
+    storage.delete("b")
+    storage.put("c", make_state("akhir", 99))
+    size = os.path.getsize(path)
+    assert storage.compacted > 0 and size <= 2 * storage.compacted
+    storage.close()
+
+    reopened = FileStorage(path, sync="always")
+    states = reopened.load()
+    assert sorted(states) == ["a", "c"]
+    assert states["a"].scene == "scene-19" and states["c"].relationships["Echo"] == 99
+    reopened.close()
+
+def test_closed_storage_rejects_writes(backend):
+    cls, path = backend
+    storage = cls(path, sync="batch", interval=0.01)
+    storage.close()
+    with pytest.raises(ValueError):
+        storage.put("a", make_state("lab"))